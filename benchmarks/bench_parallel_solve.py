@@ -0,0 +1,86 @@
+"""Time auto-layer solving of a generated world with 1..N worker processes.
+
+    python benchmarks/bench_parallel_solve.py [levels] [size] [rules]
+
+Builds a world of random IntGrid levels with random auto rules, solves it
+serially with RuleSolver.solve_all(), then with rules.parallel at each
+worker count up to the CPU count, and checks every run gives the same tiles.
+"""
+from __future__ import annotations
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from birdlevel.project.models import (  # noqa: E402
+    AutoRuleDef,
+    Definitions,
+    LayerDef,
+    LayerType,
+    Level,
+    RuleCell,
+    RuleCellReq,
+)
+from birdlevel.rules.auto_layer import RuleSolver  # noqa: E402
+from birdlevel.rules.parallel import solve_all_parallel  # noqa: E402
+
+
+def make_world(n_levels: int, size: int, n_rules: int, seed: int = 1):
+    rng = random.Random(seed)
+    src = LayerDef(name="ig", layer_type=LayerType.INTGRID)
+    auto = LayerDef(name="auto", layer_type=LayerType.AUTO_LAYER, source_layer_uid=src.uid)
+    defs = Definitions(layers=[src, auto])
+    values = list(range(9))
+    for i in range(n_rules):
+        pattern = [RuleCell(dx=rng.randint(-2, 2), dy=rng.randint(-2, 2),
+                            requirement=rng.choice(list(RuleCellReq)),
+                            values=rng.sample(values, rng.randint(1, 3)))
+                   for _ in range(rng.randint(1, 6))]
+        defs.auto_rules.append(AutoRuleDef(
+            source_layer_uid=src.uid, source_values=rng.sample(values, rng.randint(0, 2)),
+            pattern=pattern, output_tiles=[i], priority=rng.randint(0, 5),
+            allow_rotation=rng.random() < 0.5, allow_mirror=rng.random() < 0.5))
+    levels = []
+    for _ in range(n_levels):
+        level = Level(width_cells=size, height_cells=size)
+        level.ensure_layer_instances(defs.layers)
+        ig = level.get_layer_instance(src.uid)
+        for i in range(size * size):
+            ig.intgrid[i] = rng.choice(values) if rng.random() < 0.5 else 0
+        levels.append(level)
+    return defs, levels, auto
+
+
+def main() -> None:
+    n_levels = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 128
+    n_rules = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    defs, levels, auto = make_world(n_levels, size, n_rules)
+    print(f"{n_levels} levels of {size}x{size}, {n_rules} rules, {os.cpu_count()} CPU(s)")
+
+    solver = RuleSolver(defs)
+    start = time.perf_counter()
+    for level in levels:
+        solver.solve_all(level)
+    serial = time.perf_counter() - start
+    expected = [list(level.get_layer_instance(auto.uid).tiles) for level in levels]
+    print(f"serial solve_all:  {serial:.2f}s")
+
+    workers = 1
+    while True:
+        start = time.perf_counter()
+        solve_all_parallel(defs, levels, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        same = [list(level.get_layer_instance(auto.uid).tiles) for level in levels] == expected
+        print(f"parallel x{workers:<3}    {elapsed:.2f}s  speedup {serial / elapsed:.2f}  "
+              f"{'identical' if same else 'MISMATCH'}")
+        if workers >= (os.cpu_count() or 1):
+            break
+        workers = min(workers * 2, os.cpu_count() or 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Time uid lookups on Definitions and Level against a plain linear scan.
+
+    python benchmarks/bench_uid_lookup.py [definitions] [lookups]
+
+Covers hits (entity_by_uid on known uids), misses (uids of deleted
+definitions, as entities referencing them do on export) and
+get_layer_instance on a level with many layers.
+"""
+from __future__ import annotations
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from birdlevel.project.models import Definitions, EntityDef, LayerDef, Level  # noqa: E402
+
+
+def linear(items: list, attr: str, uid: str):
+    for item in items:
+        if getattr(item, attr) == uid:
+            return item
+    return None
+
+
+def per_call_us(fn, keys: list[str]) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        fn(key)
+    return (time.perf_counter() - start) / len(keys) * 1e6
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    rng = random.Random(1)
+
+    defs = Definitions(entities=[EntityDef() for _ in range(n)])
+    hits = [rng.choice(defs.entities).uid for _ in range(lookups)]
+    misses = [f"deleted{i}" for i in range(lookups)]
+    for name, keys in (("hit", hits), ("miss", misses)):
+        assert all(defs.entity_by_uid(k) is linear(defs.entities, "uid", k) for k in keys)
+        before = per_call_us(lambda k: linear(defs.entities, "uid", k), keys)
+        after = per_call_us(defs.entity_by_uid, keys)
+        print(f"entity_by_uid {name:4} ({n} defs): linear {before:8.2f}us  indexed {after:6.2f}us")
+
+    layer_defs = [LayerDef() for _ in range(200)]
+    level = Level()
+    level.ensure_layer_instances(layer_defs)
+    keys = [rng.choice(layer_defs).uid for _ in range(lookups)] + misses
+    before = per_call_us(lambda k: linear(level.layers, "layer_def_uid", k), keys)
+    after = per_call_us(level.get_layer_instance, keys)
+    print(f"get_layer_instance (200 layers, half misses): linear {before:6.2f}us  "
+          f"indexed {after:6.2f}us")
+
+
+if __name__ == "__main__":
+    main()
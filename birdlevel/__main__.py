@@ -1,5 +1,9 @@
 """Entry point for BirdLevel editor."""
-from birdlevel.app.main import main
+import sys
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "solve":
+        from birdlevel.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+    from birdlevel.app.main import main
     main()
@@ -0,0 +1,66 @@
+"""Damage tracking for the editor frame.
+
+The app reports what changed during a frame (input, edits, camera moves,
+timers) and the tracker turns that into the screen rectangles that must be
+redrawn.  Nothing damaged means the frame is skipped entirely; a few
+damaged regions are pushed with pygame.display.update(rects) instead of a
+full flip.
+"""
+from __future__ import annotations
+
+from typing import Hashable
+
+import pygame
+
+_MISSING = object()
+
+
+class DamageTracker:
+    """Collects damaged screen rectangles between two rendered frames."""
+
+    def __init__(self):
+        self.full = True  # the first frame draws everything
+        self.rects: list[pygame.Rect] = []
+        # name -> last seen key, for watch()
+        self._keys: dict[str, Hashable] = {}
+
+    def add(self, rect: pygame.Rect) -> None:
+        if not self.full and rect.w > 0 and rect.h > 0:
+            self.rects.append(pygame.Rect(rect))
+
+    def add_full(self) -> None:
+        self.full = True
+        self.rects.clear()
+
+    def watch(self, name: str, key: Hashable, rect: pygame.Rect | None = None) -> bool:
+        """Damage rect (or everything) when key differs from the last call.
+
+        Returns True if it changed.
+        """
+        if self._keys.get(name, _MISSING) == key:
+            return False
+        self._keys[name] = key
+        if rect is None:
+            self.add_full()
+        else:
+            self.add(rect)
+        return True
+
+    def forget(self) -> None:
+        """Drop the watched keys, e.g. after a project is replaced."""
+        self._keys.clear()
+        self.add_full()
+
+    def is_damaged(self, rect: pygame.Rect) -> bool:
+        return self.full or rect.collidelist(self.rects) >= 0
+
+    @property
+    def pending(self) -> bool:
+        return self.full or bool(self.rects)
+
+    def take(self) -> list[pygame.Rect] | None:
+        """Rectangles to update this frame (None: the whole screen), then reset."""
+        rects = None if self.full else self.rects
+        self.full = False
+        self.rects = []
+        return rects
@@ -164,6 +164,7 @@ class InputHandler:
             self._erase_old_values.append(old_val)
             li.set_intgrid_value(gx, gy, level.width_cells, 0)
             self._erase_cells.append((gx, gy, 0))
+            state.notify_intgrid_painted(li, [(gx, gy)])
         elif ld.layer_type in (LayerType.TILES, LayerType.AUTO_LAYER):
             old_val = li.get_tile(gx, gy, level.width_cells)
             self._erase_old_values.append(old_val)
@@ -201,9 +202,7 @@ class InputHandler:
             self._erase_visited.clear()
             return
 
-        state.command_stack.undo_stack.append(cmd)
-        state.command_stack.redo_stack.clear()
-        state.command_stack._dirty = True
+        state.command_stack.push_applied(cmd)
         state.needs_save = True
         self._erase_cells.clear()
         self._erase_old_values.clear()
@@ -213,15 +212,14 @@ class InputHandler:
         li = state.active_layer_instance
         if li is None or li.entities is None:
             return
-        for ent in reversed(li.entities):
-            if (ent.x <= wx < ent.x + ent.width and
-                    ent.y <= wy < ent.y + ent.height):
-                cmd = RemoveEntityCommand(layer_inst=li, entity=ent)
-                state.command_stack.execute(cmd)
-                if state.selected_entity_instance == ent:
-                    state.selected_entity_instance = None
-                state.needs_save = True
-                return
+        ent = li.entity_index().at_point(wx, wy)
+        if ent is None:
+            return
+        cmd = RemoveEntityCommand(layer_inst=li, entity=ent)
+        state.command_stack.execute(cmd)
+        if state.selected_entity_instance == ent:
+            state.selected_entity_instance = None
+        state.needs_save = True
 
     def _handle_key(self, event: pygame.event.Event, state: EditorState,
                     tool_manager: ToolManager) -> None:
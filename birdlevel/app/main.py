@@ -7,13 +7,15 @@ import time
 
 import pygame
 
+from birdlevel.app.damage import DamageTracker
 from birdlevel.app.input_handler import InputHandler
 from birdlevel.app.ui.panels import BottomBar, LeftDock, RightDock, TopBar
 from birdlevel.app.ui.theme import Theme
 from birdlevel.app.ui.widgets import UIEvent
 from birdlevel.assets.tileset_loader import TilesetManager
-from birdlevel.editor.commands import CommandStack
+from birdlevel.editor.commands import Command, CommandStack, find_command_level
 from birdlevel.editor.editor_state import EditorState
+from birdlevel.editor.journal import MAX_JOURNAL_BYTES, JournalError, UndoJournal, pending_records
 from birdlevel.editor.tools.base import ToolCategory, ToolManager, ToolType
 from birdlevel.editor.tools.entity_tools import EntityPlace, EntitySelect
 from birdlevel.editor.tools.intgrid_tools import (
@@ -38,6 +40,7 @@ from birdlevel.project.models import (
     FieldType,
     IntGridValueDef,
     LayerDef,
+    LayerInstance,
     LayerType,
     Level,
     Project,
@@ -48,14 +51,23 @@ from birdlevel.project.serialization import load_project, save_project
 from birdlevel.render.camera import Camera
 from birdlevel.render.grid import draw_grid, draw_level_border
 from birdlevel.render.layer_renderer import LayerRenderer
-from birdlevel.rules.auto_layer import RuleSolver
+from birdlevel.render.text_cache import render_text
+from birdlevel.rules.auto_layer import AutoLayerScheduler, RuleSolver
 from birdlevel.util.file_dialog import ask_yes_no, open_file_dialog, save_file_dialog
-from birdlevel.util.paths import create_backup, find_latest_backup, prune_backups
+from birdlevel.util.paths import (
+    backup_is_newer,
+    create_backup,
+    find_latest_backup,
+    prune_backups,
+    restore_backup,
+)
 
 
 SCREEN_W = 1920
 SCREEN_H = 1080
 FPS_TARGET = 60
+# Longest the main loop sleeps waiting for input while idle (seconds)
+IDLE_WAIT_MAX = 1.0
 APP_TITLE = "BirdLevel - Game Bird Level Editor"
 
 
@@ -74,6 +86,9 @@ class App:
         self.tileset_manager = TilesetManager()
         self.layer_renderer = LayerRenderer(tileset_manager=self.tileset_manager)
         self.rule_solver: RuleSolver | None = None
+        self.auto_layer: AutoLayerScheduler | None = None
+        # On-disk record of the undo history since the last save
+        self.journal: UndoJournal | None = None
 
         # UI
         self.top_bar: TopBar | None = None
@@ -87,6 +102,13 @@ class App:
         self.font: pygame.font.Font | None = None
         self.font_small: pygame.font.Font | None = None
 
+        # Frame damage: what to redraw, plus the cached canvas (level layers,
+        # grid and border) reused while the world is unchanged
+        self.damage = DamageTracker()
+        self._canvas_cache: pygame.Surface | None = None
+        self._world_dirty = True
+        self._last_mouse: tuple[int, int] = (0, 0)
+
         # Dialogs
         self._dialog_active = False
         self._dialog_type: str = ""
@@ -131,7 +153,8 @@ class App:
         self._setup_input()
         self._update_viewport()
 
-        self.rule_solver = RuleSolver(self.project.definitions)
+        self._setup_project_hooks()
+        self._open_journal(recover=True)
 
         # Center camera on level
         level = self.state.active_level
@@ -212,19 +235,64 @@ class App:
             backup = find_latest_backup(path)
             if backup is None:
                 return
-            proj_mtime = os.path.getmtime(path)
-            back_mtime = os.path.getmtime(backup)
-            if back_mtime > proj_mtime:
+            if backup_is_newer(path, backup):
                 if ask_yes_no(
                     "Crash Recovery",
                     f"A backup newer than the saved project was found.\n\n"
                     f"Backup: {os.path.basename(backup)}\n"
                     f"Restore from backup?",
                 ):
-                    self.project_path = backup
+                    self.project_path = restore_backup(path, backup)
         except Exception as e:
             print(f"Crash recovery check failed: {e}")
 
+    def _open_journal(self, recover: bool = False) -> None:
+        """Journal undo history changes to <project file>.journal.
+
+        With recover, changes a previous session journaled but never saved
+        (it crashed, or quit without saving) are offered for replay first.
+        Projects that were never saved have no journal.
+        """
+        self._close_journal()
+        path = self.project.file_path
+        if not path or not os.path.isfile(path):
+            return
+        stack = self.state.command_stack
+        journal = UndoJournal(self.project, path)
+        try:
+            count = pending_records(path) if recover else 0
+            if count and ask_yes_no(
+                "Crash Recovery",
+                f"{count} unsaved change(s) were recorded after the last save.\n\n"
+                f"Recover them?",
+            ):
+                replayed = journal.replay(stack)
+                self.state.needs_save = replayed > 0
+                self.state.set_notification(f"Recovered {replayed} change(s)")
+            else:
+                journal.reset()
+        except (OSError, ValueError, JournalError) as e:
+            print(f"Undo journal unavailable: {e}")
+            return
+        stack.journal = journal
+        self.journal = journal
+
+    def _close_journal(self, discard: bool = False) -> None:
+        """Stop journaling; the file is kept if it holds unsaved changes."""
+        journal = self.journal
+        if journal is None:
+            return
+        self.journal = None
+        if self.state.command_stack.journal is journal:
+            self.state.command_stack.journal = None
+        try:
+            if discard or journal.records == 0:
+                journal.discard()
+            else:
+                journal.close()
+        except OSError as e:
+            print(f"Undo journal close failed: {e}")
+
     def _load_project(self, path: str) -> None:
         try:
             self.project = load_project(path)
@@ -297,6 +365,66 @@ class App:
             "export": self._on_export,
         })
 
+    def _setup_project_hooks(self) -> None:
+        """Create the rule solver and hook editing events into project services."""
+        stack = self.state.command_stack
+        if self.auto_layer is not None:
+            # Replacing a previous project's hooks
+            stack.remove_listener(self.auto_layer.on_command)
+            self.state.remove_intgrid_listener(self.auto_layer.mark_dirty)
+        stack.remove_listener(self._mark_command_level)
+        stack.remove_listener(self._on_data_changed)
+        self.state.remove_intgrid_listener(self._on_cells_painted)
+        intgrid_surfaces = self.layer_renderer.intgrid_surfaces
+        stack.remove_listener(intgrid_surfaces.on_command)
+        self.state.remove_intgrid_listener(intgrid_surfaces.mark_dirty)
+        self.rule_solver = RuleSolver(self.project.definitions)
+        self.auto_layer = AutoLayerScheduler(self.project, self.rule_solver)
+        stack.add_listener(self._mark_command_level)
+        stack.add_listener(self.auto_layer.on_command)
+        stack.add_listener(self._on_data_changed)
+        self.state.add_intgrid_listener(self.auto_layer.mark_dirty)
+        self.state.add_intgrid_listener(self._on_cells_painted)
+        # Before anything draws: cached IntGrid pixels follow these reports
+        stack.add_listener(intgrid_surfaces.on_command)
+        self.state.add_intgrid_listener(intgrid_surfaces.mark_dirty)
+        self.damage.forget()
+        self._world_dirty = True
+        if self.left_dock:
+            self.left_dock.invalidate()
+        if self.project.level_store is not None:
+            self.project.level_store.can_evict = self._can_evict_level
+
+    def _on_data_changed(self, cmd: Command) -> None:
+        # Panels show data too (level list, undo state), so redraw it all
+        self._world_dirty = True
+        self.damage.add_full()
+
+    def _on_cells_painted(self, layer_inst: LayerInstance,
+                          cells: list[tuple[int, int]]) -> None:
+        self._world_dirty = True
+        self.damage.add(self.state.camera.viewport)
+
+    def _mark_command_level(self, cmd: Command) -> None:
+        """Flag the level a command touched so the next save rewrites it."""
+        active = self.state.active_level
+        levels = [lvl for world in self.project.worlds for lvl in world.levels]
+        level = find_command_level(cmd, [active, *levels] if active else levels)
+        if level is not None:
+            self.project.save_state.mark_level(level.uid)
+
+    def _mark_loaded_levels(self) -> None:
+        for world in self.project.worlds:
+            for level in world.levels:
+                if level.is_loaded:
+                    self.project.save_state.mark_level(level.uid)
+
+    def _can_evict_level(self, level: Level) -> bool:
+        """Keep the active level and anything the undo history points into."""
+        if level is self.state.active_level:
+            return False
+        return not self.state.command_stack.references_level(level)
+
     def _update_viewport(self) -> None:
         """Update the camera viewport to exclude UI panels."""
         left = Theme.LEFT_PANEL_WIDTH if (self.left_dock and self.left_dock.visible and not self.state.panels_collapsed) else 0
@@ -318,6 +446,8 @@ class App:
         if not self.project.file_path:
             self._on_save_as()
             return
+        if self.auto_layer:
+            self.auto_layer.flush()
         try:
             create_backup(self.project.file_path)
             prune_backups(self.project.file_path)
@@ -326,6 +456,9 @@ class App:
             self.state.needs_save = False
             self.state.autosave_timer = 0.0
             self.state.set_notification(f"Saved: {os.path.basename(path)}")
+            # The file now holds everything the journal did
+            self._close_journal(discard=True)
+            self._open_journal()
         except Exception as e:
             self.state.set_notification(f"Save failed: {e}", 5.0)
 
@@ -334,14 +467,16 @@ class App:
         initial = os.path.dirname(self.project.file_path) if self.project and self.project.file_path else None
         path = open_file_dialog(title="Open BirdLevel Project", initial_dir=initial)
         if path:
+            self._close_journal()
             self._load_project(path)
             # Re-setup after loading a new project
-            self.rule_solver = RuleSolver(self.project.definitions)
+            self._setup_project_hooks()
             level = self.state.active_level
             if level:
                 gs = self.project.grid_size
                 self.state.camera.center_on(level.pixel_width(gs) / 2, level.pixel_height(gs) / 2)
             self.state.command_stack.clear()
+            self._open_journal(recover=True)
 
     def _on_save_as(self) -> None:
         """Save project to a new file via file dialog."""
@@ -351,6 +486,8 @@ class App:
         default = f"{self.project.name}.birdlevel"
         path = save_file_dialog(title="Save BirdLevel Project As", initial_dir=initial, default_name=default)
         if path:
+            if self.auto_layer:
+                self.auto_layer.flush()
             try:
                 self.project.file_path = path
                 save_project(self.project, path)
@@ -358,6 +495,8 @@ class App:
                 self.state.needs_save = False
                 self.state.autosave_timer = 0.0
                 self.state.set_notification(f"Saved as: {os.path.basename(path)}")
+                self._close_journal(discard=True)
+                self._open_journal()
             except Exception as e:
                 self.state.set_notification(f"Save As failed: {e}", 5.0)
 
@@ -372,6 +511,8 @@ class App:
     def _on_export(self) -> None:
         if self.project is None:
             return
+        if self.auto_layer:
+            self.auto_layer.flush()
         try:
             base = os.path.dirname(self.project.file_path) if self.project.file_path else os.getcwd()
             export_dir = os.path.join(base, "export")
@@ -393,6 +534,8 @@ class App:
         level.ensure_layer_instances(self.project.definitions.layers)
         world.levels.append(level)
         self.state.set_active_level(idx)
+        self.project.save_state.mark_level(level.uid)
+        self.project.touch()
         self.state.needs_save = True
         self.state.set_notification(f"Created {level.name}")
 
@@ -441,6 +584,8 @@ class App:
             li = level.get_layer_instance(defs[idx].uid)
             if li:
                 li.visible = not li.visible
+                self.project.save_state.mark_level(level.uid)
+                self.project.touch()
                 tag = "visible" if li.visible else "hidden"
                 self.state.set_notification(f"Layer {defs[idx].name}: {tag}")
 
@@ -454,6 +599,8 @@ class App:
             li = level.get_layer_instance(defs[idx].uid)
             if li:
                 li.locked = not li.locked
+                self.project.save_state.mark_level(level.uid)
+                self.project.touch()
                 tag = "locked" if li.locked else "unlocked"
                 self.state.set_notification(f"Layer {defs[idx].name}: {tag}")
 
@@ -468,6 +615,8 @@ class App:
                 self.state.set_active_layer(idx - 1)
             elif self.state.active_layer_idx == idx - 1:
                 self.state.set_active_layer(idx)
+            self.project.save_state.mark_definitions()
+            self.project.touch()
             self.state.needs_save = True
             self.state.set_notification(f"Moved {defs[idx - 1].name} up")
         elif direction == "down" and idx < len(defs) - 1:
@@ -476,6 +625,8 @@ class App:
                 self.state.set_active_layer(idx + 1)
             elif self.state.active_layer_idx == idx + 1:
                 self.state.set_active_layer(idx)
+            self.project.save_state.mark_definitions()
+            self.project.touch()
             self.state.needs_save = True
             self.state.set_notification(f"Moved {defs[idx + 1].name} down")
 
@@ -491,6 +642,8 @@ class App:
         if li is None:
             return
         li.opacity = max(0.0, min(1.0, li.opacity + delta))
+        self.project.save_state.mark_level(level.uid)
+        self.project.touch()
         pct = int(li.opacity * 100)
         self.state.set_notification(f"Layer {ld.name} opacity: {pct}%")
 
@@ -507,15 +660,21 @@ class App:
         name = defs[idx].name
         uid = defs[idx].uid
         defs.pop(idx)
-        # Remove layer instances from all levels
+        # Remove layer instances from all loaded levels (lazy levels are
+        # matched to the definitions when they load)
         for world in self.project.worlds:
             for level in world.levels:
+                if not level.is_loaded:
+                    continue
                 level.layers = [li for li in level.layers if li.layer_def_uid != uid]
         # Fix active layer index
         if self.state.active_layer_idx >= len(defs):
             self.state.set_active_layer(len(defs) - 1)
         elif self.state.active_layer_idx == idx:
             self.state.set_active_layer(max(0, idx - 1))
+        self.project.save_state.mark_definitions()
+        self.project.touch()
+        self._mark_loaded_levels()
         self.state.needs_save = True
         self.state.set_notification(f"Deleted layer: {name}")
 
@@ -537,14 +696,14 @@ class App:
     def _draw_text_field(self, label: str, key: str, inp_rect: pygame.Rect,
                          active_field: str, label_x: int, label_y: int) -> None:
         """Draw a labeled text input with blinking cursor."""
-        lbl = self.font_small.render(label, True, Theme.TEXT)
+        lbl = render_text(self.font_small, label, Theme.TEXT)
         self.screen.blit(lbl, (label_x, label_y))
         is_active = (active_field == key)
         pygame.draw.rect(self.screen, Theme.BG_INPUT, inp_rect, border_radius=3)
         border = Theme.BORDER_FOCUS if is_active else Theme.BORDER
         pygame.draw.rect(self.screen, border, inp_rect, 1, border_radius=3)
         val_text = self._dialog_fields.get(key, "")
-        val = self.font_small.render(val_text, True, Theme.TEXT)
+        val = render_text(self.font_small, val_text, Theme.TEXT)
         self.screen.blit(val, (inp_rect.x + 4, inp_rect.y + 4))
         # Blinking cursor
         if is_active and self._cursor_visible:
@@ -646,12 +805,17 @@ class App:
             ]
 
         self.project.definitions.layers.append(ld)
-        # Add layer instance to all existing levels
+        # Add layer instance to all loaded levels
         for world in self.project.worlds:
             for level in world.levels:
+                if not level.is_loaded:
+                    continue
                 level.ensure_layer_instances(self.project.definitions.layers)
 
         self.state.set_active_layer(len(self.project.definitions.layers) - 1)
+        self.project.save_state.mark_definitions()
+        self.project.touch()
+        self._mark_loaded_levels()
         self.state.needs_save = True
         self.state.set_notification(f"Added layer: {name} [{lt.value}]")
 
@@ -676,7 +840,7 @@ class App:
         pygame.draw.rect(self.screen, Theme.BORDER_LIGHT, dialog_rect, 2, border_radius=8)
 
         # Title
-        title = self.font.render("Add New Layer", True, Theme.TEXT_BRIGHT)
+        title = render_text(self.font, "Add New Layer", Theme.TEXT_BRIGHT)
         self.screen.blit(title, (dialog_rect.x + 20, dialog_rect.y + 12))
 
         # Name input with blinking cursor
@@ -685,7 +849,7 @@ class App:
                               dialog_rect.x + 20, dialog_rect.y + 48)
 
         # Type buttons
-        type_label = self.font_small.render("Type:", True, Theme.TEXT)
+        type_label = render_text(self.font_small, "Type:", Theme.TEXT)
         self.screen.blit(type_label, (dialog_rect.x + 20, dialog_rect.y + 84))
         types = ["IntGrid", "Tiles", "Entity", "AutoLayer"]
         type_colors = [Theme.LAYER_INTGRID, Theme.LAYER_TILES, Theme.LAYER_ENTITY, Theme.LAYER_AUTO]
@@ -699,12 +863,12 @@ class App:
                 pygame.draw.rect(self.screen, c, btn_rect, 2, border_radius=3)
             else:
                 pygame.draw.rect(self.screen, Theme.BORDER, btn_rect, 1, border_radius=3)
-            lbl = self.font_small.render(t, True, Theme.TEXT_BRIGHT if i == current_idx else Theme.TEXT)
+            lbl = render_text(self.font_small, t, Theme.TEXT_BRIGHT if i == current_idx else Theme.TEXT)
             self.screen.blit(lbl, (btn_rect.x + (btn_rect.w - lbl.get_width()) // 2,
                                    btn_rect.y + (btn_rect.h - lbl.get_height()) // 2))
 
         # Hint
-        hint = self.font_small.render("Tab to cycle type, Enter to confirm, Esc to cancel", True, Theme.TEXT_DIM)
+        hint = render_text(self.font_small, "Tab to cycle type, Enter to confirm, Esc to cancel", Theme.TEXT_DIM)
         self.screen.blit(hint, (dialog_rect.x + 20, dialog_rect.y + 130))
 
         # OK / Cancel
@@ -713,7 +877,7 @@ class App:
         for rect, label in [(ok_rect, "OK"), (cancel_rect, "Cancel")]:
             pygame.draw.rect(self.screen, Theme.BG_BUTTON, rect, border_radius=4)
             pygame.draw.rect(self.screen, Theme.BORDER_LIGHT, rect, 1, border_radius=4)
-            lbl = self.font_small.render(label, True, Theme.TEXT)
+            lbl = render_text(self.font_small, label, Theme.TEXT)
             self.screen.blit(lbl, (rect.x + (rect.w - lbl.get_width()) // 2,
                                    rect.y + (rect.h - lbl.get_height()) // 2))
 
@@ -810,7 +974,7 @@ class App:
         pygame.draw.rect(self.screen, Theme.BG_PANEL, dialog_rect, border_radius=8)
         pygame.draw.rect(self.screen, Theme.BORDER_LIGHT, dialog_rect, 2, border_radius=8)
 
-        title = self.font.render("Resize Level", True, Theme.TEXT_BRIGHT)
+        title = render_text(self.font, "Resize Level", Theme.TEXT_BRIGHT)
         self.screen.blit(title, (dialog_rect.x + 20, dialog_rect.y + 12))
 
         af = self._dialog_fields.get("active_field", "width")
@@ -820,7 +984,7 @@ class App:
             self._draw_text_field(label, key, inp_rect, af,
                                   dialog_rect.x + 20, ly + 2)
 
-        hint = self.font_small.render("Tab to switch fields, Enter to confirm", True, Theme.TEXT_DIM)
+        hint = render_text(self.font_small, "Tab to switch fields, Enter to confirm", Theme.TEXT_DIM)
         self.screen.blit(hint, (dialog_rect.x + 20, dialog_rect.y + 120))
 
         ok_rect = pygame.Rect(dialog_rect.x + 80, dialog_rect.y + 155, 80, 30)
@@ -828,7 +992,7 @@ class App:
         for rect, label in [(ok_rect, "OK"), (cancel_rect, "Cancel")]:
             pygame.draw.rect(self.screen, Theme.BG_BUTTON, rect, border_radius=4)
             pygame.draw.rect(self.screen, Theme.BORDER_LIGHT, rect, 1, border_radius=4)
-            lbl = self.font_small.render(label, True, Theme.TEXT)
+            lbl = render_text(self.font_small, label, Theme.TEXT)
             self.screen.blit(lbl, (rect.x + (rect.w - lbl.get_width()) // 2,
                                    rect.y + (rect.h - lbl.get_height()) // 2))
 
@@ -943,6 +1107,8 @@ class App:
                         ld.tileset_uid = tdef.uid
                         break
 
+            self.project.save_state.mark_definitions()
+            self.project.touch()
             self.state.needs_save = True
             self.state.set_notification(f"Imported tileset: {name} ({cols}x{rows} tiles)")
         except Exception as e:
@@ -957,14 +1123,14 @@ class App:
         pygame.draw.rect(self.screen, Theme.BG_PANEL, dialog_rect, border_radius=8)
         pygame.draw.rect(self.screen, Theme.BORDER_LIGHT, dialog_rect, 2, border_radius=8)
 
-        title = self.font.render("Import Tileset", True, Theme.TEXT_BRIGHT)
+        title = render_text(self.font, "Import Tileset", Theme.TEXT_BRIGHT)
         self.screen.blit(title, (dialog_rect.x + 20, dialog_rect.y + 12))
 
         # File path (read-only display)
-        path_lbl = self.font_small.render("File:", True, Theme.TEXT)
+        path_lbl = render_text(self.font_small, "File:", Theme.TEXT)
         self.screen.blit(path_lbl, (dialog_rect.x + 20, dialog_rect.y + 38))
         path_text = os.path.basename(self._dialog_fields.get("path", ""))
-        pt = self.font_small.render(path_text, True, Theme.TEXT_DIM)
+        pt = render_text(self.font_small, path_text, Theme.TEXT_DIM)
         self.screen.blit(pt, (dialog_rect.x + 100, dialog_rect.y + 38))
 
         af = self._dialog_fields.get("active_field", "name")
@@ -974,7 +1140,7 @@ class App:
             self._draw_text_field(label, key, inp_rect, af,
                                   dialog_rect.x + 20, ly + 2)
 
-        hint = self.font_small.render("Tab to switch fields, Enter to confirm", True, Theme.TEXT_DIM)
+        hint = render_text(self.font_small, "Tab to switch fields, Enter to confirm", Theme.TEXT_DIM)
         self.screen.blit(hint, (dialog_rect.x + 20, dialog_rect.y + 140))
 
         ok_rect = pygame.Rect(dialog_rect.x + 100, dialog_rect.y + 175, 80, 30)
@@ -982,7 +1148,7 @@ class App:
         for rect, label in [(ok_rect, "OK"), (cancel_rect, "Cancel")]:
             pygame.draw.rect(self.screen, Theme.BG_BUTTON, rect, border_radius=4)
             pygame.draw.rect(self.screen, Theme.BORDER_LIGHT, rect, 1, border_radius=4)
-            lbl = self.font_small.render(label, True, Theme.TEXT)
+            lbl = render_text(self.font_small, label, Theme.TEXT)
             self.screen.blit(lbl, (rect.x + (rect.w - lbl.get_width()) // 2,
                                    rect.y + (rect.h - lbl.get_height()) // 2))
 
@@ -993,28 +1159,67 @@ class App:
     def run(self) -> None:
         self.running = True
         last_time = time.time()
+        woke_on: pygame.event.Event | None = None
 
         while self.running:
             now = time.time()
             dt = now - last_time
             last_time = now
 
-            self._process_events()
+            self._process_events(woke_on)
             self._update(dt)
             self._render()
 
-            self.clock.tick(FPS_TARGET)
+            if self._is_busy():
+                self.clock.tick(FPS_TARGET)
+                woke_on = None
+            else:
+                # Sleep until input arrives or the next timer is due; dt
+                # above measures the real time slept, so timers stay exact
+                woke_on = self._wait_for_event(self._idle_timeout())
 
+        self._close_journal()
         pygame.quit()
 
-    def _process_events(self) -> None:
+    def _is_busy(self) -> bool:
+        """True while frames must keep coming at full rate."""
+        return (self.damage.pending
+                or any(pygame.mouse.get_pressed())
+                or (self.auto_layer is not None and self.auto_layer.pending))
+
+    def _idle_timeout(self) -> float:
+        """Seconds until the earliest timer that changes what is on screen."""
+        wait = IDLE_WAIT_MAX
+        state = self.state
+        if state.notification_timer > 0:
+            wait = min(wait, state.notification_timer)
+        if state.needs_save and self.project.file_path:
+            wait = min(wait, state.autosave_interval - state.autosave_timer)
+        if self.journal is not None:
+            due = self.journal.sync_due_in
+            if due is not None:
+                wait = min(wait, due)
+        if self._dialog_active:
+            wait = min(wait, 0.5 - self._cursor_blink_timer)
+        return max(0.001, wait)
+
+    def _wait_for_event(self, timeout: float) -> pygame.event.Event | None:
+        event = pygame.event.wait(max(1, int(timeout * 1000)))
+        return None if event.type == pygame.NOEVENT else event
+
+    def _process_events(self, first: pygame.event.Event | None = None) -> None:
         mx, my = pygame.mouse.get_pos()
 
-        for event in pygame.event.get():
+        events = pygame.event.get()
+        if first is not None:
+            events.insert(0, first)
+        for event in events:
             if event.type == pygame.QUIT:
                 self.running = False
                 return
 
+            self._note_event_damage(event)
+
             if event.type == pygame.VIDEORESIZE:
                 # Handle window resize (not typical for 1920x1080 target)
                 pass
@@ -1047,6 +1252,36 @@ class App:
             # Route to input handler
             self.input_handler.handle_event(event, self.state, self.tool_manager, ui_consumed)
 
+    def _note_event_damage(self, event: pygame.event.Event) -> None:
+        """Damage what an input event can change."""
+        if event.type != pygame.MOUSEMOTION or any(event.buttons):
+            # Clicks, keys, drags and window events can change anything
+            self._world_dirty = True
+            self.damage.add_full()
+            return
+        # Plain hover: the regions under the old and new mouse position,
+        # plus the cursor coordinates in the bottom bar
+        for pos in (self._last_mouse, event.pos):
+            region = self._region_at(pos)
+            if region is not None:
+                self.damage.add(region)
+        if self.bottom_bar:
+            self.damage.add(self.bottom_bar.rect)
+        self._last_mouse = event.pos
+
+    def _region_at(self, pos: tuple[int, int]) -> pygame.Rect | None:
+        """The independently redrawn screen region containing pos."""
+        regions = [self.top_bar, self.bottom_bar]
+        if not self.state.panels_collapsed:
+            regions += [dock for dock in (self.left_dock, self.right_dock)
+                        if dock and dock.visible]
+        for ui in regions:
+            if ui and ui.rect.collidepoint(pos):
+                return ui.rect
+        if self.state.camera.viewport.collidepoint(pos):
+            return self.state.camera.viewport
+        return None
+
     def _handle_right_dock_entity_click(self, mx: int, my: int) -> None:
         """Handle entity selection clicks in the right dock."""
         ld = self.state.active_layer_def
@@ -1068,6 +1303,11 @@ class App:
         self.state.update_timers(dt)
         self._update_viewport()
 
+        # Re-solve auto layers around cells edited since last frame
+        if self.auto_layer and self.auto_layer.update():
+            self._world_dirty = True
+            self.damage.add(self.state.camera.viewport)
+
         # Cursor blink for dialog text inputs
         if self._dialog_active:
             self._cursor_blink_timer += dt
@@ -1081,21 +1321,28 @@ class App:
             # Sync tool button toggles with active tool
             active_tool = self.tool_manager.active_tool
             if active_tool:
-                active_tt = active_tool.tool_type
-                for kind, idx, ar, extra in self.left_dock._hit_rects:
-                    if kind == "tool" and idx < len(self.left_dock._tool_buttons):
-                        self.left_dock._tool_buttons[idx].toggled = (extra == active_tt)
+                self.left_dock.sync_tool_toggles(active_tool.tool_type)
 
             # Update hover using hit rects (absolute coords)
             mx, my = pygame.mouse.get_pos()
             self.left_dock.update_hover(mx, my)
 
+        # Journaled edits reach the disk in batches
+        if self.journal is not None:
+            self.journal.maybe_sync()
+
         # Autosave check
         if (self.state.needs_save and
                 self.state.autosave_timer >= self.state.autosave_interval and
                 self.project.file_path):
-            self._on_save()
-            self.state.set_notification("Autosaved")
+            journal = self.journal
+            if journal is not None and journal.is_current and journal.size < MAX_JOURNAL_BYTES:
+                # Every change since the last save is already in the journal
+                journal.sync()
+                self.state.autosave_timer = 0.0
+            else:
+                self._on_save()
+                self.state.set_notification("Autosaved")
 
         # Status text
         tool = self.tool_manager.active_tool
@@ -1107,77 +1354,138 @@ class App:
         else:
             self.state.status_text = "No tool selected"
 
+        self._track_damage()
+
+    def _track_damage(self) -> None:
+        """Damage screen regions whose inputs changed outside of events."""
+        state = self.state
+        cam = state.camera
+        if any(pygame.mouse.get_pressed()):
+            # Strokes paint in place every frame
+            self._world_dirty = True
+            self.damage.add(cam.viewport)
+        if self.damage.watch("world", self._world_key(), cam.viewport):
+            self._world_dirty = True
+        self.damage.watch("layout", (state.panels_collapsed, tuple(cam.viewport)))
+        self.damage.watch("dialog", (self._dialog_active, self._dialog_type,
+                                     self._cursor_visible))
+        if self.top_bar:
+            self.damage.watch("top_bar", (self.project.name,
+                                          state.command_stack.is_dirty),
+                              self.top_bar.rect)
+        if self.bottom_bar:
+            self.damage.watch("bottom_bar", (
+                state.hover_gx, state.hover_gy, int(state.hover_wx), int(state.hover_wy),
+                round(cam.zoom, 1), state.status_text, state.notification,
+                state.needs_save,
+            ), self.bottom_bar.rect)
+
+    def _world_key(self) -> tuple:
+        """Everything the cached canvas depends on besides layer data."""
+        state = self.state
+        cam = state.camera
+        level = state.active_level
+        layers = ()
+        if level is not None:
+            layers = tuple((li.layer_def_uid, li.visible, li.opacity) for li in level.layers)
+        return (cam.offset_x, cam.offset_y, cam.zoom, id(level), layers,
+                state.active_layer_idx, state.show_all_layers, state.show_grid,
+                len(self.project.definitions.layers))
+
     def _render(self) -> None:
-        self.screen.fill(Theme.BG_CANVAS)
+        if not self.damage.pending:
+            return
+        if self._dialog_active:
+            # The dialog dims the whole screen, so redraw what lies under it
+            self.damage.add_full()
+        if self.damage.full:
+            self.screen.fill(Theme.BG_CANVAS)
 
         level = self.state.active_level
-        if level:
-            gs = self.project.grid_size
-
-            # Draw level background
-            sx1, sy1 = self.state.camera.world_to_screen(0, 0)
-            sx2, sy2 = self.state.camera.world_to_screen(
-                level.pixel_width(gs), level.pixel_height(gs))
-            bg_rect = pygame.Rect(int(sx1), int(sy1), int(sx2 - sx1), int(sy2 - sy1))
-            clip = self.screen.get_clip()
-            self.screen.set_clip(self.state.camera.viewport)
-            pygame.draw.rect(self.screen, level.bg_color, bg_rect)
-            self.screen.set_clip(clip)
-
-            # Draw layers (bottom to top)
-            active_ld = self.state.active_layer_def
-            for ld in reversed(self.project.definitions.layers):
-                li = level.get_layer_instance(ld.uid)
-                if li is None:
-                    continue
-                # When not showing all layers, skip non-active
-                if not self.state.show_all_layers and ld != active_ld:
-                    continue
-                # Dim inactive layers for visual focus
-                saved_opacity = li.opacity
-                if self.state.show_all_layers and ld != active_ld:
-                    li.opacity = saved_opacity * 0.35
-                self.layer_renderer.draw_layer(
-                    self.screen, self.state.camera, level, ld, li,
-                    self.project.definitions, self.font_small)
-                li.opacity = saved_opacity
-
-            # Grid overlay
-            if self.state.show_grid:
-                draw_grid(self.screen, self.state.camera, gs,
-                          level.pixel_width(gs), level.pixel_height(gs))
-
-            # Level border
-            draw_level_border(self.screen, self.state.camera,
-                              level.pixel_width(gs), level.pixel_height(gs))
+        viewport = self.state.camera.viewport
+        if level and self.damage.is_damaged(viewport):
+            if self._world_dirty or self._canvas_cache is None \
+                    or self._canvas_cache.get_size() != self.screen.get_size():
+                self._render_world(level)
+            self.screen.blit(self._canvas_cache, viewport, viewport)
 
             # Tool overlay
             tool = self.tool_manager.active_tool
             if tool:
                 old_clip = self.screen.get_clip()
-                self.screen.set_clip(self.state.camera.viewport)
+                self.screen.set_clip(viewport)
                 tool.draw_overlay(self.screen, self.state)
                 self.screen.set_clip(old_clip)
+        elif not level and self.damage.is_damaged(viewport):
+            self.screen.fill(Theme.BG_CANVAS, viewport)
 
         # UI panels
-        if self.top_bar:
+        if self.top_bar and self.damage.is_damaged(self.top_bar.rect):
             self.top_bar.draw(self.screen, self.font,
                               self.project.name, self.state.command_stack.is_dirty)
 
         if not self.state.panels_collapsed:
-            if self.left_dock:
+            if self.left_dock and self.damage.is_damaged(self.left_dock.rect):
                 self.left_dock.draw(self.screen, self.font, self.font_small, self.state)
-            if self.right_dock:
+            if self.right_dock and self.damage.is_damaged(self.right_dock.rect):
                 self.right_dock.draw(self.screen, self.font, self.font_small,
                                      self.state, self.tileset_manager)
 
-        if self.bottom_bar:
+        if self.bottom_bar and self.damage.is_damaged(self.bottom_bar.rect):
             self.bottom_bar.draw(self.screen, self.font_small, self.state)
 
         # Dialog
         self._draw_dialog()
 
-        pygame.display.flip()
+        rects = self.damage.take()
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+
+    def _render_world(self, level: Level) -> None:
+        """Draw the level background, layers, grid and border to the canvas cache."""
+        if self._canvas_cache is None or self._canvas_cache.get_size() != self.screen.get_size():
+            self._canvas_cache = pygame.Surface(self.screen.get_size()).convert()
+        canvas = self._canvas_cache
+        camera = self.state.camera
+        gs = self.project.grid_size
+        canvas.fill(Theme.BG_CANVAS, camera.viewport)
+
+        # Draw level background
+        sx1, sy1 = camera.world_to_screen(0, 0)
+        sx2, sy2 = camera.world_to_screen(level.pixel_width(gs), level.pixel_height(gs))
+        bg_rect = pygame.Rect(int(sx1), int(sy1), int(sx2 - sx1), int(sy2 - sy1))
+        clip = canvas.get_clip()
+        canvas.set_clip(camera.viewport)
+        pygame.draw.rect(canvas, level.bg_color, bg_rect)
+        canvas.set_clip(clip)
+
+        # Draw layers (bottom to top)
+        active_ld = self.state.active_layer_def
+        for ld in reversed(self.project.definitions.layers):
+            li = level.get_layer_instance(ld.uid)
+            if li is None:
+                continue
+            # When not showing all layers, skip non-active
+            if not self.state.show_all_layers and ld != active_ld:
+                continue
+            # Dim inactive layers for visual focus
+            saved_opacity = li.opacity
+            if self.state.show_all_layers and ld != active_ld:
+                li.opacity = saved_opacity * 0.35
+            self.layer_renderer.draw_layer(
+                canvas, camera, level, ld, li,
+                self.project.definitions, self.font_small)
+            li.opacity = saved_opacity
+
+        # Grid overlay
+        if self.state.show_grid:
+            draw_grid(canvas, camera, gs, level.pixel_width(gs), level.pixel_height(gs))
+
+        # Level border
+        draw_level_border(canvas, camera, level.pixel_width(gs), level.pixel_height(gs))
+        self._world_dirty = False
 
 
 def main() -> None:
@@ -28,8 +28,10 @@ from birdlevel.project.models import (
     Level,
     World,
 )
+from birdlevel.render.text_cache import render_text
 
 if TYPE_CHECKING:
+    from birdlevel.assets.tileset_loader import TilesetManager
     from birdlevel.editor.editor_state import EditorState
 
 
@@ -80,7 +82,7 @@ class TopBar:
 
         # Project name + dirty indicator
         name_text = project_name + (" *" if is_dirty else "")
-        name_lbl = font.render(name_text, True, Theme.TEXT_ACCENT)
+        name_lbl = render_text(font, name_text, Theme.TEXT_ACCENT)
         surface.blit(name_lbl, (self.rect.right - name_lbl.get_width() - 12,
                                 (self.rect.h - name_lbl.get_height()) // 2))
 
@@ -104,22 +106,22 @@ class BottomBar:
 
         # Coordinates
         coord_text = f"Grid: ({state.hover_gx}, {state.hover_gy})  World: ({state.hover_wx:.0f}, {state.hover_wy:.0f})  Zoom: {state.camera.zoom:.1f}x"
-        coord_lbl = font.render(coord_text, True, Theme.TEXT_DIM)
+        coord_lbl = render_text(font, coord_text, Theme.TEXT_DIM)
         surface.blit(coord_lbl, (self.rect.x + 8, self.rect.y + 5))
 
         # Status
-        status_lbl = font.render(state.status_text, True, Theme.TEXT)
+        status_lbl = render_text(font, state.status_text, Theme.TEXT)
         surface.blit(status_lbl, (self.rect.x + 400, self.rect.y + 5))
 
         # Notification
         if state.notification:
-            notif_lbl = font.render(state.notification, True, Theme.TEXT_SUCCESS)
+            notif_lbl = render_text(font, state.notification, Theme.TEXT_SUCCESS)
             surface.blit(notif_lbl, (self.rect.right - notif_lbl.get_width() - 12,
                                      self.rect.y + 5))
 
         # Autosave indicator
         if state.needs_save:
-            save_lbl = font.render("Unsaved", True, Theme.TEXT_WARNING)
+            save_lbl = render_text(font, "Unsaved", Theme.TEXT_WARNING)
             surface.blit(save_lbl, (self.rect.right - save_lbl.get_width() - 150,
                                     self.rect.y + 5))
 
@@ -144,11 +146,14 @@ class LeftDock:
         self._level_items: list[ListItem] = []
         self._layer_items: list[ListItem] = []
         self._tool_buttons: list[Button] = []
+        self._tool_types: list[Any] = []  # ToolType per entry of _tool_buttons
         self._intgrid_swatches: list[tuple[ColorSwatch, Label]] = []
 
         # Layout rects computed once by _layout(), used by draw and handle_event
         # Each entry: (kind, index, abs_rect, extra_data)
         self._hit_rects: list[tuple[str, int, pygame.Rect, Any]] = []
+        # Version stamps the current layout was built from (see rebuild)
+        self._built_for: tuple | None = None
 
         self._on_select_level: Callable | None = None
         self._on_select_layer: Callable | None = None
@@ -171,11 +176,26 @@ class LeftDock:
         self._on_change_layer_opacity = callbacks.get("change_layer_opacity")
         self._on_delete_layer = callbacks.get("delete_layer")
 
-    def rebuild(self, state: EditorState) -> None:
-        """Rebuild the list items and compute layout rects."""
+    def invalidate(self) -> None:
+        """Force the next rebuild() to lay the dock out again."""
+        self._built_for = None
+
+    def rebuild(self, state: EditorState) -> bool:
+        """Rebuild the list items and compute layout rects.
+
+        Does nothing unless the project structure, the selection or the
+        IntGrid value changed since the last rebuild.  Returns True if it
+        rebuilt.
+        """
+        key = (id(state.project), state.project.version, state.version, state.intgrid_value)
+        if key == self._built_for:
+            return False
+        self._built_for = key
+
         self._level_items.clear()
         self._layer_items.clear()
         self._tool_buttons.clear()
+        self._tool_types.clear()
         self._intgrid_swatches.clear()
         self._hit_rects.clear()
 
@@ -240,6 +260,7 @@ class LeftDock:
         for idx, (label, tt) in enumerate(tool_list):
             btn = Button(0, 0, bw, Theme.BUTTON_HEIGHT, label=label, toggle=True)
             self._tool_buttons.append(btn)
+            self._tool_types.append(tt)
             self._hit_rects.append(("tool", idx, pygame.Rect(bx, y, bw, Theme.BUTTON_HEIGHT), tt))
             bx += bw + 2
             if bx + bw > self.rect.right - Theme.PANEL_PADDING:
@@ -258,6 +279,12 @@ class LeftDock:
                 self._intgrid_swatches.append((swatch, lbl))
                 self._hit_rects.append(("intgrid_val", vd.value, pygame.Rect(px, y, w, 20), None))
                 y += self.SWATCH_ROW_H
+        return True
+
+    def sync_tool_toggles(self, active_tool_type: Any) -> None:
+        """Show the active tool's button as toggled on."""
+        for btn, tt in zip(self._tool_buttons, self._tool_types):
+            btn.toggled = (tt == active_tool_type)
 
     @staticmethod
     def _get_tool_list(active_ld) -> list:
@@ -407,7 +434,7 @@ class LeftDock:
         y = self.rect.y + 4
 
         # ---- LEVELS ----
-        hdr = font.render("LEVELS", True, Theme.TEXT_ACCENT)
+        hdr = render_text(font, "LEVELS", Theme.TEXT_ACCENT)
         surface.blit(hdr, (px, y))
         y += self.SECTION_HEADER_H
         for item in self._level_items:
@@ -416,14 +443,14 @@ class LeftDock:
                 pygame.draw.rect(surface, Theme.BG_SELECTED, ar)
             elif item._hovered:
                 pygame.draw.rect(surface, Theme.BG_HOVER, ar)
-            lbl = font_small.render(item.text, True, Theme.TEXT_BRIGHT if item.selected else Theme.TEXT)
+            lbl = render_text(font_small, item.text, Theme.TEXT_BRIGHT if item.selected else Theme.TEXT)
             surface.blit(lbl, (ar.x + Theme.PANEL_PADDING, ar.y + 4))
             y += Theme.ITEM_HEIGHT
 
         y += 8
 
         # ---- LAYERS ----
-        hdr = font.render("LAYERS", True, Theme.TEXT_ACCENT)
+        hdr = render_text(font, "LAYERS", Theme.TEXT_ACCENT)
         surface.blit(hdr, (px, y))
         y += self.SECTION_HEADER_H
         level = state.active_level
@@ -438,7 +465,7 @@ class LeftDock:
                 ind_rect = pygame.Rect(ar.x + 4, ar.y + 6, 12, 14)
                 pygame.draw.rect(surface, item.indicator_color, ind_rect, border_radius=2)
                 text_x = ar.x + 22
-            lbl = font_small.render(item.text, True, Theme.TEXT_BRIGHT if item.selected else Theme.TEXT)
+            lbl = render_text(font_small, item.text, Theme.TEXT_BRIGHT if item.selected else Theme.TEXT)
             surface.blit(lbl, (text_x, ar.y + 4))
 
             # Layer control buttons (right side): eye, lock, up, down, delete
@@ -477,7 +504,7 @@ class LeftDock:
             ali = level.get_layer_instance(state.active_layer_def.uid)
             if ali:
                 opacity_pct = int(ali.opacity * 100)
-                olbl = font_small.render(f"Opacity: {opacity_pct}%", True, Theme.TEXT_DIM)
+                olbl = render_text(font_small, f"Opacity: {opacity_pct}%", Theme.TEXT_DIM)
                 surface.blit(olbl, (px, y + 2))
                 btn_w = 22
                 btn_h = 18
@@ -491,7 +518,7 @@ class LeftDock:
         y += 8
 
         # ---- TOOLS ----
-        hdr = font.render("TOOLS", True, Theme.TEXT_ACCENT)
+        hdr = render_text(font, "TOOLS", Theme.TEXT_ACCENT)
         surface.blit(hdr, (px, y))
         y += self.SECTION_HEADER_H
         bx = px
@@ -500,7 +527,7 @@ class LeftDock:
             bg = Theme.BG_BUTTON_ACTIVE if btn.toggled else (Theme.BG_BUTTON_HOVER if btn._hovered else Theme.BG_BUTTON)
             pygame.draw.rect(surface, bg, ar, border_radius=3)
             pygame.draw.rect(surface, Theme.BORDER_LIGHT, ar, 1, border_radius=3)
-            blbl = font_small.render(btn.label, True, Theme.TEXT_BRIGHT if btn.toggled else Theme.TEXT)
+            blbl = render_text(font_small, btn.label, Theme.TEXT_BRIGHT if btn.toggled else Theme.TEXT)
             surface.blit(blbl, (ar.x + (ar.w - blbl.get_width()) // 2,
                                 ar.y + (ar.h - blbl.get_height()) // 2))
             bx += btn.rect.w + 2
@@ -513,7 +540,7 @@ class LeftDock:
         # ---- VALUES (IntGrid palette) ----
         active_ld = state.active_layer_def
         if active_ld and active_ld.layer_type == LayerType.INTGRID:
-            hdr = font.render("VALUES", True, Theme.TEXT_ACCENT)
+            hdr = render_text(font, "VALUES", Theme.TEXT_ACCENT)
             surface.blit(hdr, (px, y))
             y += self.SECTION_HEADER_H
             for swatch, lbl in self._intgrid_swatches:
@@ -524,7 +551,7 @@ class LeftDock:
                     pygame.draw.rect(surface, Theme.BORDER_FOCUS, swatch_rect, 2, border_radius=2)
                 else:
                     pygame.draw.rect(surface, Theme.BORDER, swatch_rect, 1, border_radius=2)
-                vlbl = font_small.render(lbl.text, True, Theme.TEXT)
+                vlbl = render_text(font_small, lbl.text, Theme.TEXT)
                 surface.blit(vlbl, (sx + 24, y + 1))
                 y += self.SWATCH_ROW_H
 
@@ -535,7 +562,7 @@ class LeftDock:
                        rect: pygame.Rect, text: str, color: tuple) -> None:
         pygame.draw.rect(surface, Theme.BG_BUTTON, rect, border_radius=2)
         pygame.draw.rect(surface, Theme.BORDER, rect, 1, border_radius=2)
-        lbl = font.render(text, True, color)
+        lbl = render_text(font, text, color)
         surface.blit(lbl, (rect.x + (rect.w - lbl.get_width()) // 2,
                            rect.y + (rect.h - lbl.get_height()) // 2))
 
@@ -564,6 +591,8 @@ class RightDock:
         self._tile_display_size: int = 0
         self._tile_grid_cols: int = 0
         self._tile_grid_rows: int = 0
+        # Pre-rendered tileset for the picker: (key, tileset image, sheet)
+        self._tile_sheet: tuple[tuple, pygame.Surface | None, pygame.Surface | None] | None = None
 
         # Drag selection state for stamp
         self._drag_selecting: bool = False
@@ -630,12 +659,10 @@ class RightDock:
             # Shift+click: toggle tile in random pool
             if mods & pygame.KMOD_SHIFT:
                 tid = row * self._tile_grid_cols + col
-                if tid in state.random_tiles:
-                    state.random_tiles.remove(tid)
-                    state.set_notification(f"Removed tile #{tid} from random pool ({len(state.random_tiles)} tiles)")
-                else:
-                    state.random_tiles.append(tid)
+                if state.toggle_random_tile(tid):
                     state.set_notification(f"Added tile #{tid} to random pool ({len(state.random_tiles)} tiles)")
+                else:
+                    state.set_notification(f"Removed tile #{tid} from random pool ({len(state.random_tiles)} tiles)")
                 return True
 
             # Normal click: start drag selection (for stamp) or single select
@@ -721,13 +748,13 @@ class RightDock:
     def _draw_tile_picker(self, surface: pygame.Surface, font: pygame.font.Font,
                           font_small: pygame.font.Font, state: EditorState,
                           tileset_manager: object | None, start_y: int) -> None:
-        hdr = font.render("TILE PICKER", True, Theme.TEXT_ACCENT)
+        hdr = render_text(font, "TILE PICKER", Theme.TEXT_ACCENT)
         surface.blit(hdr, (self.rect.x + Theme.PANEL_PADDING, start_y))
         y = start_y + 22
 
         ld = state.active_layer_def
         if ld is None or ld.tileset_uid is None:
-            info = font_small.render("No tileset assigned", True, Theme.TEXT_DIM)
+            info = render_text(font_small, "No tileset assigned", Theme.TEXT_DIM)
             surface.blit(info, (self.rect.x + Theme.PANEL_PADDING, y))
             return
 
@@ -741,7 +768,7 @@ class RightDock:
         ts_uid = ld.tileset_uid
         cols, rows = tileset_manager.get_dimensions(ts_uid)
         if cols == 0:
-            info = font_small.render("Tileset not loaded", True, Theme.TEXT_WARNING)
+            info = render_text(font_small, "Tileset not loaded", Theme.TEXT_WARNING)
             surface.blit(info, (self.rect.x + Theme.PANEL_PADDING, y))
             return
 
@@ -755,12 +782,12 @@ class RightDock:
             info_parts.append(f"Stamp: {sw}x{sh}")
         if state.random_tiles:
             info_parts.append(f"Rnd: {len(state.random_tiles)}")
-        sel_lbl = font_small.render("  |  ".join(info_parts), True, Theme.TEXT)
+        sel_lbl = render_text(font_small, "  |  ".join(info_parts), Theme.TEXT)
         surface.blit(sel_lbl, (self.rect.x + Theme.PANEL_PADDING, y))
         y += 18
 
         # Hint line
-        hint = font_small.render("Drag=stamp  Shift+click=random", True, Theme.TEXT_DIM)
+        hint = render_text(font_small, "Drag=stamp  Shift+click=random", Theme.TEXT_DIM)
         surface.blit(hint, (self.rect.x + Theme.PANEL_PADDING, y))
         y += 14
 
@@ -790,31 +817,34 @@ class RightDock:
             stamp_r1 = min(self._drag_start_row, self._drag_end_row)
             stamp_r2 = max(self._drag_start_row, self._drag_end_row)
 
-        # Draw tile grid
-        for row in range(rows):
-            for col in range(cols):
-                tid = row * cols + col
-                tx = ox + col * tile_display_size
-                ty = oy + row * tile_display_size
-                if ty + tile_display_size < self.rect.y or ty > self.rect.bottom:
-                    continue
-                tile_surf = tileset_manager.get_tile(ts_uid, tid)
-                if tile_surf:
-                    scaled = pygame.transform.scale(tile_surf, (tile_display_size, tile_display_size))
-                    surface.blit(scaled, (tx, ty))
-                else:
-                    pygame.draw.rect(surface, Theme.BG_INPUT,
-                                     (tx, ty, tile_display_size, tile_display_size))
-
-                # Highlight: random pool tiles (green border)
-                if tid in state.random_tiles:
-                    pygame.draw.rect(surface, Theme.TEXT_SUCCESS,
-                                     (tx, ty, tile_display_size, tile_display_size), 2)
-
-                # Highlight: selected single tile (accent border)
-                if tid == state.selected_tile_id and stamp_c1 == -1:
-                    pygame.draw.rect(surface, Theme.ACCENT,
-                                     (tx, ty, tile_display_size, tile_display_size), 2)
+        # Draw the scrolled window of the pre-rendered tile grid
+        sheet = self._get_tile_sheet(tileset_manager, ts_uid, tile_display_size)
+        if sheet is not None:
+            src_y0 = max(0, self.rect.y - oy)
+            src_y1 = min(sheet.get_height(), self.rect.bottom - oy)
+            if src_y1 > src_y0:
+                surface.blit(sheet, (ox, oy + src_y0),
+                             (0, src_y0, sheet.get_width(), src_y1 - src_y0))
+
+        # Only tiles in the visible rows need highlights
+        first_row = max(0, (self.rect.y - oy) // tile_display_size)
+        last_row = min(rows - 1, (self.rect.bottom - oy) // tile_display_size)
+        first_tid = first_row * cols
+        last_tid = (last_row + 1) * cols
+
+        def tile_rect(tid: int) -> tuple[int, int, int, int]:
+            row, col = divmod(tid, cols)
+            return (ox + col * tile_display_size, oy + row * tile_display_size,
+                    tile_display_size, tile_display_size)
+
+        # Highlight: random pool tiles (green border)
+        for tid in state.random_tile_set:
+            if first_tid <= tid < last_tid:
+                pygame.draw.rect(surface, Theme.TEXT_SUCCESS, tile_rect(tid), 2)
+
+        # Highlight: selected single tile (accent border)
+        if stamp_c1 == -1 and first_tid <= state.selected_tile_id < last_tid:
+            pygame.draw.rect(surface, Theme.ACCENT, tile_rect(state.selected_tile_id), 2)
 
         # Draw stamp/drag selection rectangle overlay
         if stamp_c1 >= 0:
@@ -828,10 +858,20 @@ class RightDock:
             pygame.draw.rect(surface, Theme.ACCENT,
                              (sx, sy, sw, sh), 2)
 
+    def _get_tile_sheet(self, tileset_manager: TilesetManager, ts_uid: str,
+                        size: int) -> pygame.Surface | None:
+        """The tileset rendered at the picker's tile size, rebuilt on change."""
+        img = tileset_manager.get_surface(ts_uid)
+        key = (ts_uid, size, tileset_manager.get_dimensions(ts_uid))
+        if self._tile_sheet is None or self._tile_sheet[0] != key or self._tile_sheet[1] is not img:
+            sheet = tileset_manager.render_sheet(ts_uid, size, Theme.BG_INPUT)
+            self._tile_sheet = (key, img, sheet)
+        return self._tile_sheet[2]
+
     def _draw_entity_list(self, surface: pygame.Surface, font: pygame.font.Font,
                           font_small: pygame.font.Font, state: EditorState,
                           start_y: int) -> None:
-        hdr = font.render("ENTITIES", True, Theme.TEXT_ACCENT)
+        hdr = render_text(font, "ENTITIES", Theme.TEXT_ACCENT)
         surface.blit(hdr, (self.rect.x + Theme.PANEL_PADDING, start_y))
         y = start_y + 22
 
@@ -846,14 +886,14 @@ class RightDock:
             ind = pygame.Rect(item_rect.x + 2, item_rect.y + 5, 14, 14)
             pygame.draw.rect(surface, edef.color, ind, border_radius=2)
 
-            lbl = font_small.render(edef.name, True, Theme.TEXT_BRIGHT if selected else Theme.TEXT)
+            lbl = render_text(font_small, edef.name, Theme.TEXT_BRIGHT if selected else Theme.TEXT)
             surface.blit(lbl, (item_rect.x + 20, item_rect.y + 4))
             y += Theme.ITEM_HEIGHT
 
     def _draw_intgrid_info(self, surface: pygame.Surface, font: pygame.font.Font,
                            font_small: pygame.font.Font, state: EditorState,
                            start_y: int) -> None:
-        hdr = font.render("INTGRID INFO", True, Theme.TEXT_ACCENT)
+        hdr = render_text(font, "INTGRID INFO", Theme.TEXT_ACCENT)
         surface.blit(hdr, (self.rect.x + Theme.PANEL_PADDING, start_y))
         y = start_y + 22
 
@@ -868,7 +908,7 @@ class RightDock:
             info_lines.append(f"Grid size: {ld.grid_size}px")
 
         for line in info_lines:
-            lbl = font_small.render(line, True, Theme.TEXT)
+            lbl = render_text(font_small, line, Theme.TEXT)
             surface.blit(lbl, (self.rect.x + Theme.PANEL_PADDING, y))
             y += 18
 
@@ -881,7 +921,7 @@ class RightDock:
         edef = state.project.definitions.entity_by_uid(ent.def_uid)
         y = self.rect.y + self.rect.h // 2
 
-        hdr = font.render("PROPERTIES", True, Theme.TEXT_ACCENT)
+        hdr = render_text(font, "PROPERTIES", Theme.TEXT_ACCENT)
         surface.blit(hdr, (self.rect.x + Theme.PANEL_PADDING, y))
         y += 22
 
@@ -891,7 +931,7 @@ class RightDock:
             f"Size: {ent.width}x{ent.height}",
         ]
         for p in props:
-            lbl = font_small.render(p, True, Theme.TEXT)
+            lbl = render_text(font_small, p, Theme.TEXT)
             surface.blit(lbl, (self.rect.x + Theme.PANEL_PADDING, y))
             y += 18
 
@@ -899,6 +939,6 @@ class RightDock:
         if ent.fields:
             for key, val in ent.fields.items():
                 field_text = f"{key}: {val}"
-                flbl = font_small.render(field_text, True, Theme.TEXT_DIM)
+                flbl = render_text(font_small, field_text, Theme.TEXT_DIM)
                 surface.blit(flbl, (self.rect.x + Theme.PANEL_PADDING, y))
                 y += 18
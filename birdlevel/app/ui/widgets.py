@@ -6,6 +6,7 @@ from typing import Any, Callable
 import pygame
 
 from birdlevel.app.ui.theme import Theme
+from birdlevel.render.text_cache import render_text
 
 
 class UIEvent:
@@ -87,7 +88,7 @@ class Panel(Widget):
         if self.title:
             header_rect = pygame.Rect(ar.x, ar.y, ar.w, Theme.ITEM_HEIGHT)
             pygame.draw.rect(surface, Theme.BG_HEADER, header_rect)
-            label = font.render(self.title, True, Theme.TEXT_BRIGHT)
+            label = render_text(font, self.title, Theme.TEXT_BRIGHT)
             surface.blit(label, (ar.x + Theme.PANEL_PADDING, ar.y + 4))
             y_off = Theme.ITEM_HEIGHT
 
@@ -150,7 +151,7 @@ class Button(Widget):
             bg = Theme.BG_BUTTON
         pygame.draw.rect(surface, bg, ar, border_radius=3)
         pygame.draw.rect(surface, Theme.BORDER_LIGHT, ar, 1, border_radius=3)
-        label = font.render(self.label, True, Theme.TEXT_BRIGHT if self.toggled else Theme.TEXT)
+        label = render_text(font, self.label, Theme.TEXT_BRIGHT if self.toggled else Theme.TEXT)
         lx = ar.x + (ar.w - label.get_width()) // 2
         ly = ar.y + (ar.h - label.get_height()) // 2
         surface.blit(label, (lx, ly))
@@ -187,7 +188,7 @@ class Label(Widget):
         if not self.visible:
             return
         ar = self.abs_rect
-        label = font.render(self.text, True, self.color)
+        label = render_text(font, self.text, self.color)
         surface.blit(label, (ar.x, ar.y + 2))
 
 
@@ -219,7 +220,7 @@ class ListItem(Widget):
             pygame.draw.rect(surface, self.indicator_color, ind_rect, border_radius=2)
             text_x = ar.x + 22
 
-        label = font.render(self.text, True, Theme.TEXT_BRIGHT if self.selected else Theme.TEXT)
+        label = render_text(font, self.text, Theme.TEXT_BRIGHT if self.selected else Theme.TEXT)
         surface.blit(label, (text_x, ar.y + 4))
 
     def handle_event(self, event: pygame.event.Event, mx: int, my: int) -> bool:
@@ -254,7 +255,7 @@ class TextInput(Widget):
         pygame.draw.rect(surface, border, ar, 1, border_radius=3)
 
         # Text
-        label = font.render(self.text, True, Theme.TEXT)
+        label = render_text(font, self.text, Theme.TEXT)
         surface.blit(label, (ar.x + 4, ar.y + 3))
 
         # Cursor
@@ -408,7 +409,7 @@ class Checkbox(Widget):
         pygame.draw.rect(surface, Theme.BORDER_LIGHT, box, 1, border_radius=2)
         if self.checked:
             pygame.draw.rect(surface, Theme.ACCENT, box.inflate(-4, -4), border_radius=1)
-        lbl = font.render(self.label, True, Theme.TEXT)
+        lbl = render_text(font, self.label, Theme.TEXT)
         surface.blit(lbl, (ar.x + 22, ar.y + 4))
 
     def handle_event(self, event: pygame.event.Event, mx: int, my: int) -> bool:
@@ -449,7 +450,7 @@ class DropdownSelect(Widget):
         pygame.draw.rect(surface, bg, ar, border_radius=3)
         pygame.draw.rect(surface, Theme.BORDER_LIGHT, ar, 1, border_radius=3)
 
-        lbl = font.render(self.selected_text, True, Theme.TEXT)
+        lbl = render_text(font, self.selected_text, Theme.TEXT)
         surface.blit(lbl, (ar.x + 6, ar.y + 3))
 
         # Arrow
@@ -470,7 +471,7 @@ class DropdownSelect(Widget):
                                         ar.w, Theme.ITEM_HEIGHT)
                 if i == self.selected:
                     pygame.draw.rect(surface, Theme.BG_SELECTED, item_rect)
-                opt_lbl = font.render(opt, True, Theme.TEXT)
+                opt_lbl = render_text(font, opt, Theme.TEXT)
                 surface.blit(opt_lbl, (item_rect.x + 6, item_rect.y + 3))
 
     def handle_event(self, event: pygame.event.Event, mx: int, my: int) -> bool:
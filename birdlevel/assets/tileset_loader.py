@@ -2,11 +2,15 @@
 from __future__ import annotations
 
 import os
+from collections import OrderedDict
 
 import pygame
 
 from birdlevel.project.models import Definitions, TilesetDef
 
+# Memory allowed for scaled tile copies before least recently used sizes go
+DEFAULT_SCALED_BUDGET_BYTES = 64 * 1024 * 1024
+
 
 class TilesetManager:
     """Loads, caches, and provides access to tileset images and tile sub-surfaces."""
@@ -18,7 +22,13 @@ class TilesetManager:
         self.tile_cache: dict[tuple[str, int], pygame.Surface] = {}
         # tileset_uid -> (columns, rows)
         self.dimensions: dict[str, tuple[int, int]] = {}
+        # tileset_uid -> (tile_size, spacing, margin) of the loaded image
+        self.layouts: dict[str, tuple[int, int, int]] = {}
         self.base_path: str = ""
+        # (tileset_uid, size) -> {tile_id: tile scaled to size x size}, LRU order
+        self.scaled_cache: OrderedDict[tuple[str, int], dict[int, pygame.Surface]] = OrderedDict()
+        self.scaled_budget_bytes = DEFAULT_SCALED_BUDGET_BYTES
+        self._scaled_bytes = 0
 
     def set_base_path(self, path: str) -> None:
         """Set the base directory for resolving relative tileset paths."""
@@ -48,11 +58,13 @@ class TilesetManager:
         tdef.columns = cols
         tdef.rows = rows
         self.dimensions[tdef.uid] = (cols, rows)
+        self.layouts[tdef.uid] = (ts, sp, mg)
 
         # Clear old cache for this tileset
         keys_to_remove = [k for k in self.tile_cache if k[0] == tdef.uid]
         for k in keys_to_remove:
             del self.tile_cache[k]
+        self.invalidate_scaled(tdef.uid)
 
         for row in range(rows):
             for col in range(cols):
@@ -75,6 +87,74 @@ class TilesetManager:
     def get_tile(self, tileset_uid: str, tile_id: int) -> pygame.Surface | None:
         return self.tile_cache.get((tileset_uid, tile_id))
 
+    def get_scaled_tile(self, tileset_uid: str, tile_id: int,
+                        size: int) -> pygame.Surface | None:
+        """Tile scaled to size x size, cached per (tileset, size).
+
+        The returned surface is shared: copy it before changing its alpha.
+        """
+        tile = self.tile_cache.get((tileset_uid, tile_id))
+        if tile is None or tile.get_size() == (size, size):
+            return tile
+        key = (tileset_uid, size)
+        tiles = self.scaled_cache.get(key)
+        if tiles is None:
+            tiles = self.scaled_cache[key] = {}
+        else:
+            self.scaled_cache.move_to_end(key)
+        surf = tiles.get(tile_id)
+        if surf is None:
+            surf = pygame.transform.scale(tile, (size, size))
+            tiles[tile_id] = surf
+            self._scaled_bytes += size * size * surf.get_bytesize()
+            self._evict_scaled(keep=key)
+        return surf
+
+    def render_sheet(self, tileset_uid: str, size: int,
+                     missing_color: tuple[int, int, int] | None = None) -> pygame.Surface | None:
+        """The whole tileset re-laid out as a grid of size x size tiles.
+
+        Tiles that could not be sliced are filled with missing_color (left
+        transparent if None).  Returns None if the tileset is not loaded.
+        """
+        img = self.surfaces.get(tileset_uid)
+        if img is None:
+            return None
+        cols, rows = self.get_dimensions(tileset_uid)
+        ts, sp, mg = self.layouts[tileset_uid]
+        if sp == 0 and mg == 0 and cols * ts <= img.get_width() and rows * ts <= img.get_height():
+            # Tiles are packed edge to edge: one scale keeps their borders on
+            # exact multiples of size
+            packed = img.subsurface((0, 0, cols * ts, rows * ts))
+            return pygame.transform.scale(packed, (cols * size, rows * size))
+        sheet = pygame.Surface((cols * size, rows * size), pygame.SRCALPHA)
+        for tid in range(cols * rows):
+            row, col = divmod(tid, cols)
+            tile = self.tile_cache.get((tileset_uid, tid))
+            if tile is not None:
+                sheet.blit(pygame.transform.scale(tile, (size, size)), (col * size, row * size))
+            elif missing_color is not None:
+                sheet.fill(missing_color, (col * size, row * size, size, size))
+        return sheet
+
+    def invalidate_scaled(self, tileset_uid: str | None = None) -> None:
+        """Drop scaled copies of one tileset, or of all tilesets."""
+        for key in list(self.scaled_cache):
+            if tileset_uid is None or key[0] == tileset_uid:
+                self._drop_scaled(key)
+
+    def _drop_scaled(self, key: tuple[str, int]) -> None:
+        tiles = self.scaled_cache.pop(key)
+        self._scaled_bytes -= sum(s.get_width() * s.get_height() * s.get_bytesize()
+                                  for s in tiles.values())
+
+    def _evict_scaled(self, keep: tuple[str, int]) -> None:
+        for key in list(self.scaled_cache):
+            if self._scaled_bytes <= self.scaled_budget_bytes:
+                return
+            if key != keep:
+                self._drop_scaled(key)
+
     def get_surface(self, tileset_uid: str) -> pygame.Surface | None:
         return self.surfaces.get(tileset_uid)
 
@@ -0,0 +1,62 @@
+"""Headless command line tools (no window needed).
+
+    python -m birdlevel solve PROJECT [--workers N] [--export FILE]
+
+solve re-runs every auto-layer rule of every level on a process pool, saves
+the project and optionally writes the full JSON export.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from birdlevel.project.models import Project
+from birdlevel.project.serialization import load_project, save_project
+from birdlevel.rules.parallel import solve_all_parallel
+
+
+def rebuild_auto_layers(project: Project, max_workers: int | None = None,
+                        save: bool = True) -> int:
+    """Solve all auto layers of all levels; returns the number of levels.
+
+    Lazily loaded levels are solved in batches of the level store's
+    capacity, each saved before the next is loaded so memory stays bounded.
+    """
+    levels = [level for world in project.worlds for level in world.levels]
+    store = project.level_store
+    batch = max(1, store.capacity) if store is not None else max(1, len(levels))
+    for i in range(0, len(levels), batch):
+        part = levels[i:i + batch]
+        solve_all_parallel(project.definitions, part, max_workers=max_workers)
+        for level in part:
+            project.save_state.mark_level(level.uid)
+        if save and store is not None:
+            save_project(project)
+    if save and store is None:
+        save_project(project)
+    return len(levels)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m birdlevel")
+    commands = parser.add_subparsers(dest="command", required=True)
+    solve = commands.add_parser("solve", help="rebuild all auto layers and save")
+    solve.add_argument("project", help="project file")
+    solve.add_argument("--workers", type=int, default=None,
+                       help="worker processes (default: one per CPU, 1 = no pool)")
+    solve.add_argument("--export", metavar="FILE", default=None,
+                       help="also write the full JSON export to FILE")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    project = load_project(args.project)
+    loaded = time.perf_counter()
+    count = rebuild_auto_layers(project, max_workers=args.workers)
+    solved = time.perf_counter()
+    print(f"Solved {count} level(s) in {solved - loaded:.2f}s "
+          f"(load {loaded - start:.2f}s, save included)")
+    if args.export:
+        from birdlevel.export.json_export import export_full_json
+        path = export_full_json(project, args.export)
+        print(f"Exported: {path}")
+    return 0
@@ -4,10 +4,15 @@ Every edit is wrapped in a Command object that knows how to apply and revert its
 """
 from __future__ import annotations
 
+import time
 from abc import ABC, abstractmethod
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Callable, Iterable
 
+from birdlevel.editor.deltas import COMMAND_OVERHEAD_BYTES, CellDelta, PackedGrid
+from birdlevel.editor.flood_fill import Run, fill_runs, flood_region, run_cells, run_length
+from birdlevel.project.grid import Grid
 from birdlevel.project.models import (
     EntityInstance,
     LayerInstance,
@@ -16,6 +21,22 @@ from birdlevel.project.models import (
 )
 
 
+# Default memory budget of the undo history
+DEFAULT_HISTORY_BYTES = 64 * 1024 * 1024
+
+# Small commands pushed this soon after the previous one are merged into it
+COALESCE_WINDOW = 0.5
+# Commands up to this many cells count as small for coalescing
+COALESCE_MAX_CELLS = 16
+# ...and a coalesced entry stops growing past this many
+COALESCE_LIMIT_CELLS = 4096
+
+# Approximate cost of one (x, y, value) cell plus its old value, before packing
+_CELL_TUPLE_BYTES = 80
+# Approximate cost of one (y, x0, x1) flood fill run
+_RUN_TUPLE_BYTES = 72
+
+
 class Command(ABC):
     """Base class for undoable commands."""
 
@@ -30,23 +51,125 @@ class Command(ABC):
     def description(self) -> str:
         return self.__class__.__name__
 
+    def dirty_cells(self) -> tuple[LayerInstance, list[tuple[int, int]]] | None:
+        """IntGrid cells this command changes (same set for execute and undo).
+
+        Used to re-solve auto layers incrementally; None means no IntGrid edit.
+        """
+        return None
+
+    def compact(self) -> None:
+        """Pack the undo data into its compact form once the command is applied."""
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the command, for the history budget."""
+        return COMMAND_OVERHEAD_BYTES
+
+    def merge(self, later: Command) -> bool:
+        """Absorb later, applied right after this command, into it.
+
+        Returns False (the default) if the two cannot be combined; later
+        is then recorded as its own history entry.
+        """
+        return False
+
 
 class CommandStack:
-    """Manages undo/redo history."""
+    """Manages undo/redo history.
+
+    History is bounded both by count (max_history) and by the approximate
+    memory its commands hold (max_bytes); the oldest commands go first.
+    Small edits pushed in quick succession (single brush dabs) are merged
+    into one entry, so one undo reverts the burst.
 
-    def __init__(self, max_history: int = 200):
-        self.undo_stack: list[Command] = []
+    An optional journal (see birdlevel.editor.journal) is told about every
+    change to the history so it can be written to disk as it happens.
+    """
+
+    def __init__(self, max_history: int = 200, max_bytes: int = DEFAULT_HISTORY_BYTES):
+        self.undo_stack: deque[Command] = deque()
         self.redo_stack: list[Command] = []
         self.max_history = max_history
+        self.max_bytes = max_bytes
         self._dirty = False
+        self._listeners: list[Callable[[Command], None]] = []
+        # id(cmd) -> nbytes() when it entered the history
+        self._sizes: dict[int, int] = {}
+        self._bytes = 0
+        # When the newest entry was pushed, while it may still absorb more
+        self._coalesce_until = 0.0
+        # Receives on_push(cmd, merged), on_undo() and on_redo()
+        self.journal = None
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the undo and redo history."""
+        return self._bytes
+
+    def add_listener(self, callback: Callable[[Command], None]) -> None:
+        """Call callback(cmd) whenever a command is applied, undone or redone."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[Command], None]) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, cmd: Command) -> None:
+        for callback in self._listeners:
+            callback(cmd)
 
     def execute(self, cmd: Command) -> None:
         cmd.execute()
-        self.undo_stack.append(cmd)
+        self.push_applied(cmd)
+
+    def push_applied(self, cmd: Command, merge: bool | None = None) -> None:
+        """Record a command whose effect is already applied (e.g. a live brush stroke).
+
+        merge forces whether cmd is merged into the newest entry instead of
+        deciding by timing, for replaying a recorded history.
+        """
+        cmd.compact()
+        for old in self.redo_stack:
+            self._forget(old)
         self.redo_stack.clear()
-        if len(self.undo_stack) > self.max_history:
-            self.undo_stack.pop(0)
+        now = time.monotonic()
+        merged = merge is not False and self._coalesce(cmd, now, forced=merge is True)
+        if not merged:
+            self.undo_stack.append(cmd)
+            self._account(cmd)
+            self._trim()
+        self._coalesce_until = now + COALESCE_WINDOW if _is_small(cmd) else 0.0
         self._dirty = True
+        if self.journal is not None:
+            self.journal.on_push(cmd, merged)
+        self._notify(cmd)
+
+    def _coalesce(self, cmd: Command, now: float, forced: bool = False) -> bool:
+        """Merge cmd into the newest entry if both are recent small edits."""
+        if not self.undo_stack:
+            return False
+        if not forced and (now > self._coalesce_until or not _is_small(cmd)):
+            return False
+        top = self.undo_stack[-1]
+        if _cell_count(top) + _cell_count(cmd) > COALESCE_LIMIT_CELLS or not top.merge(cmd):
+            return False
+        self._forget(top)
+        self._account(top)
+        return True
+
+    def _account(self, cmd: Command) -> None:
+        size = cmd.nbytes()
+        self._sizes[id(cmd)] = size
+        self._bytes += size
+
+    def _forget(self, cmd: Command) -> None:
+        self._bytes -= self._sizes.pop(id(cmd), 0)
+
+    def _trim(self) -> None:
+        """Drop the oldest commands past the count or byte limit (never the newest)."""
+        stack = self.undo_stack
+        while len(stack) > 1 and (len(stack) > self.max_history or self._bytes > self.max_bytes):
+            self._forget(stack.popleft())
 
     def undo(self) -> bool:
         if not self.undo_stack:
@@ -54,7 +177,11 @@ class CommandStack:
         cmd = self.undo_stack.pop()
         cmd.undo()
         self.redo_stack.append(cmd)
+        self._coalesce_until = 0.0
         self._dirty = True
+        if self.journal is not None:
+            self.journal.on_undo()
+        self._notify(cmd)
         return True
 
     def redo(self) -> bool:
@@ -63,12 +190,24 @@ class CommandStack:
         cmd = self.redo_stack.pop()
         cmd.execute()
         self.undo_stack.append(cmd)
+        self._coalesce_until = 0.0
         self._dirty = True
+        if self.journal is not None:
+            self.journal.on_redo()
+        self._notify(cmd)
         return True
 
+    def references_level(self, level: Level) -> bool:
+        """True if any command in the history holds data belonging to level."""
+        owned = _owned_ids(level)
+        return any(_holds_any(cmd, owned) for cmd in (*self.undo_stack, *self.redo_stack))
+
     def clear(self) -> None:
         self.undo_stack.clear()
         self.redo_stack.clear()
+        self._sizes.clear()
+        self._bytes = 0
+        self._coalesce_until = 0.0
         self._dirty = False
 
     @property
@@ -77,6 +216,8 @@ class CommandStack:
 
     def mark_clean(self) -> None:
         self._dirty = False
+        # A saved entry must not grow afterwards
+        self._coalesce_until = 0.0
 
     @property
     def can_undo(self) -> bool:
@@ -87,6 +228,39 @@ class CommandStack:
         return len(self.redo_stack) > 0
 
 
+def _cell_count(cmd: Command) -> int:
+    """Cells a paint command covers (0 for anything else)."""
+    delta = getattr(cmd, "_delta", None)
+    return len(delta) if delta is not None else 0
+
+
+def _is_small(cmd: Command) -> bool:
+    return 0 < _cell_count(cmd) <= COALESCE_MAX_CELLS
+
+
+def _owned_ids(level: Level) -> set[int]:
+    """ids of the level and the layer instances and entities inside it."""
+    owned = {id(level)}
+    # Looking is not using: keep the level store's LRU order untouched
+    for li in level.peek_layers():
+        owned.add(id(li))
+        for ent in li.entities or ():
+            owned.add(id(ent))
+    return owned
+
+
+def _holds_any(cmd: Command, owned: set[int]) -> bool:
+    return any(id(value) in owned for value in vars(cmd).values())
+
+
+def find_command_level(cmd: Command, levels: Iterable[Level]) -> Level | None:
+    """Return the loaded level whose data cmd operates on, if any."""
+    for level in levels:
+        if level.is_loaded and _holds_any(cmd, _owned_ids(level)):
+            return level
+    return None
+
+
 # ---------------------------------------------------------------------------
 # Concrete commands
 # ---------------------------------------------------------------------------
@@ -98,25 +272,59 @@ class PaintIntGridCommand(Command):
     cols: int
     cells: list[tuple[int, int, int]]  # (x, y, new_value)
     old_values: list[int] = field(default_factory=list)
+    # cells and old_values packed by compact(); replaces both once set
+    _delta: CellDelta | None = None
 
     def execute(self) -> None:
+        if self._delta is not None:
+            self.layer_inst.intgrid = self._delta.apply_new(self.layer_inst.intgrid)
+            return
         self.old_values.clear()
         for x, y, new_val in self.cells:
             idx = y * self.cols + x
             if self.layer_inst.intgrid and 0 <= idx < len(self.layer_inst.intgrid):
                 self.old_values.append(self.layer_inst.intgrid[idx])
-                self.layer_inst.intgrid[idx] = new_val
+                self.layer_inst.set_intgrid_value(x, y, self.cols, new_val)
             else:
                 self.old_values.append(0)
 
     def undo(self) -> None:
+        if self._delta is not None:
+            self.layer_inst.intgrid = self._delta.apply_old(self.layer_inst.intgrid)
+            return
         for i, (x, y, _) in enumerate(self.cells):
             idx = y * self.cols + x
             if self.layer_inst.intgrid and 0 <= idx < len(self.layer_inst.intgrid):
-                self.layer_inst.intgrid[idx] = self.old_values[i]
+                self.layer_inst.set_intgrid_value(x, y, self.cols, self.old_values[i])
 
     def description(self) -> str:
-        return f"Paint IntGrid ({len(self.cells)} cells)"
+        count = len(self._delta) if self._delta is not None else len(self.cells)
+        return f"Paint IntGrid ({count} cells)"
+
+    def dirty_cells(self) -> tuple[LayerInstance, list[tuple[int, int]]] | None:
+        if self._delta is not None:
+            return self.layer_inst, self._delta.cells()
+        return self.layer_inst, [(x, y) for x, y, _ in self.cells]
+
+    def merge(self, later: Command) -> bool:
+        if (type(later) is not type(self) or later.layer_inst is not self.layer_inst
+                or later.cols != self.cols or self._delta is None or later._delta is None):
+            return False
+        self._delta = self._delta.merged(later._delta)
+        return True
+
+    def compact(self) -> None:
+        if (self._delta is None and self.layer_inst.intgrid is not None
+                and len(self.old_values) == len(self.cells)):
+            self._delta = CellDelta.from_cells(self.cols, self.cells, self.old_values,
+                                               len(self.layer_inst.intgrid))
+            self.cells = []
+            self.old_values = []
+
+    def nbytes(self) -> int:
+        if self._delta is not None:
+            return COMMAND_OVERHEAD_BYTES + self._delta.nbytes
+        return COMMAND_OVERHEAD_BYTES + _CELL_TUPLE_BYTES * len(self.cells)
 
 
 @dataclass
@@ -126,25 +334,54 @@ class PaintTileCommand(Command):
     cols: int
     cells: list[tuple[int, int, int]]  # (x, y, tile_id)
     old_values: list[int] = field(default_factory=list)
+    # cells and old_values packed by compact(); replaces both once set
+    _delta: CellDelta | None = None
 
     def execute(self) -> None:
+        if self._delta is not None:
+            self.layer_inst.tiles = self._delta.apply_new(self.layer_inst.tiles)
+            return
         self.old_values.clear()
         for x, y, tile_id in self.cells:
             idx = y * self.cols + x
             if self.layer_inst.tiles and 0 <= idx < len(self.layer_inst.tiles):
                 self.old_values.append(self.layer_inst.tiles[idx])
-                self.layer_inst.tiles[idx] = tile_id
+                self.layer_inst.set_tile(x, y, self.cols, tile_id)
             else:
                 self.old_values.append(-1)
 
     def undo(self) -> None:
+        if self._delta is not None:
+            self.layer_inst.tiles = self._delta.apply_old(self.layer_inst.tiles)
+            return
         for i, (x, y, _) in enumerate(self.cells):
             idx = y * self.cols + x
             if self.layer_inst.tiles and 0 <= idx < len(self.layer_inst.tiles):
-                self.layer_inst.tiles[idx] = self.old_values[i]
+                self.layer_inst.set_tile(x, y, self.cols, self.old_values[i])
 
     def description(self) -> str:
-        return f"Paint Tiles ({len(self.cells)} cells)"
+        count = len(self._delta) if self._delta is not None else len(self.cells)
+        return f"Paint Tiles ({count} cells)"
+
+    def merge(self, later: Command) -> bool:
+        if (type(later) is not type(self) or later.layer_inst is not self.layer_inst
+                or later.cols != self.cols or self._delta is None or later._delta is None):
+            return False
+        self._delta = self._delta.merged(later._delta)
+        return True
+
+    def compact(self) -> None:
+        if (self._delta is None and self.layer_inst.tiles is not None
+                and len(self.old_values) == len(self.cells)):
+            self._delta = CellDelta.from_cells(self.cols, self.cells, self.old_values,
+                                               len(self.layer_inst.tiles))
+            self.cells = []
+            self.old_values = []
+
+    def nbytes(self) -> int:
+        if self._delta is not None:
+            return COMMAND_OVERHEAD_BYTES + self._delta.nbytes
+        return COMMAND_OVERHEAD_BYTES + _CELL_TUPLE_BYTES * len(self.cells)
 
 
 @dataclass
@@ -154,13 +391,10 @@ class PlaceEntityCommand(Command):
     entity: EntityInstance
 
     def execute(self) -> None:
-        if self.layer_inst.entities is None:
-            self.layer_inst.entities = []
-        self.layer_inst.entities.append(self.entity)
+        self.layer_inst.insert_entity(self.entity)
 
     def undo(self) -> None:
-        if self.layer_inst.entities and self.entity in self.layer_inst.entities:
-            self.layer_inst.entities.remove(self.entity)
+        self.layer_inst.remove_entity(self.entity)
 
     def description(self) -> str:
         return f"Place Entity {self.entity.def_uid}"
@@ -174,16 +408,12 @@ class RemoveEntityCommand(Command):
     _index: int = -1
 
     def execute(self) -> None:
-        if self.layer_inst.entities and self.entity in self.layer_inst.entities:
-            self._index = self.layer_inst.entities.index(self.entity)
-            self.layer_inst.entities.remove(self.entity)
+        position = self.layer_inst.remove_entity(self.entity)
+        if position >= 0:
+            self._index = position
 
     def undo(self) -> None:
-        if self.layer_inst.entities is not None:
-            if 0 <= self._index <= len(self.layer_inst.entities):
-                self.layer_inst.entities.insert(self._index, self.entity)
-            else:
-                self.layer_inst.entities.append(self.entity)
+        self.layer_inst.insert_entity(self.entity, self._index)
 
     def description(self) -> str:
         return f"Remove Entity {self.entity.def_uid}"
@@ -197,16 +427,22 @@ class MoveEntityCommand(Command):
     new_y: int
     old_x: int = 0
     old_y: int = 0
+    # Layer holding the entity, whose spatial index is kept current
+    layer_inst: LayerInstance | None = None
 
     def execute(self) -> None:
         self.old_x = self.entity.x
         self.old_y = self.entity.y
         self.entity.x = self.new_x
         self.entity.y = self.new_y
+        if self.layer_inst is not None:
+            self.layer_inst.entity_moved(self.entity)
 
     def undo(self) -> None:
         self.entity.x = self.old_x
         self.entity.y = self.old_y
+        if self.layer_inst is not None:
+            self.layer_inst.entity_moved(self.entity)
 
     def description(self) -> str:
         return f"Move Entity to ({self.new_x}, {self.new_y})"
@@ -220,16 +456,21 @@ class ResizeEntityCommand(Command):
     new_h: int
     old_w: int = 0
     old_h: int = 0
+    layer_inst: LayerInstance | None = None
 
     def execute(self) -> None:
         self.old_w = self.entity.width
         self.old_h = self.entity.height
         self.entity.width = self.new_w
         self.entity.height = self.new_h
+        if self.layer_inst is not None:
+            self.layer_inst.entity_moved(self.entity)
 
     def undo(self) -> None:
         self.entity.width = self.old_w
         self.entity.height = self.old_h
+        if self.layer_inst is not None:
+            self.layer_inst.entity_moved(self.entity)
 
 
 @dataclass
@@ -259,7 +500,8 @@ class ResizeLevelCommand(Command):
     new_rows: int
     old_cols: int = 0
     old_rows: int = 0
-    old_layer_data: list[dict] = field(default_factory=list)
+    # Per layer, compressed copies of the grids before the resize
+    old_layer_data: list[dict[str, PackedGrid]] = field(default_factory=list)
 
     def execute(self) -> None:
         self.old_cols = self.level.width_cells
@@ -267,11 +509,11 @@ class ResizeLevelCommand(Command):
         # Snapshot layer data
         self.old_layer_data.clear()
         for li in self.level.layers:
-            snapshot: dict[str, Any] = {}
+            snapshot: dict[str, PackedGrid] = {}
             if li.intgrid is not None:
-                snapshot["intgrid"] = li.intgrid.copy()
+                snapshot["intgrid"] = PackedGrid(li.intgrid)
             if li.tiles is not None:
-                snapshot["tiles"] = li.tiles.copy()
+                snapshot["tiles"] = PackedGrid(li.tiles)
             self.old_layer_data.append(snapshot)
 
         # Resize
@@ -279,17 +521,9 @@ class ResizeLevelCommand(Command):
         nc, nr = self.new_cols, self.new_rows
         for li in self.level.layers:
             if li.intgrid is not None:
-                new_grid = [0] * (nc * nr)
-                for y in range(min(or_, nr)):
-                    for x in range(min(oc, nc)):
-                        new_grid[y * nc + x] = li.intgrid[y * oc + x]
-                li.intgrid = new_grid
+                li.intgrid = _resize_grid(li.intgrid, oc, or_, nc, nr, 0)
             if li.tiles is not None:
-                new_tiles = [-1] * (nc * nr)
-                for y in range(min(or_, nr)):
-                    for x in range(min(oc, nc)):
-                        new_tiles[y * nc + x] = li.tiles[y * oc + x]
-                li.tiles = new_tiles
+                li.tiles = _resize_grid(li.tiles, oc, or_, nc, nr, -1)
         self.level.width_cells = nc
         self.level.height_cells = nr
 
@@ -300,9 +534,22 @@ class ResizeLevelCommand(Command):
             if i < len(self.old_layer_data):
                 snap = self.old_layer_data[i]
                 if "intgrid" in snap:
-                    li.intgrid = snap["intgrid"]
+                    li.intgrid = snap["intgrid"].unpack()
                 if "tiles" in snap:
-                    li.tiles = snap["tiles"]
+                    li.tiles = snap["tiles"].unpack()
+
+    def nbytes(self) -> int:
+        return COMMAND_OVERHEAD_BYTES + sum(
+            packed.nbytes for snap in self.old_layer_data for packed in snap.values())
+
+
+def _resize_grid(grid: Grid, oc: int, or_: int, nc: int, nr: int, fill: int) -> Grid:
+    """Copy grid into a new nc x nr grid, row by row, padding with fill."""
+    new_grid = Grid(grid.typecode, [fill]) * (nc * nr)
+    w = min(oc, nc)
+    for y in range(min(or_, nr)):
+        new_grid[y * nc:y * nc + w] = grid[y * oc:y * oc + w]
+    return new_grid
 
 
 @dataclass
@@ -314,34 +561,36 @@ class FloodFillTileCommand(Command):
     start_x: int
     start_y: int
     fill_tile_id: int
-    filled_cells: list[tuple[int, int, int]] = field(default_factory=list)
+    # Connect cells touching at a corner too
+    diagonal: bool = False
+    # Only fill inside this cell rectangle (x0, y0, x1, y1), end exclusive
+    bounds: tuple[int, int, int, int] | None = None
+    # Filled region as (y, x0, x1) runs; every cell in it held _target
+    runs: list[Run] = field(default_factory=list)
+    _target: int = -1
 
     def execute(self) -> None:
-        if self.layer_inst.tiles is None:
+        tiles = self.layer_inst.tiles
+        if tiles is None:
             return
-        target = self.layer_inst.get_tile(self.start_x, self.start_y, self.cols)
-        if target == self.fill_tile_id:
+        self.runs = []
+        self._target = self.layer_inst.get_tile(self.start_x, self.start_y, self.cols)
+        if self._target == self.fill_tile_id:
             return
-        self.filled_cells.clear()
-        visited = set()
-        stack = [(self.start_x, self.start_y)]
-        while stack:
-            x, y = stack.pop()
-            if (x, y) in visited:
-                continue
-            if x < 0 or x >= self.cols or y < 0 or y >= self.rows:
-                continue
-            val = self.layer_inst.get_tile(x, y, self.cols)
-            if val != target:
-                continue
-            visited.add((x, y))
-            self.filled_cells.append((x, y, val))
-            self.layer_inst.set_tile(x, y, self.cols, self.fill_tile_id)
-            stack.extend([(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)])
+        self.runs = flood_region(tiles, self.cols, self.rows, self.start_x, self.start_y,
+                                 self.diagonal, self.bounds)
+        self.layer_inst.tiles = fill_runs(tiles, self.cols, self.runs, self.fill_tile_id)
 
     def undo(self) -> None:
-        for x, y, old_val in self.filled_cells:
-            self.layer_inst.set_tile(x, y, self.cols, old_val)
+        if self.layer_inst.tiles is not None and self.runs:
+            self.layer_inst.tiles = fill_runs(self.layer_inst.tiles, self.cols,
+                                              self.runs, self._target)
+
+    def description(self) -> str:
+        return f"Flood Fill Tiles ({run_length(self.runs)} cells)"
+
+    def nbytes(self) -> int:
+        return COMMAND_OVERHEAD_BYTES + _RUN_TUPLE_BYTES * len(self.runs)
 
 
 @dataclass
@@ -353,31 +602,36 @@ class FloodFillIntGridCommand(Command):
     start_x: int
     start_y: int
     fill_value: int
-    filled_cells: list[tuple[int, int, int]] = field(default_factory=list)
+    # Connect cells touching at a corner too
+    diagonal: bool = False
+    # Only fill inside this cell rectangle (x0, y0, x1, y1), end exclusive
+    bounds: tuple[int, int, int, int] | None = None
+    # Filled region as (y, x0, x1) runs; every cell in it held _target
+    runs: list[Run] = field(default_factory=list)
+    _target: int = 0
 
     def execute(self) -> None:
-        if self.layer_inst.intgrid is None:
+        intgrid = self.layer_inst.intgrid
+        if intgrid is None:
             return
-        target = self.layer_inst.get_intgrid_value(self.start_x, self.start_y, self.cols)
-        if target == self.fill_value:
+        self.runs = []
+        self._target = self.layer_inst.get_intgrid_value(self.start_x, self.start_y, self.cols)
+        if self._target == self.fill_value:
             return
-        self.filled_cells.clear()
-        visited = set()
-        stack = [(self.start_x, self.start_y)]
-        while stack:
-            x, y = stack.pop()
-            if (x, y) in visited:
-                continue
-            if x < 0 or x >= self.cols or y < 0 or y >= self.rows:
-                continue
-            val = self.layer_inst.get_intgrid_value(x, y, self.cols)
-            if val != target:
-                continue
-            visited.add((x, y))
-            self.filled_cells.append((x, y, val))
-            self.layer_inst.set_intgrid_value(x, y, self.cols, self.fill_value)
-            stack.extend([(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)])
+        self.runs = flood_region(intgrid, self.cols, self.rows, self.start_x, self.start_y,
+                                 self.diagonal, self.bounds)
+        self.layer_inst.intgrid = fill_runs(intgrid, self.cols, self.runs, self.fill_value)
 
     def undo(self) -> None:
-        for x, y, old_val in self.filled_cells:
-            self.layer_inst.set_intgrid_value(x, y, self.cols, old_val)
+        if self.layer_inst.intgrid is not None and self.runs:
+            self.layer_inst.intgrid = fill_runs(self.layer_inst.intgrid, self.cols,
+                                                self.runs, self._target)
+
+    def description(self) -> str:
+        return f"Flood Fill IntGrid ({run_length(self.runs)} cells)"
+
+    def nbytes(self) -> int:
+        return COMMAND_OVERHEAD_BYTES + _RUN_TUPLE_BYTES * len(self.runs)
+
+    def dirty_cells(self) -> tuple[LayerInstance, list[tuple[int, int]]] | None:
+        return self.layer_inst, run_cells(self.runs)
@@ -0,0 +1,145 @@
+"""Compact undo records for grid edits.
+
+A paint command starts out holding (x, y, value) tuples plus a list of old
+values, which costs on the order of a hundred bytes per cell.  Once the
+command is in the history it is packed into a CellDelta: the edited flat
+indices as runs of consecutive cells sharing the same old and new value,
+stored in typed arrays.  A brush stroke or rectangle over uniform cells is
+a handful of runs; the worst case (every cell different) is 32 bytes per
+cell.
+
+Whole-grid snapshots (level resize) are kept as zlib-compressed bytes in a
+PackedGrid, which for mostly empty layers is a small fraction of the grid.
+"""
+from __future__ import annotations
+
+import zlib
+from array import array
+from typing import Iterable
+
+from birdlevel.project.grid import Grid
+
+# Rough size of a command object and its attributes, for history budgets
+COMMAND_OVERHEAD_BYTES = 256
+
+
+class CellDelta:
+    """Old and new values of a set of grid cells, as runs over flat indices."""
+
+    __slots__ = ("cols", "starts", "lengths", "olds", "news")
+
+    def __init__(self, cols: int):
+        self.cols = cols
+        self.starts = array("q")
+        self.lengths = array("l")
+        self.olds = array("q")
+        self.news = array("q")
+
+    @classmethod
+    def from_cells(cls, cols: int, cells: Iterable[tuple[int, int, int]],
+                   old_values: Iterable[int], limit: int) -> CellDelta:
+        """Pack (x, y, new) cells and their old values.
+
+        Cells whose flat index is outside [0, limit) are dropped, as the
+        commands never wrote them.  A cell listed twice keeps its first old
+        value and its last new value.
+        """
+        edits: dict[int, list[int]] = {}
+        for (x, y, new), old in zip(cells, old_values):
+            idx = y * cols + x
+            if not 0 <= idx < limit:
+                continue
+            edit = edits.get(idx)
+            if edit is None:
+                edits[idx] = [old, new]
+            else:
+                edit[1] = new
+        return cls._from_edits(cols, edits)
+
+    @classmethod
+    def _from_edits(cls, cols: int, edits: dict[int, list[int]]) -> CellDelta:
+        delta = cls(cols)
+        starts, lengths, olds, news = delta.starts, delta.lengths, delta.olds, delta.news
+        for idx in sorted(edits):
+            old, new = edits[idx]
+            if (starts and starts[-1] + lengths[-1] == idx
+                    and olds[-1] == old and news[-1] == new):
+                lengths[-1] += 1
+            else:
+                starts.append(idx)
+                lengths.append(1)
+                olds.append(old)
+                news.append(new)
+        return delta
+
+    def _edits(self) -> dict[int, list[int]]:
+        return {idx: [old, new]
+                for start, n, old, new in zip(self.starts, self.lengths, self.olds, self.news)
+                for idx in range(start, start + n)}
+
+    def merged(self, later: CellDelta) -> CellDelta:
+        """One delta with the effect of this one followed by later."""
+        edits = self._edits()
+        for idx, (old, new) in later._edits().items():
+            edit = edits.get(idx)
+            if edit is None:
+                edits[idx] = [old, new]
+            else:
+                edit[1] = new
+        return self._from_edits(self.cols, edits)
+
+    def __len__(self) -> int:
+        return sum(self.lengths)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in (self.starts, self.lengths, self.olds, self.news))
+
+    def apply_new(self, grid: Grid) -> Grid:
+        """Write the new values; returns the grid (widened if needed)."""
+        return _write_runs(grid, self.starts, self.lengths, self.news)
+
+    def apply_old(self, grid: Grid) -> Grid:
+        """Write the old values back; returns the grid (widened if needed)."""
+        return _write_runs(grid, self.starts, self.lengths, self.olds)
+
+    def cells(self) -> list[tuple[int, int]]:
+        """(x, y) of every cell in the delta."""
+        cols = self.cols
+        return [divmod(idx, cols)[::-1]
+                for start, n in zip(self.starts, self.lengths)
+                for idx in range(start, start + n)]
+
+
+def _write_runs(grid: Grid, starts: array, lengths: array, values: array) -> Grid:
+    size = len(grid)
+    for start, n, value in zip(starts, lengths, values):
+        end = min(start + n, size)
+        if start >= end:
+            continue
+        try:
+            unit = array(grid.typecode, (value,))
+        except OverflowError:
+            grid = grid.widened(value)
+            unit = array(grid.typecode, (value,))
+        grid[start:end] = unit * (end - start)
+    return grid
+
+
+class PackedGrid:
+    """A zlib-compressed copy of a grid."""
+
+    __slots__ = ("typecode", "data")
+
+    def __init__(self, grid: Grid):
+        self.typecode = grid.typecode
+        self.data = zlib.compress(grid.tobytes(), 1)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.data)
+
+    def unpack(self) -> Grid:
+        grid = Grid(self.typecode)
+        grid.frombytes(zlib.decompress(self.data))
+        return grid
@@ -4,7 +4,7 @@ Separate from the project data model so UI/editor concerns don't pollute the dat
 """
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Callable
 
 from birdlevel.editor.commands import CommandStack
 from birdlevel.project.models import (
@@ -26,7 +26,8 @@ class EditorState:
         self.camera = Camera()
         self.command_stack = CommandStack()
 
-        # Current selection
+        # Current selection; version is bumped whenever it changes
+        self.version: int = 0
         self._active_world_idx: int = 0
         self._active_level_idx: int = 0
         self._active_layer_idx: int = 0
@@ -38,6 +39,7 @@ class EditorState:
         self.selected_tile_id: int = 0
         self.tile_stamp: list[list[int]] | None = None  # 2D array of tile IDs
         self.random_tiles: list[int] = []
+        self.random_tile_set: set[int] = set()  # same ids, for lookups
         self.random_mode: bool = False
 
         # Entity selection
@@ -65,6 +67,9 @@ class EditorState:
         self.autosave_timer: float = 0.0
         self.autosave_interval: float = 120.0  # seconds
 
+        # Callbacks for IntGrid cells painted live, before their command is pushed
+        self._intgrid_listeners: list[Callable[[LayerInstance, list[tuple[int, int]]], None]] = []
+
     # -----------------------------------------------------------------------
     # Active world / level / layer accessors
     # -----------------------------------------------------------------------
@@ -103,12 +108,15 @@ class EditorState:
     def set_active_world(self, idx: int) -> None:
         self._active_world_idx = idx
         self._active_level_idx = 0
+        self.version += 1
 
     def set_active_level(self, idx: int) -> None:
         self._active_level_idx = idx
+        self.version += 1
 
     def set_active_layer(self, idx: int) -> None:
         self._active_layer_idx = idx
+        self.version += 1
 
     @property
     def active_world_idx(self) -> int:
@@ -122,6 +130,31 @@ class EditorState:
     def active_layer_idx(self) -> int:
         return self._active_layer_idx
 
+    def add_intgrid_listener(
+            self, callback: Callable[[LayerInstance, list[tuple[int, int]]], None]) -> None:
+        self._intgrid_listeners.append(callback)
+
+    def remove_intgrid_listener(
+            self, callback: Callable[[LayerInstance, list[tuple[int, int]]], None]) -> None:
+        if callback in self._intgrid_listeners:
+            self._intgrid_listeners.remove(callback)
+
+    def notify_intgrid_painted(self, layer_inst: LayerInstance,
+                               cells: list[tuple[int, int]]) -> None:
+        """Report IntGrid cells changed in place by a tool mid-stroke."""
+        for callback in self._intgrid_listeners:
+            callback(layer_inst, cells)
+
+    def toggle_random_tile(self, tile_id: int) -> bool:
+        """Add or remove a tile from the random pool. Returns True if added."""
+        if tile_id in self.random_tile_set:
+            self.random_tile_set.discard(tile_id)
+            self.random_tiles.remove(tile_id)
+            return False
+        self.random_tile_set.add(tile_id)
+        self.random_tiles.append(tile_id)
+        return True
+
     def set_notification(self, text: str, duration: float = 3.0) -> None:
         self.notification = text
         self.notification_timer = duration
@@ -0,0 +1,495 @@
+"""Append-only on-disk journal of the undo history.
+
+Every change to the CommandStack (a command pushed or merged into the
+newest entry, an undo, a redo) is appended to <project file>.journal as one
+record.  Commands are written in an identity-free form (level uid, layer
+definition uid, entity uid, packed cell runs) so they can be rebuilt against
+a freshly loaded project.  Replaying the records through a CommandStack
+reproduces the unsaved state and the undo history exactly.
+
+The journal describes edits on top of one saved state of the project file.
+Its header records that file's size and modification time; a journal whose
+base no longer matches the file is stale and ignored.  Saving the project
+starts a new, empty journal.
+
+File layout (integers little-endian):
+
+    magic    8 bytes  b"BIRDJNL\\0"
+    version  u32
+    base_len u32      length of the JSON base description
+    base     JSON     {"size": ..., "mtime_ns": ...} of the project file
+    records  ...      back to back: u32 payload length, u32 crc32, payload
+
+A payload is a kind byte, a u32 JSON length, the JSON description and an
+optional binary blob (packed cell runs).  Reading stops at the first short
+or corrupt record, so a write torn by a crash only loses that record.
+
+Writes go to the OS as they happen; fsync is batched (at most every
+SYNC_INTERVAL seconds or SYNC_BYTES of records) so a burst of edits costs
+one disk flush.
+"""
+from __future__ import annotations
+
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from typing import Any, Callable
+
+from birdlevel.editor.commands import (
+    Command,
+    CommandStack,
+    EditEntityFieldCommand,
+    FloodFillIntGridCommand,
+    FloodFillTileCommand,
+    MoveEntityCommand,
+    PaintIntGridCommand,
+    PaintTileCommand,
+    PlaceEntityCommand,
+    RemoveEntityCommand,
+    ResizeEntityCommand,
+    ResizeLevelCommand,
+)
+from birdlevel.editor.deltas import CellDelta
+from birdlevel.project.models import EntityInstance, LayerInstance, Level, Project
+
+MAGIC = b"BIRDJNL\x00"
+JOURNAL_VERSION = 1
+JOURNAL_SUFFIX = ".journal"
+
+_PREAMBLE = struct.Struct("<8sII")
+_RECORD = struct.Struct("<II")
+_PAYLOAD = struct.Struct("<BI")
+
+# Record kinds
+PUSH = 1
+MERGE = 2
+UNDO = 3
+REDO = 4
+
+# fsync at most this often while records are pending...
+SYNC_INTERVAL = 1.0
+# ...or as soon as this much is pending
+SYNC_BYTES = 1024 * 1024
+
+# A journal past this size is better folded into a full save
+MAX_JOURNAL_BYTES = 32 * 1024 * 1024
+
+
+class JournalError(Exception):
+    """A command cannot be journaled, or a record cannot be replayed."""
+
+
+def journal_path(project_path: str) -> str:
+    return project_path + JOURNAL_SUFFIX
+
+
+def _file_base(project_path: str) -> dict[str, int]:
+    st = os.stat(project_path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+# ---------------------------------------------------------------------------
+# Command encoding
+# ---------------------------------------------------------------------------
+
+def _loaded_levels(project: Project) -> list[Level]:
+    return [lvl for world in project.worlds for lvl in world.levels if lvl.is_loaded]
+
+
+def _level_of_layer(project: Project, layer_inst: LayerInstance) -> Level:
+    for level in _loaded_levels(project):
+        if any(li is layer_inst for li in level.peek_layers()):
+            return level
+    raise JournalError("layer instance is not part of the project")
+
+
+def _locate_entity(project: Project, ent: EntityInstance,
+                   layer_inst: LayerInstance | None) -> tuple[Level, LayerInstance]:
+    if layer_inst is not None:
+        return _level_of_layer(project, layer_inst), layer_inst
+    for level in _loaded_levels(project):
+        for li in level.peek_layers():
+            if li.entities and li.entity_index().position(ent) >= 0:
+                return level, li
+    raise JournalError("entity is not part of the project")
+
+
+def _pack_delta(delta: CellDelta) -> bytes:
+    arrays = (delta.starts, delta.lengths, delta.olds, delta.news)
+    if sys.byteorder != "little":
+        arrays = tuple(array(a.typecode, a) for a in arrays)
+        for a in arrays:
+            a.byteswap()
+    return zlib.compress(b"".join(a.tobytes() for a in arrays), 1)
+
+
+def _unpack_delta(cols: int, count: int, blob: bytes) -> CellDelta:
+    delta = CellDelta(cols)
+    raw = memoryview(zlib.decompress(blob))
+    offset = 0
+    for a in (delta.starts, delta.lengths, delta.olds, delta.news):
+        size = count * a.itemsize
+        a.frombytes(raw[offset:offset + size])
+        if sys.byteorder != "little":
+            a.byteswap()
+        offset += size
+    if offset != len(raw):
+        raise JournalError("corrupt cell runs")
+    return delta
+
+
+def encode_command(cmd: Command, project: Project) -> tuple[dict[str, Any], bytes]:
+    """Describe cmd independently of object identity, as (JSON dict, blob)."""
+    if isinstance(cmd, (PaintIntGridCommand, PaintTileCommand)):
+        level = _level_of_layer(project, cmd.layer_inst)
+        grid = "intgrid" if isinstance(cmd, PaintIntGridCommand) else "tiles"
+        delta = cmd._delta
+        if delta is None:
+            current = getattr(cmd.layer_inst, grid)
+            delta = CellDelta.from_cells(cmd.cols, cmd.cells, cmd.old_values,
+                                         len(current) if current is not None else 0)
+        return ({"type": "paint", "level": level.uid, "layer": cmd.layer_inst.layer_def_uid,
+                 "grid": grid, "cols": cmd.cols, "runs": len(delta.starts)},
+                _pack_delta(delta))
+    if isinstance(cmd, (FloodFillIntGridCommand, FloodFillTileCommand)):
+        level = _level_of_layer(project, cmd.layer_inst)
+        intgrid = isinstance(cmd, FloodFillIntGridCommand)
+        return ({"type": "flood", "level": level.uid, "layer": cmd.layer_inst.layer_def_uid,
+                 "grid": "intgrid" if intgrid else "tiles",
+                 "cols": cmd.cols, "rows": cmd.rows, "x": cmd.start_x, "y": cmd.start_y,
+                 "value": cmd.fill_value if intgrid else cmd.fill_tile_id,
+                 "diagonal": cmd.diagonal,
+                 "bounds": list(cmd.bounds) if cmd.bounds is not None else None}, b"")
+    if isinstance(cmd, ResizeLevelCommand):
+        return ({"type": "resize_level", "level": cmd.level.uid,
+                 "cols": cmd.new_cols, "rows": cmd.new_rows}, b"")
+    if isinstance(cmd, PlaceEntityCommand):
+        from birdlevel.project.serialization import entity_instance_to_dict
+        level = _level_of_layer(project, cmd.layer_inst)
+        return ({"type": "place_entity", "level": level.uid,
+                 "layer": cmd.layer_inst.layer_def_uid,
+                 "entity": entity_instance_to_dict(cmd.entity)}, b"")
+    if isinstance(cmd, RemoveEntityCommand):
+        level = _level_of_layer(project, cmd.layer_inst)
+        return ({"type": "remove_entity", "level": level.uid,
+                 "layer": cmd.layer_inst.layer_def_uid, "entity": cmd.entity.uid}, b"")
+    if isinstance(cmd, (MoveEntityCommand, ResizeEntityCommand, EditEntityFieldCommand)):
+        level, li = _locate_entity(project, cmd.entity, getattr(cmd, "layer_inst", None))
+        desc = {"level": level.uid, "layer": li.layer_def_uid, "entity": cmd.entity.uid}
+        if isinstance(cmd, MoveEntityCommand):
+            desc.update(type="move_entity", x=cmd.new_x, y=cmd.new_y)
+        elif isinstance(cmd, ResizeEntityCommand):
+            desc.update(type="resize_entity", w=cmd.new_w, h=cmd.new_h)
+        else:
+            desc.update(type="edit_entity_field", field=cmd.field_name, value=cmd.new_value)
+        return desc, b""
+    raise JournalError(f"{type(cmd).__name__} cannot be journaled")
+
+
+def _find_level(project: Project, uid: str) -> Level:
+    for world in project.worlds:
+        for level in world.levels:
+            if level.uid == uid:
+                return level
+    raise JournalError(f"level {uid} not found")
+
+
+def _find_layer(level: Level, layer_def_uid: str) -> LayerInstance:
+    li = level.get_layer_instance(layer_def_uid)
+    if li is None:
+        raise JournalError(f"layer {layer_def_uid} not found in level {level.uid}")
+    return li
+
+
+def _find_entity(li: LayerInstance, uid: str) -> EntityInstance:
+    for ent in li.entities or ():
+        if ent.uid == uid:
+            return ent
+    raise JournalError(f"entity {uid} not found")
+
+
+def decode_command(desc: dict[str, Any], blob: bytes, project: Project) -> Command:
+    """Rebuild a command from encode_command() output, not yet applied."""
+    kind = desc.get("type")
+    level = _find_level(project, desc["level"])
+    if kind == "resize_level":
+        return ResizeLevelCommand(level=level, new_cols=desc["cols"], new_rows=desc["rows"])
+    li = _find_layer(level, desc["layer"])
+    if kind == "paint":
+        delta = _unpack_delta(desc["cols"], desc["runs"], blob)
+        cls = PaintIntGridCommand if desc["grid"] == "intgrid" else PaintTileCommand
+        return cls(layer_inst=li, cols=desc["cols"], cells=[], _delta=delta)
+    if kind == "flood":
+        bounds = tuple(desc["bounds"]) if desc.get("bounds") is not None else None
+        common = dict(layer_inst=li, cols=desc["cols"], rows=desc["rows"],
+                      start_x=desc["x"], start_y=desc["y"],
+                      diagonal=desc.get("diagonal", False), bounds=bounds)
+        if desc["grid"] == "intgrid":
+            return FloodFillIntGridCommand(fill_value=desc["value"], **common)
+        return FloodFillTileCommand(fill_tile_id=desc["value"], **common)
+    if kind == "place_entity":
+        from birdlevel.project.serialization import entity_instance_from_dict
+        return PlaceEntityCommand(layer_inst=li, entity=entity_instance_from_dict(desc["entity"]))
+    ent = _find_entity(li, desc["entity"])
+    if kind == "remove_entity":
+        return RemoveEntityCommand(layer_inst=li, entity=ent)
+    if kind == "move_entity":
+        return MoveEntityCommand(entity=ent, new_x=desc["x"], new_y=desc["y"], layer_inst=li)
+    if kind == "resize_entity":
+        return ResizeEntityCommand(entity=ent, new_w=desc["w"], new_h=desc["h"], layer_inst=li)
+    if kind == "edit_entity_field":
+        return EditEntityFieldCommand(entity=ent, field_name=desc["field"], new_value=desc["value"])
+    raise JournalError(f"unknown journal command {kind!r}")
+
+
+# ---------------------------------------------------------------------------
+# Journal file
+# ---------------------------------------------------------------------------
+
+def _encode_record(kind: int, desc: dict[str, Any] | None = None, blob: bytes = b"") -> bytes:
+    text = json.dumps(desc, separators=(",", ":")).encode("utf-8") if desc is not None else b""
+    payload = _PAYLOAD.pack(kind, len(text)) + text + blob
+    return _RECORD.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _read_journal(path: str) -> tuple[dict[str, Any], list[tuple[int, dict | None, bytes]], int]:
+    """(base, records, end offset of the last good record) of a journal file."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _PREAMBLE.size:
+        raise JournalError("not a journal")
+    magic, version, base_len = _PREAMBLE.unpack_from(data)
+    if magic != MAGIC or version > JOURNAL_VERSION:
+        raise JournalError("not a journal")
+    offset = _PREAMBLE.size + base_len
+    base = json.loads(data[_PREAMBLE.size:offset].decode("utf-8"))
+    records: list[tuple[int, dict | None, bytes]] = []
+    view = memoryview(data)
+    while offset + _RECORD.size <= len(data):
+        length, crc = _RECORD.unpack_from(data, offset)
+        start = offset + _RECORD.size
+        payload = view[start:start + length]
+        if len(payload) != length or zlib.crc32(payload) != crc or length < _PAYLOAD.size:
+            break  # torn or corrupt tail
+        kind, text_len = _PAYLOAD.unpack_from(payload)
+        text = bytes(payload[_PAYLOAD.size:_PAYLOAD.size + text_len])
+        desc = json.loads(text.decode("utf-8")) if text else None
+        records.append((kind, desc, bytes(payload[_PAYLOAD.size + text_len:])))
+        offset = start + length
+    return base, records, offset
+
+
+def pending_records(project_path: str) -> int:
+    """Number of journaled changes on top of the saved file (0 if none or stale)."""
+    path = journal_path(project_path)
+    if not os.path.exists(path) or not os.path.exists(project_path):
+        return 0
+    try:
+        base, records, _end = _read_journal(path)
+    except (OSError, ValueError, JournalError):
+        return 0
+    if base != _file_base(project_path):
+        return 0
+    return len(records)
+
+
+class UndoJournal:
+    """Writes CommandStack changes for one project file to its journal.
+
+    Attach with CommandStack.journal = journal.  If a command cannot be
+    journaled, or the project changes outside the command history (its
+    version is bumped, e.g. a layer is added), the journal stops recording
+    (healthy becomes False) until the next reset(), since later records
+    would not replay without that change.  What it holds up to then still
+    replays.  The same goes for an undo or redo of an entry from before the
+    save: the replayed history does not have that entry.
+    """
+
+    def __init__(self, project: Project, project_path: str,
+                 clock: Callable[[], float] = time.monotonic):
+        self.project = project
+        self.project_path = project_path
+        self.path = journal_path(project_path)
+        self.clock = clock
+        self.healthy = True
+        self.records = 0
+        # Bytes in the journal file
+        self.size = 0
+        self._file = None
+        self._pending = 0
+        self._last_sync = clock()
+        self._version = project.version
+        # Undo / redo entries a replay of the journal would have
+        self._undo_depth = 0
+        self._redo_depth = 0
+
+    # -- lifecycle -------------------------------------------------------
+
+    def reset(self) -> None:
+        """Start an empty journal on top of the project file as it is now."""
+        self.close()
+        base = json.dumps(_file_base(self.project_path)).encode("utf-8")
+        header = _PREAMBLE.pack(MAGIC, JOURNAL_VERSION, len(base)) + base
+        self._file = open(self.path, "wb")
+        self._file.write(header)
+        self.healthy = True
+        self.records = 0
+        self.size = len(header)
+        self._version = self.project.version
+        self._undo_depth = 0
+        self._redo_depth = 0
+        self._pending = 1
+        self.sync()
+
+    def replay(self, stack: CommandStack) -> int:
+        """Apply the journal's records to stack and keep appending after them.
+
+        Returns the number of records replayed.  A record that fails to
+        replay ends the journal there.
+        """
+        self.close()
+        base, records, end = _read_journal(self.path)
+        if base != _file_base(self.project_path):
+            raise JournalError("journal does not match the saved project")
+        replayed = 0
+        offset = end
+        journal, stack.journal = stack.journal, None
+        try:
+            for kind, desc, blob in records:
+                if kind in (PUSH, MERGE):
+                    cmd = decode_command(desc, blob, self.project)
+                    cmd.execute()
+                    stack.push_applied(cmd, merge=kind == MERGE)
+                elif kind == UNDO:
+                    stack.undo()
+                elif kind == REDO:
+                    stack.redo()
+                else:
+                    raise JournalError(f"unknown record kind {kind}")
+                replayed += 1
+        except (JournalError, KeyError, ValueError, TypeError, zlib.error):
+            # Keep what replayed; drop the rest of the file
+            offset = self._offset_after(replayed)
+        finally:
+            stack.journal = journal
+        self._file = open(self.path, "r+b")
+        self._file.truncate(offset)
+        self._file.seek(offset)
+        self.healthy = True
+        self.records = replayed
+        self.size = offset
+        self._version = self.project.version
+        self._undo_depth = len(stack.undo_stack)
+        self._redo_depth = len(stack.redo_stack)
+        return replayed
+
+    def _offset_after(self, count: int) -> int:
+        with open(self.path, "rb") as f:
+            data = f.read()
+        _magic, _version, base_len = _PREAMBLE.unpack_from(data)
+        offset = _PREAMBLE.size + base_len
+        for _ in range(count):
+            length, _crc = _RECORD.unpack_from(data, offset)
+            offset += _RECORD.size + length
+        return offset
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def discard(self) -> None:
+        """Close and delete the journal file."""
+        self.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    # -- recording (called by CommandStack) ------------------------------
+
+    def _recording(self) -> bool:
+        if self.healthy and self.project.version != self._version:
+            self.healthy = False
+        return self.healthy
+
+    def on_push(self, cmd: Command, merged: bool) -> None:
+        if not self._recording():
+            return
+        try:
+            desc, blob = encode_command(cmd, self.project)
+            record = _encode_record(MERGE if merged else PUSH, desc, blob)
+        except (JournalError, TypeError, ValueError):
+            # e.g. a field value JSON cannot hold
+            self.healthy = False
+            return
+        if merged:
+            if not self._undo_depth:
+                # Merged into an entry the journal does not have
+                self.healthy = False
+                return
+        else:
+            self._undo_depth += 1
+        self._redo_depth = 0
+        self._append(record)
+
+    def on_undo(self) -> None:
+        if not self._recording():
+            return
+        if not self._undo_depth:
+            # Undid an entry from before the save; replay cannot
+            self.healthy = False
+            return
+        self._undo_depth -= 1
+        self._redo_depth += 1
+        self._append(_encode_record(UNDO))
+
+    def on_redo(self) -> None:
+        if not self._recording():
+            return
+        if not self._redo_depth:
+            self.healthy = False
+            return
+        self._redo_depth -= 1
+        self._undo_depth += 1
+        self._append(_encode_record(REDO))
+
+    @property
+    def is_current(self) -> bool:
+        """True if the journal plus the saved file hold every change so far."""
+        return self._recording() and self._file is not None
+
+    def _append(self, record: bytes) -> None:
+        if self._file is None:
+            self.healthy = False
+            return
+        self._file.write(record)
+        self.records += 1
+        self.size += len(record)
+        self._pending += len(record)
+        self.maybe_sync()
+
+    # -- durability ------------------------------------------------------
+
+    @property
+    def sync_due_in(self) -> float | None:
+        """Seconds until pending records must be synced (None: nothing pending)."""
+        if not self._pending:
+            return None
+        return max(0.0, self._last_sync + SYNC_INTERVAL - self.clock())
+
+    def maybe_sync(self) -> None:
+        if self._pending and (self._pending >= SYNC_BYTES
+                              or self.clock() - self._last_sync >= SYNC_INTERVAL):
+            self.sync()
+
+    def sync(self) -> None:
+        """Flush pending records to disk."""
+        if self._file is not None and self._pending:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = self.clock()
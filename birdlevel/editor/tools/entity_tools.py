@@ -7,7 +7,7 @@ import pygame
 
 from birdlevel.editor.commands import MoveEntityCommand, PlaceEntityCommand, RemoveEntityCommand
 from birdlevel.editor.tools.base import Tool, ToolCategory, ToolType
-from birdlevel.project.models import EntityInstance, LayerType
+from birdlevel.project.models import EntityInstance, LayerInstance, LayerType
 
 if TYPE_CHECKING:
     from birdlevel.editor.editor_state import EditorState
@@ -56,7 +56,7 @@ class EntityPlace(Tool):
             if existing:
                 # Move existing instead of placing new
                 ent = existing[0]
-                cmd = MoveEntityCommand(entity=ent, new_x=gx, new_y=gy)
+                cmd = MoveEntityCommand(entity=ent, new_x=gx, new_y=gy, layer_inst=li)
                 state.command_stack.execute(cmd)
                 state.selected_entity_instance = ent
                 state.needs_save = True
@@ -112,6 +112,7 @@ class EntitySelect(Tool):
         super().__init__(ToolType.ENTITY_SELECT, ToolCategory.ENTITIES)
         self._dragging = False
         self._drag_entity: EntityInstance | None = None
+        self._drag_layer: LayerInstance | None = None
         self._drag_offset_x: float = 0
         self._drag_offset_y: float = 0
         self._drag_start_x: int = 0
@@ -139,6 +140,7 @@ class EntitySelect(Tool):
             new_y = int(new_y // gs) * gs
         self._drag_entity.x = new_x
         self._drag_entity.y = new_y
+        self._drag_layer.entity_moved(self._drag_entity)
 
     def on_release(self, state: EditorState, wx: float, wy: float, button: int) -> None:
         if button != 1 or not self._dragging:
@@ -158,43 +160,43 @@ class EntitySelect(Tool):
                 entity=self._drag_entity,
                 new_x=final_x,
                 new_y=final_y,
+                layer_inst=self._drag_layer,
             )
             state.command_stack.execute(cmd)
             state.needs_save = True
         self._drag_entity = None
+        self._drag_layer = None
 
     def _try_select(self, state: EditorState, wx: float, wy: float) -> None:
         li = state.active_layer_instance
         if li is None or li.entities is None:
             state.selected_entity_instance = None
             return
-        # Find topmost entity under cursor (reverse order = on top)
-        for ent in reversed(li.entities):
-            if (ent.x <= wx < ent.x + ent.width and
-                    ent.y <= wy < ent.y + ent.height):
-                state.selected_entity_instance = ent
-                self._dragging = True
-                self._drag_entity = ent
-                self._drag_offset_x = wx - ent.x
-                self._drag_offset_y = wy - ent.y
-                self._drag_start_x = ent.x
-                self._drag_start_y = ent.y
-                return
-        state.selected_entity_instance = None
+        # Topmost entity under cursor (later in the list = on top)
+        ent = li.entity_index().at_point(wx, wy)
+        state.selected_entity_instance = ent
+        if ent is None:
+            return
+        self._dragging = True
+        self._drag_entity = ent
+        self._drag_layer = li
+        self._drag_offset_x = wx - ent.x
+        self._drag_offset_y = wy - ent.y
+        self._drag_start_x = ent.x
+        self._drag_start_y = ent.y
 
     def _try_delete(self, state: EditorState, wx: float, wy: float) -> None:
         li = state.active_layer_instance
         if li is None or li.entities is None:
             return
-        for ent in reversed(li.entities):
-            if (ent.x <= wx < ent.x + ent.width and
-                    ent.y <= wy < ent.y + ent.height):
-                cmd = RemoveEntityCommand(layer_inst=li, entity=ent)
-                state.command_stack.execute(cmd)
-                if state.selected_entity_instance == ent:
-                    state.selected_entity_instance = None
-                state.needs_save = True
-                return
+        ent = li.entity_index().at_point(wx, wy)
+        if ent is None:
+            return
+        cmd = RemoveEntityCommand(layer_inst=li, entity=ent)
+        state.command_stack.execute(cmd)
+        if state.selected_entity_instance == ent:
+            state.selected_entity_instance = None
+        state.needs_save = True
 
     def draw_overlay(self, surface: pygame.Surface, state: EditorState) -> None:
         ent = state.selected_entity_instance
@@ -57,9 +57,7 @@ class IntGridBrush(Tool):
                 )
                 # Values already applied directly during drag; store old values for undo
                 cmd.old_values = list(self._old_values)
-                state.command_stack.undo_stack.append(cmd)
-                state.command_stack.redo_stack.clear()
-                state.command_stack._dirty = True
+                state.command_stack.push_applied(cmd)
                 state.needs_save = True
         self._painted_cells.clear()
         self._old_values.clear()
@@ -83,6 +81,7 @@ class IntGridBrush(Tool):
         self._old_values.append(old_val)
         li.set_intgrid_value(gx, gy, level.width_cells, state.intgrid_value)
         self._painted_cells.append((gx, gy, state.intgrid_value))
+        state.notify_intgrid_painted(li, [(gx, gy)])
 
     def draw_overlay(self, surface: pygame.Surface, state: EditorState) -> None:
         ld = state.active_layer_def
@@ -136,9 +135,7 @@ class IntGridEraser(Tool):
                     cells=list(self._painted_cells),
                 )
                 cmd.old_values = list(self._old_values)
-                state.command_stack.undo_stack.append(cmd)
-                state.command_stack.redo_stack.clear()
-                state.command_stack._dirty = True
+                state.command_stack.push_applied(cmd)
                 state.needs_save = True
         self._painted_cells.clear()
         self._old_values.clear()
@@ -162,6 +159,7 @@ class IntGridEraser(Tool):
         self._old_values.append(old_val)
         li.set_intgrid_value(gx, gy, level.width_cells, 0)
         self._painted_cells.append((gx, gy, 0))
+        state.notify_intgrid_painted(li, [(gx, gy)])
 
     def draw_overlay(self, surface: pygame.Surface, state: EditorState) -> None:
         ld = state.active_layer_def
@@ -236,10 +234,7 @@ class IntGridRectFill(Tool):
 
         cmd = PaintIntGridCommand(layer_inst=li, cols=level.width_cells, cells=cells)
         cmd.old_values = old_values
-        cmd.execute()
-        state.command_stack.undo_stack.append(cmd)
-        state.command_stack.redo_stack.clear()
-        state.command_stack._dirty = True
+        state.command_stack.execute(cmd)
         state.needs_save = True
 
     def draw_overlay(self, surface: pygame.Surface, state: EditorState) -> None:
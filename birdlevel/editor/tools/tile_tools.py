@@ -58,9 +58,7 @@ class TileBrush(Tool):
                     cells=list(self._painted_cells),
                 )
                 cmd.old_values = list(self._old_values)
-                state.command_stack.undo_stack.append(cmd)
-                state.command_stack.redo_stack.clear()
-                state.command_stack._dirty = True
+                state.command_stack.push_applied(cmd)
                 state.needs_save = True
         self._painted_cells.clear()
         self._old_values.clear()
@@ -166,10 +164,7 @@ class TileRect(Tool):
 
         cmd = PaintTileCommand(layer_inst=li, cols=level.width_cells, cells=cells)
         cmd.old_values = old_values
-        cmd.execute()
-        state.command_stack.undo_stack.append(cmd)
-        state.command_stack.redo_stack.clear()
-        state.command_stack._dirty = True
+        state.command_stack.execute(cmd)
         state.needs_save = True
 
     def draw_overlay(self, surface: pygame.Surface, state: EditorState) -> None:
@@ -237,10 +232,7 @@ class TileStamp(Tool):
         if cells:
             cmd = PaintTileCommand(layer_inst=li, cols=level.width_cells, cells=cells)
             cmd.old_values = old_values
-            cmd.execute()
-            state.command_stack.undo_stack.append(cmd)
-            state.command_stack.redo_stack.clear()
-            state.command_stack._dirty = True
+            state.command_stack.execute(cmd)
             state.needs_save = True
 
     def draw_overlay(self, surface: pygame.Surface, state: EditorState) -> None:
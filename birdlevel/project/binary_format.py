@@ -0,0 +1,134 @@
+"""Binary chunked container for BirdLevel projects.
+
+Layout (all integers little-endian):
+
+    magic      8 bytes   b"BIRDLVB\\0"
+    version    u32       container version
+    header_len u32       length of the JSON header
+    header     JSON      project dict, grids replaced by {"chunk": index}
+    data       bytes     grid chunks, back to back
+
+The header lists every chunk as {"type", "count", "codec", "offset", "size"},
+with offsets relative to the start of the data section.  Grids are stored as
+raw little-endian machine ints (int16/int32/int64), zlib-compressed unless
+compression is turned off.  Everything except the grids stays in JSON, so the
+dict layout is exactly the one the JSON format uses.
+"""
+from __future__ import annotations
+
+import json
+import struct
+import sys
+import zlib
+from array import array
+from typing import Any
+
+from birdlevel.project.grid import Grid
+
+MAGIC = b"BIRDLVB\x00"
+CONTAINER_VERSION = 1
+BINARY_EXTENSION = ".birdlevelb"
+
+_PREAMBLE = struct.Struct("<8sII")
+
+# Stored element type -> item size in bytes
+_ITEM_SIZES = {"i16": 2, "i32": 4, "i64": 8}
+
+
+def _typecode_for(itemsize: int) -> str:
+    for typecode in ("h", "i", "l", "q"):
+        if array(typecode).itemsize == itemsize:
+            return typecode
+    raise ValueError(f"no array typecode with item size {itemsize}")
+
+
+def is_binary_project(head: bytes) -> bool:
+    """True if head (the first bytes of a file) starts a binary project."""
+    return head[:len(MAGIC)] == MAGIC
+
+
+class ChunkWriter:
+    """Collects grids as chunks while the header dict is being built."""
+
+    def __init__(self, compress: bool = True, level: int = 1):
+        self.compress = compress
+        self.level = level
+        self._chunks: list[dict[str, Any]] = []
+        self._data: list[bytes] = []
+        self._offset = 0
+
+    def add(self, grid: Grid) -> dict[str, int]:
+        """Store a grid; returns the reference to put in the header dict."""
+        if sys.byteorder != "little":
+            grid = grid.copy()
+            grid.byteswap()
+        raw = grid.tobytes()
+        codec = "raw"
+        if self.compress:
+            raw = zlib.compress(raw, self.level)
+            codec = "zlib"
+        self._chunks.append({
+            "type": f"i{grid.itemsize * 8}",
+            "count": len(grid),
+            "codec": codec,
+            "offset": self._offset,
+            "size": len(raw),
+        })
+        self._data.append(raw)
+        self._offset += len(raw)
+        return {"chunk": len(self._chunks) - 1}
+
+    def add_encoded(self, info: dict[str, Any], raw: bytes) -> dict[str, int]:
+        """Store a chunk taken from another writer's chunks()."""
+        info = dict(info, offset=self._offset, size=len(raw))
+        self._chunks.append(info)
+        self._data.append(raw)
+        self._offset += len(raw)
+        return {"chunk": len(self._chunks) - 1}
+
+    def chunks(self) -> list[tuple[dict[str, Any], bytes]]:
+        """The stored chunks as (info, encoded bytes) pairs."""
+        return list(zip(self._chunks, self._data))
+
+    def write(self, header: dict[str, Any]) -> bytes:
+        """Assemble the whole file from the header dict and stored chunks."""
+        header = dict(header)
+        header["chunks"] = self._chunks
+        header_bytes = json.dumps(header, ensure_ascii=False,
+                                  separators=(",", ":")).encode("utf-8")
+        preamble = _PREAMBLE.pack(MAGIC, CONTAINER_VERSION, len(header_bytes))
+        return b"".join([preamble, header_bytes, *self._data])
+
+
+class ChunkReader:
+    """Parses a binary project and decodes grid chunks on request."""
+
+    def __init__(self, data: bytes):
+        if len(data) < _PREAMBLE.size or not is_binary_project(data):
+            raise ValueError("Not a binary BirdLevel project")
+        _magic, version, header_len = _PREAMBLE.unpack_from(data)
+        if version > CONTAINER_VERSION:
+            raise ValueError(f"Unsupported binary project version {version}")
+        start = _PREAMBLE.size
+        self.header: dict[str, Any] = json.loads(data[start:start + header_len].decode("utf-8"))
+        self._chunks: list[dict[str, Any]] = self.header.pop("chunks", [])
+        self._data = memoryview(data)[start + header_len:]
+
+    def grid(self, ref: dict[str, int]) -> Grid:
+        """Decode the grid a header reference points at."""
+        info = self._chunks[ref["chunk"]]
+        raw = self._data[info["offset"]:info["offset"] + info["size"]]
+        if info["codec"] == "zlib":
+            raw = zlib.decompress(raw)
+        elif info["codec"] != "raw":
+            raise ValueError(f"Unknown chunk codec {info['codec']!r}")
+        itemsize = _ITEM_SIZES.get(info["type"])
+        if itemsize is None:
+            raise ValueError(f"Unknown chunk type {info['type']!r}")
+        grid = Grid(_typecode_for(itemsize))
+        grid.frombytes(raw)
+        if sys.byteorder != "little":
+            grid.byteswap()
+        if len(grid) != info["count"]:
+            raise ValueError("Corrupt grid chunk: cell count mismatch")
+        return grid
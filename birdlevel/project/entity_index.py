@@ -0,0 +1,180 @@
+"""Spatial index for the entities of one layer instance.
+
+EntityIndex is a uniform grid (spatial hash) over world pixels: every entity
+is registered in each CELL_SIZE x CELL_SIZE bucket its rectangle overlaps,
+so point and rectangle queries only look at entities near the query instead
+of the whole list.  Entities covering very many buckets are kept aside and
+always tested, which keeps a few huge entities from bloating the buckets.
+
+The index mirrors a LayerInstance's entity list, including its order (later
+entities are drawn on top and picked first).  Every entity carries an order
+key that increases along the list, so results can be sorted without
+searching the list and an entity's list position is found by bisection.
+LayerInstance keeps list and index in step through its entity methods.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from birdlevel.project.models import EntityInstance
+
+# World pixels per bucket side
+CELL_SIZE = 128
+
+# Entities spanning more buckets than this are tested on every query
+MAX_CELLS_PER_ENTITY = 64
+
+
+class EntityIndex:
+    """Uniform-grid index of a list of entities, in list order."""
+
+    def __init__(self, entities: list[EntityInstance], cell_size: int = CELL_SIZE):
+        self.cell_size = cell_size
+        self.entities = entities
+        # (cx, cy) -> {id(entity): entity}
+        self._cells: dict[tuple[int, int], dict[int, EntityInstance]] = {}
+        # id(entity) -> bucket span (cx0, cy0, cx1, cy1), inclusive
+        self._spans: dict[int, tuple[int, int, int, int]] = {}
+        self._large: dict[int, EntityInstance] = {}
+        # id(entity) -> order key, increasing along the list
+        self._order: dict[int, float] = {}
+        self.rebuild()
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def in_sync(self, entities: list[EntityInstance] | None) -> bool:
+        """True if this index still mirrors entities (same list, same size)."""
+        return entities is self.entities and len(entities) == len(self._spans)
+
+    def rebuild(self) -> None:
+        self._cells.clear()
+        self._spans.clear()
+        self._large.clear()
+        self._order.clear()
+        for i, ent in enumerate(self.entities):
+            self._order[id(ent)] = float(i)
+            self._register(ent)
+
+    # ------------------------------------------------------------------
+    # Updates (the list itself is changed by the caller)
+    # ------------------------------------------------------------------
+
+    def inserted(self, ent: EntityInstance, position: int) -> None:
+        """ent was just inserted into the list at position."""
+        ents = self.entities
+        lo = self._order[id(ents[position - 1])] if position > 0 else None
+        hi = self._order[id(ents[position + 1])] if position + 1 < len(ents) else None
+        if lo is None and hi is None:
+            key = 0.0
+        elif hi is None:
+            key = lo + 1.0
+        elif lo is None:
+            key = hi - 1.0
+        else:
+            key = (lo + hi) / 2
+            if not lo < key < hi:  # out of float precision: renumber
+                self.rebuild()
+                return
+        self._order[id(ent)] = key
+        self._register(ent)
+
+    def position(self, ent: EntityInstance) -> int:
+        """Index of ent in the list, or -1."""
+        key = self._order.get(id(ent))
+        if key is None:
+            return -1
+        order = self._order
+        i = bisect_left(self.entities, key, key=lambda e: order[id(e)])
+        if i < len(self.entities) and self.entities[i] is ent:
+            return i
+        return -1
+
+    def removed(self, ent: EntityInstance) -> None:
+        """ent was just removed from the list."""
+        self._unregister(ent)
+        self._order.pop(id(ent), None)
+
+    def moved(self, ent: EntityInstance) -> None:
+        """ent's position or size changed."""
+        if id(ent) not in self._spans:
+            return
+        if self._span(ent) != self._spans[id(ent)]:
+            self._unregister(ent)
+            self._register(ent)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def query_rect(self, x: float, y: float, w: float, h: float) -> list[EntityInstance]:
+        """Entities overlapping the world rectangle, in list (draw) order."""
+        x1 = x + w
+        y1 = y + h
+        cx0, cy0, cx1, cy1 = self._cell_span(x, y, x1, y1)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) >= len(self._cells):
+            # Covers most of the layer: one pass over the list is cheaper
+            return [e for e in self.entities
+                    if e.x < x1 and x < e.x + e.width and e.y < y1 and y < e.y + e.height]
+        found: dict[int, EntityInstance] = dict(self._large)
+        cells = self._cells
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        hits = [e for e in found.values()
+                if e.x < x1 and x < e.x + e.width and e.y < y1 and y < e.y + e.height]
+        hits.sort(key=lambda e: self._order[id(e)])
+        return hits
+
+    def at_point(self, wx: float, wy: float) -> EntityInstance | None:
+        """Topmost entity containing the world point."""
+        bucket = self._cells.get((int(wx // self.cell_size), int(wy // self.cell_size)))
+        best: EntityInstance | None = None
+        best_key = 0.0
+        for candidates in (bucket or {}, self._large):
+            for e in candidates.values():
+                if e.x <= wx < e.x + e.width and e.y <= wy < e.y + e.height:
+                    key = self._order[id(e)]
+                    if best is None or key > best_key:
+                        best, best_key = e, key
+        return best
+
+    # ------------------------------------------------------------------
+
+    def _cell_span(self, x0: float, y0: float, x1: float, y1: float) -> tuple[int, int, int, int]:
+        cs = self.cell_size
+        return (int(x0 // cs), int(y0 // cs),
+                int(max(x0, x1 - 1) // cs), int(max(y0, y1 - 1) // cs))
+
+    def _span(self, ent: EntityInstance) -> tuple[int, int, int, int]:
+        return self._cell_span(ent.x, ent.y, ent.x + ent.width, ent.y + ent.height)
+
+    def _register(self, ent: EntityInstance) -> None:
+        span = self._span(ent)
+        self._spans[id(ent)] = span
+        cx0, cy0, cx1, cy1 = span
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > MAX_CELLS_PER_ENTITY:
+            self._large[id(ent)] = ent
+            return
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                self._cells.setdefault((cx, cy), {})[id(ent)] = ent
+
+    def _unregister(self, ent: EntityInstance) -> None:
+        span = self._spans.pop(id(ent), None)
+        if span is None:
+            return
+        if self._large.pop(id(ent), None) is not None:
+            return
+        cx0, cy0, cx1, cy1 = span
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                bucket = self._cells.get((cx, cy))
+                if bucket is not None:
+                    bucket.pop(id(ent), None)
+                    if not bucket:
+                        del self._cells[(cx, cy)]
@@ -0,0 +1,102 @@
+"""Compact typed storage for layer grids.
+
+Grid is an array.array of machine ints (2 bytes per cell by default) that
+otherwise behaves like the flat row-major lists it replaces: it indexes,
+iterates and compares equal to a list with the same values.  Row and
+rectangle accessors hand out memoryviews into the same buffer, so reading
+part of a grid never copies it.
+"""
+from __future__ import annotations
+
+from array import array
+from typing import Iterable
+
+# Narrowest first; a grid is widened when a value does not fit
+_TYPECODES = ("h", "i", "q")
+
+
+class Grid(array):
+    """Flat row-major grid of ints backed by an array.array.
+
+    Slicing returns a plain array (a copy, like list slicing); use row() and
+    rect() for zero-copy views.  Release views before resizing the grid:
+    array refuses to grow while a memoryview is exported.
+    """
+
+    def __new__(cls, typecode: str = "h", values: Iterable[int] = ()):
+        return super().__new__(cls, typecode, values)
+
+    @classmethod
+    def from_values(cls, values: Iterable[int]) -> Grid:
+        """Build a grid in the narrowest typecode that holds every value."""
+        if not isinstance(values, (list, tuple, array)):
+            values = list(values)
+        for typecode in _TYPECODES:
+            try:
+                return cls(typecode, values)
+            except OverflowError:
+                continue
+        raise OverflowError("grid value does not fit in 64 bits")
+
+    @classmethod
+    def filled(cls, size: int, value: int = 0) -> Grid:
+        """A grid of size cells all set to value."""
+        grid = cls.from_values((value,))
+        return grid * size if size != 1 else grid
+
+    def __mul__(self, n: int) -> Grid:
+        return type(self)(self.typecode, super().__mul__(n))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, array):
+            return super().__eq__(other)
+        if isinstance(other, (list, tuple)):
+            return len(self) == len(other) and self.tolist() == list(other)
+        return NotImplemented
+
+    def __ne__(self, other: object) -> bool:
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    __hash__ = None  # mutable, like list
+
+    def copy(self) -> Grid:
+        return type(self)(self.typecode, self)
+
+    def __copy__(self) -> Grid:
+        return self.copy()
+
+    def __deepcopy__(self, memo: dict) -> Grid:
+        return self.copy()
+
+    def widened(self, value: int) -> Grid:
+        """Return a copy in a typecode wide enough to also hold value."""
+        start = _TYPECODES.index(self.typecode) if self.typecode in _TYPECODES else 0
+        for typecode in _TYPECODES[start:]:
+            try:
+                array(typecode, (value,))
+            except OverflowError:
+                continue
+            return type(self)(typecode, self)
+        raise OverflowError(f"grid value {value} does not fit in 64 bits")
+
+    # ------------------------------------------------------------------
+    # Zero-copy views
+    # ------------------------------------------------------------------
+
+    def row(self, y: int, cols: int) -> memoryview:
+        """View of row y of a grid cols cells wide."""
+        return memoryview(self)[y * cols:(y + 1) * cols]
+
+    def row_span(self, y: int, x0: int, x1: int, cols: int) -> memoryview:
+        """View of cells [x0, x1) of row y."""
+        start = y * cols
+        return memoryview(self)[start + x0:start + x1]
+
+    def rect(self, x: int, y: int, w: int, h: int, cols: int) -> list[memoryview]:
+        """Views of the h rows of the w x h rectangle at (x, y)."""
+        view = memoryview(self)
+        return [view[(y + r) * cols + x:(y + r) * cols + x + w] for r in range(h)]
+
+    def nbytes(self) -> int:
+        return len(self) * self.itemsize
@@ -0,0 +1,174 @@
+"""On-demand level loading for projects saved with separate level files.
+
+The main project file only carries level metadata and a relative path per
+level.  Each level becomes a LazyLevel whose layers are read from its own
+file the first time they are accessed.  LevelStore keeps the loaded levels in
+LRU order and unloads the least recently used ones past its capacity, as long
+as they are unchanged since load/save and the editor allows it.
+"""
+from __future__ import annotations
+
+import json
+import os
+import zlib
+from collections import OrderedDict
+from dataclasses import fields
+from typing import Callable
+
+from birdlevel.project.binary_format import ChunkReader, is_binary_project
+from birdlevel.project.models import Definitions, LayerInstance, Level
+
+# Loaded levels kept in memory before LRU eviction starts
+DEFAULT_CAPACITY = 8
+
+
+class LazyLevel(Level):
+    """A Level whose layer data is loaded from its own file on first access."""
+
+    def __init__(self, store: LevelStore, file: str, **meta):
+        self._store = store
+        self._layers: list[LayerInstance] | None = None
+        super().__init__(**meta)
+        self._layers = None  # Level.__init__ assigned an empty default
+        # Level file path, relative to the project file's directory
+        self.file = file
+
+    @property
+    def layers(self) -> list[LayerInstance]:
+        if self._layers is None:
+            self._layers = self._store.load_layers(self)
+        else:
+            self._store.touch(self)
+        return self._layers
+
+    @layers.setter
+    def layers(self, value: list[LayerInstance]) -> None:
+        self._layers = value
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._layers is not None
+
+    def peek_layers(self) -> list[LayerInstance]:
+        # Bypasses the layers property so LRU order only follows real use
+        return self._layers if self._layers is not None else []
+
+    def unload(self) -> None:
+        self._layers = None
+
+
+class LevelStore:
+    """Reads level files on demand and evicts least recently used levels."""
+
+    def __init__(self, base_dir: str, definitions: Definitions,
+                 capacity: int = DEFAULT_CAPACITY):
+        self.base_dir = base_dir
+        self.definitions = definitions
+        self.capacity = capacity
+        # Extra veto on eviction (e.g. the active level, levels held by undo)
+        self.can_evict: Callable[[Level], bool] = lambda level: True
+        self._loaded: OrderedDict[str, LazyLevel] = OrderedDict()
+        # uid -> fingerprint of the layer data as loaded/last saved
+        self._fingerprints: dict[str, int] = {}
+
+    def make_level(self, level: Level, file: str) -> LazyLevel:
+        """Wrap a metadata-only Level (layers not loaded yet)."""
+        meta = {f.name: getattr(level, f.name) for f in fields(Level)
+                if f.init and f.name != "layers"}
+        return LazyLevel(self, file, **meta)
+
+    def path_for(self, level: LazyLevel) -> str:
+        return os.path.join(self.base_dir, level.file)
+
+    @property
+    def loaded_levels(self) -> list[LazyLevel]:
+        return list(self._loaded.values())
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def load_layers(self, level: LazyLevel) -> list[LayerInstance]:
+        from birdlevel.project.serialization import layer_instance_from_dict
+
+        with open(self.path_for(level), "rb") as f:
+            raw = f.read()
+        if is_binary_project(raw):
+            reader = ChunkReader(raw)
+            data, decode = reader.header, reader.grid
+        else:
+            data, decode = json.loads(raw.decode("utf-8")), None
+        layers = [layer_instance_from_dict(li, decode) for li in data.get("layers", [])]
+        layers = self._reconcile(level, layers)
+
+        self._loaded[level.uid] = level
+        self._loaded.move_to_end(level.uid)
+        self._fingerprints[level.uid] = _fingerprint(layers)
+        self._evict_over_capacity(keep=level)
+        return layers
+
+    def _reconcile(self, level: LazyLevel,
+                   layers: list[LayerInstance]) -> list[LayerInstance]:
+        """Match a level file's layers to the current layer definitions."""
+        known = {ld.uid for ld in self.definitions.layers}
+        level._layers = [li for li in layers if li.layer_def_uid in known]
+        level.ensure_layer_instances(self.definitions.layers)
+        return level._layers
+
+    def touch(self, level: LazyLevel) -> None:
+        if level.uid in self._loaded:
+            self._loaded.move_to_end(level.uid)
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+
+    def is_modified(self, level: LazyLevel) -> bool:
+        """True if the level's layers changed since they were loaded or saved."""
+        if not level.is_loaded:
+            return False
+        return _fingerprint(level._layers) != self._fingerprints.get(level.uid)
+
+    def mark_saved(self, level: LazyLevel) -> None:
+        """Record the level's current layers as what is on disk."""
+        if level.is_loaded:
+            self._fingerprints[level.uid] = _fingerprint(level._layers)
+
+    def unload(self, level: LazyLevel) -> bool:
+        """Drop a level's layers if it is unchanged and eviction is allowed."""
+        if not level.is_loaded or self.is_modified(level) or not self.can_evict(level):
+            return False
+        level.unload()
+        self._loaded.pop(level.uid, None)
+        self._fingerprints.pop(level.uid, None)
+        return True
+
+    def _evict_over_capacity(self, keep: LazyLevel) -> None:
+        excess = len(self._loaded) - self.capacity
+        if excess <= 0:
+            return
+        for level in list(self._loaded.values()):
+            if excess <= 0:
+                break
+            if level is keep:
+                continue
+            if self.unload(level):
+                excess -= 1
+
+
+def _fingerprint(layers: list[LayerInstance]) -> int:
+    """Cheap checksum of layer contents, used to detect unsaved edits."""
+    crc = 0
+    for li in layers:
+        crc = zlib.crc32(li.layer_def_uid.encode("utf-8"), crc)
+        for grid in (li.intgrid, li.tiles):
+            crc = zlib.crc32(b"\x00" if grid is None else grid.tobytes(), crc)
+        if li.entities:
+            for e in li.entities:
+                key = (e.uid, e.def_uid, e.x, e.y, e.width, e.height,
+                       sorted(e.fields.items(), key=lambda kv: kv[0]))
+                crc = zlib.crc32(repr(key).encode("utf-8"), crc)
+        if li.tile_stacks:
+            crc = zlib.crc32(repr(sorted(li.tile_stacks.items())).encode("utf-8"), crc)
+        crc = zlib.crc32(repr((li.visible, li.locked, li.opacity)).encode("utf-8"), crc)
+    return crc
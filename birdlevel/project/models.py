@@ -8,13 +8,73 @@ from __future__ import annotations
 import uuid
 from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+from birdlevel.project.entity_index import EntityIndex
+from birdlevel.project.grid import Grid
+
+if TYPE_CHECKING:
+    from birdlevel.project.level_store import LevelStore
 
 
 def _uid() -> str:
     return uuid.uuid4().hex[:12]
 
 
+class _UidIndex:
+    """uid -> position map over a list, for O(1) lookups by uid.
+
+    The list is edited freely elsewhere (appends, removals, reordering,
+    whole-list replacement), so the map remembers a cheap signature of the
+    list it was built from (the list object, its length, its first and
+    last items) and is rebuilt when that changes.  While the signature
+    holds, misses are trusted, so unknown uids cost a dict lookup too.  A
+    hit is still checked against the item at its position; one that no
+    longer matches (the list was reordered in place) rebuilds the map.
+    Assigning a new item into the middle of the list is not noticed by
+    misses; the lists are only appended to, removed from and reordered.
+    """
+
+    __slots__ = ("attr", "items", "signature", "positions")
+
+    def __init__(self, attr: str = "uid"):
+        self.attr = attr
+        self.items: list | None = None
+        self.signature: tuple = ()
+        self.positions: dict[str, int] = {}
+
+    def lookup(self, items: list, uid: str) -> Any:
+        if items is not self.items or not self._matches(items):
+            self._rebuild(items)
+        pos = self.positions.get(uid)
+        if pos is None:
+            return None
+        item = items[pos]
+        if getattr(item, self.attr) == uid:
+            return item
+        self._rebuild(items)
+        pos = self.positions.get(uid)
+        return items[pos] if pos is not None else None
+
+    def _matches(self, items: list) -> bool:
+        n, first, last = self.signature
+        return len(items) == n and (not items or (items[0] is first and items[-1] is last))
+
+    def _rebuild(self, items: list) -> None:
+        positions: dict[str, int] = {}
+        attr = self.attr
+        for i, item in enumerate(items):
+            positions.setdefault(getattr(item, attr), i)
+        self.items = items
+        self.signature = (len(items), items[0] if items else None, items[-1] if items else None)
+        self.positions = positions
+
+
+def _uid_index(attr: str = "uid") -> Any:
+    return field(default_factory=lambda: _UidIndex(attr), init=False, repr=False,
+                 compare=False)
+
+
 # ---------------------------------------------------------------------------
 # Enums
 # ---------------------------------------------------------------------------
@@ -158,29 +218,23 @@ class Definitions:
     layers: list[LayerDef] = field(default_factory=list)
     auto_rules: list[AutoRuleDef] = field(default_factory=list)
 
+    # Lookup indexes over the lists above
+    _tileset_uids: _UidIndex = _uid_index()
+    _enum_uids: _UidIndex = _uid_index()
+    _entity_uids: _UidIndex = _uid_index()
+    _layer_uids: _UidIndex = _uid_index()
+
     def tileset_by_uid(self, uid: str) -> TilesetDef | None:
-        for t in self.tilesets:
-            if t.uid == uid:
-                return t
-        return None
+        return self._tileset_uids.lookup(self.tilesets, uid)
 
     def layer_by_uid(self, uid: str) -> LayerDef | None:
-        for l in self.layers:
-            if l.uid == uid:
-                return l
-        return None
+        return self._layer_uids.lookup(self.layers, uid)
 
     def entity_by_uid(self, uid: str) -> EntityDef | None:
-        for e in self.entities:
-            if e.uid == uid:
-                return e
-        return None
+        return self._entity_uids.lookup(self.entities, uid)
 
     def enum_by_uid(self, uid: str) -> EnumDef | None:
-        for e in self.enums:
-            if e.uid == uid:
-                return e
-        return None
+        return self._enum_uids.lookup(self.enums, uid)
 
 
 # ---------------------------------------------------------------------------
@@ -208,10 +262,10 @@ class EntityInstance:
 @dataclass
 class LayerInstance:
     layer_def_uid: str = ""
-    # IntGrid data: flat list, row-major, size = cols * rows
-    intgrid: list[int] | None = None
-    # Tile data: flat list of tile IDs (-1 = empty), row-major
-    tiles: list[int] | None = None
+    # IntGrid data: flat Grid, row-major, size = cols * rows
+    intgrid: Grid | None = None
+    # Tile data: flat Grid of tile IDs (-1 = empty), row-major
+    tiles: Grid | None = None
     # Stacked tiles: sparse dict of (x,y) -> list[TileInstance]
     tile_stacks: dict[str, list[TileInstance]] | None = None
     # Entity instances
@@ -222,16 +276,26 @@ class LayerInstance:
     visible: bool = True
     locked: bool = False
     opacity: float = 1.0
+    # Spatial index of entities (built on first query, not saved)
+    _entity_index: EntityIndex | None = field(default=None, init=False, repr=False,
+                                              compare=False)
+
+    def __post_init__(self) -> None:
+        # Accept plain lists (e.g. from JSON) and store them compactly
+        if self.intgrid is not None and not isinstance(self.intgrid, Grid):
+            self.intgrid = Grid.from_values(self.intgrid)
+        if self.tiles is not None and not isinstance(self.tiles, Grid):
+            self.tiles = Grid.from_values(self.tiles)
 
     def ensure_intgrid(self, cols: int, rows: int) -> None:
         if self.intgrid is None:
-            self.intgrid = [0] * (cols * rows)
+            self.intgrid = Grid.filled(cols * rows, 0)
         elif len(self.intgrid) < cols * rows:
             self.intgrid.extend([0] * (cols * rows - len(self.intgrid)))
 
     def ensure_tiles(self, cols: int, rows: int) -> None:
         if self.tiles is None:
-            self.tiles = [-1] * (cols * rows)
+            self.tiles = Grid.filled(cols * rows, -1)
         elif len(self.tiles) < cols * rows:
             self.tiles.extend([-1] * (cols * rows - len(self.tiles)))
 
@@ -239,6 +303,47 @@ class LayerInstance:
         if self.entities is None:
             self.entities = []
 
+    def entity_index(self) -> EntityIndex:
+        """Spatial index of the entities, rebuilt if the list changed behind its back."""
+        self.ensure_entities()
+        index = self._entity_index
+        if index is None or not index.in_sync(self.entities):
+            index = self._entity_index = EntityIndex(self.entities)
+        return index
+
+    def _live_entity_index(self) -> EntityIndex | None:
+        index = self._entity_index
+        if index is not None and index.in_sync(self.entities):
+            return index
+        return None
+
+    def insert_entity(self, ent: EntityInstance, position: int | None = None) -> None:
+        """Insert an entity (at the end by default), keeping the index current."""
+        self.ensure_entities()
+        index = self._live_entity_index()
+        if position is None or not 0 <= position <= len(self.entities):
+            position = len(self.entities)
+        self.entities.insert(position, ent)
+        if index is not None:
+            index.inserted(ent, position)
+
+    def remove_entity(self, ent: EntityInstance) -> int:
+        """Remove an entity; returns the position it had, or -1 if absent."""
+        if not self.entities:
+            return -1
+        position = self.entity_index().position(ent)
+        if position < 0:
+            return -1
+        del self.entities[position]
+        self._entity_index.removed(ent)
+        return position
+
+    def entity_moved(self, ent: EntityInstance) -> None:
+        """Update the index after an entity's position or size changed."""
+        index = self._live_entity_index()
+        if index is not None:
+            index.moved(ent)
+
     def get_intgrid_value(self, x: int, y: int, cols: int) -> int:
         if self.intgrid is None:
             return 0
@@ -252,7 +357,11 @@ class LayerInstance:
             return
         idx = y * cols + x
         if 0 <= idx < len(self.intgrid):
-            self.intgrid[idx] = value
+            try:
+                self.intgrid[idx] = value
+            except OverflowError:
+                self.intgrid = self.intgrid.widened(value)
+                self.intgrid[idx] = value
 
     def get_tile(self, x: int, y: int, cols: int) -> int:
         if self.tiles is None:
@@ -267,7 +376,11 @@ class LayerInstance:
             return
         idx = y * cols + x
         if 0 <= idx < len(self.tiles):
-            self.tiles[idx] = tile_id
+            try:
+                self.tiles[idx] = tile_id
+            except OverflowError:
+                self.tiles = self.tiles.widened(tile_id)
+                self.tiles[idx] = tile_id
 
 
 @dataclass
@@ -280,6 +393,16 @@ class Level:
     height_cells: int = 20
     layers: list[LayerInstance] = field(default_factory=list)
     bg_color: tuple[int, int, int] = (40, 40, 60)
+    _layer_uids: _UidIndex = _uid_index("layer_def_uid")
+
+    @property
+    def is_loaded(self) -> bool:
+        """False while a lazily loaded level's layer data is still on disk."""
+        return True
+
+    def peek_layers(self) -> list[LayerInstance]:
+        """The loaded layers, without loading them or counting as a use."""
+        return self.layers
 
     def cols(self, grid_size: int = 16) -> int:
         return self.width_cells
@@ -294,10 +417,7 @@ class Level:
         return self.height_cells * grid_size
 
     def get_layer_instance(self, layer_def_uid: str) -> LayerInstance | None:
-        for li in self.layers:
-            if li.layer_def_uid == layer_def_uid:
-                return li
-        return None
+        return self._layer_uids.lookup(self.layers, layer_def_uid)
 
     def ensure_layer_instances(self, layer_defs: list[LayerDef]) -> None:
         existing = {li.layer_def_uid for li in self.layers}
@@ -325,6 +445,37 @@ class World:
     levels: list[Level] = field(default_factory=list)
 
 
+@dataclass
+class SaveState:
+    """What changed since the project was last written, for incremental saves.
+
+    Level uids are added by the editor as commands touch them; anything that
+    edits level data outside the command stack must call mark_level().
+    """
+    # Absolute path and layout the state refers to; a different target
+    # means everything is written again
+    path: str | None = None
+    layout: tuple[str, bool] | None = None
+    dirty_levels: set[str] = field(default_factory=set)
+    definitions_dirty: bool = True
+    # Encoded data kept between saves by the serializer
+    cache: dict[str, Any] = field(default_factory=dict)
+
+    def mark_level(self, level_uid: str) -> None:
+        self.dirty_levels.add(level_uid)
+
+    def mark_definitions(self) -> None:
+        self.definitions_dirty = True
+
+    def invalidate(self) -> None:
+        """Forget everything about the last save (next save writes it all)."""
+        self.path = None
+        self.layout = None
+        self.dirty_levels.clear()
+        self.definitions_dirty = True
+        self.cache.clear()
+
+
 @dataclass
 class Project:
     format_version: int = 1
@@ -334,6 +485,18 @@ class Project:
     worlds: list[World] = field(default_factory=list)
     file_path: str | None = None
     separate_level_files: bool = False
+    # On-disk format: "json" or "binary" (set from the file on load)
+    storage_format: str = "json"
+    # Loader for levels kept in their own files (separate_level_files)
+    level_store: LevelStore | None = field(default=None, repr=False, compare=False)
+    # Incremental save bookkeeping
+    save_state: SaveState = field(default_factory=SaveState, repr=False, compare=False)
+    # Bumped on edits to the level list, layer stack or definitions, so UI
+    # caches can tell when to rebuild
+    version: int = field(default=0, repr=False, compare=False)
+
+    def touch(self) -> None:
+        self.version += 1
 
     def active_world(self) -> World | None:
         if self.worlds:
@@ -3,10 +3,20 @@ from __future__ import annotations
 
 import json
 import os
+import re
 import tempfile
+import zlib
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
+from birdlevel.project.binary_format import (
+    BINARY_EXTENSION,
+    ChunkReader,
+    ChunkWriter,
+    is_binary_project,
+)
+from birdlevel.project.grid import Grid
+from birdlevel.project.level_store import LazyLevel, LevelStore
 from birdlevel.project.models import (
     AutoRuleDef,
     Definitions,
@@ -25,6 +35,7 @@ from birdlevel.project.models import (
     Project,
     RuleCell,
     RuleCellReq,
+    SaveState,
     TileInstance,
     TilesetDef,
     World,
@@ -32,6 +43,15 @@ from birdlevel.project.models import (
 
 FORMAT_VERSION = 1
 
+# Grid <-> stored value hooks; the JSON format stores plain lists, the
+# binary format stores chunk references
+GridEncoder = Callable[[Grid], Any]
+GridDecoder = Callable[[Any], Grid]
+
+
+def _grid_to_list(grid: Grid) -> list[int]:
+    return grid.tolist()
+
 
 # ---------------------------------------------------------------------------
 # Serialization helpers
@@ -181,7 +201,8 @@ def entity_instance_to_dict(ei: EntityInstance) -> dict:
     }
 
 
-def layer_instance_to_dict(li: LayerInstance) -> dict:
+def layer_instance_to_dict(li: LayerInstance,
+                           encode_grid: GridEncoder = _grid_to_list) -> dict:
     d: dict[str, Any] = {
         "layer_def_uid": li.layer_def_uid,
         "visible": li.visible,
@@ -189,9 +210,9 @@ def layer_instance_to_dict(li: LayerInstance) -> dict:
         "opacity": li.opacity,
     }
     if li.intgrid is not None:
-        d["intgrid"] = li.intgrid
+        d["intgrid"] = encode_grid(li.intgrid)
     if li.tiles is not None:
-        d["tiles"] = li.tiles
+        d["tiles"] = encode_grid(li.tiles)
     if li.tile_stacks is not None:
         stacks: dict[str, list[dict]] = {}
         for key, stack in li.tile_stacks.items():
@@ -202,7 +223,7 @@ def layer_instance_to_dict(li: LayerInstance) -> dict:
     return d
 
 
-def level_to_dict(level: Level) -> dict:
+def _level_meta_to_dict(level: Level) -> dict:
     return {
         "uid": level.uid,
         "name": level.name,
@@ -211,20 +232,36 @@ def level_to_dict(level: Level) -> dict:
         "width_cells": level.width_cells,
         "height_cells": level.height_cells,
         "bg_color": _color_to_list(level.bg_color),
-        "layers": [layer_instance_to_dict(li) for li in level.layers],
     }
 
 
-def world_to_dict(world: World) -> dict:
+def level_to_dict(level: Level, encode_grid: GridEncoder = _grid_to_list) -> dict:
+    d = _level_meta_to_dict(level)
+    d["layers"] = [layer_instance_to_dict(li, encode_grid) for li in level.layers]
+    return d
+
+
+def level_ref_to_dict(level: Level, file: str) -> dict:
+    """Level metadata plus the path of the file holding its layers."""
+    d = _level_meta_to_dict(level)
+    d["file"] = file
+    return d
+
+
+def world_to_dict(world: World, encode_grid: GridEncoder = _grid_to_list) -> dict:
     return {
         "uid": world.uid,
         "name": world.name,
         "layout": world.layout.value,
-        "levels": [level_to_dict(l) for l in world.levels],
+        "levels": [level_to_dict(l, encode_grid) for l in world.levels],
     }
 
 
-def project_to_dict(project: Project) -> dict:
+def project_to_dict(project: Project, encode_grid: GridEncoder = _grid_to_list) -> dict:
+    return _project_dict(project, [world_to_dict(w, encode_grid) for w in project.worlds])
+
+
+def _project_dict(project: Project, worlds: list[dict]) -> dict:
     return {
         "format_version": project.format_version,
         "project": {
@@ -232,7 +269,7 @@ def project_to_dict(project: Project) -> dict:
             "grid_size": project.grid_size,
             "separate_level_files": project.separate_level_files,
             "definitions": definitions_to_dict(project.definitions),
-            "worlds": [world_to_dict(w) for w in project.worlds],
+            "worlds": worlds,
         },
     }
 
@@ -372,7 +409,13 @@ def entity_instance_from_dict(d: dict) -> EntityInstance:
     )
 
 
-def layer_instance_from_dict(d: dict) -> LayerInstance:
+def _decode_grid(value: Any, decode_grid: GridDecoder | None) -> Any:
+    if isinstance(value, dict) and decode_grid is not None:
+        return decode_grid(value)
+    return value
+
+
+def layer_instance_from_dict(d: dict, decode_grid: GridDecoder | None = None) -> LayerInstance:
     tile_stacks = None
     if "tile_stacks" in d:
         tile_stacks = {}
@@ -383,8 +426,8 @@ def layer_instance_from_dict(d: dict) -> LayerInstance:
         entities = [entity_instance_from_dict(e) for e in d["entities"]]
     return LayerInstance(
         layer_def_uid=d.get("layer_def_uid", ""),
-        intgrid=d.get("intgrid"),
-        tiles=d.get("tiles"),
+        intgrid=_decode_grid(d.get("intgrid"), decode_grid),
+        tiles=_decode_grid(d.get("tiles"), decode_grid),
         tile_stacks=tile_stacks,
         entities=entities,
         visible=d.get("visible", True),
@@ -393,7 +436,7 @@ def layer_instance_from_dict(d: dict) -> LayerInstance:
     )
 
 
-def level_from_dict(d: dict) -> Level:
+def level_from_dict(d: dict, decode_grid: GridDecoder | None = None) -> Level:
     return Level(
         uid=d.get("uid", ""),
         name=d.get("name", ""),
@@ -402,27 +445,27 @@ def level_from_dict(d: dict) -> Level:
         width_cells=d.get("width_cells", 30),
         height_cells=d.get("height_cells", 20),
         bg_color=_list_to_color(d.get("bg_color")),
-        layers=[layer_instance_from_dict(li) for li in d.get("layers", [])],
+        layers=[layer_instance_from_dict(li, decode_grid) for li in d.get("layers", [])],
     )
 
 
-def world_from_dict(d: dict) -> World:
+def world_from_dict(d: dict, decode_grid: GridDecoder | None = None) -> World:
     return World(
         uid=d.get("uid", ""),
         name=d.get("name", ""),
         layout=LayoutMode(d.get("layout", "free")),
-        levels=[level_from_dict(l) for l in d.get("levels", [])],
+        levels=[level_from_dict(l, decode_grid) for l in d.get("levels", [])],
     )
 
 
-def project_from_dict(d: dict) -> Project:
+def project_from_dict(d: dict, decode_grid: GridDecoder | None = None) -> Project:
     pd = d.get("project", d)
     return Project(
         format_version=d.get("format_version", 1),
         name=pd.get("name", "Untitled"),
         grid_size=pd.get("grid_size", 16),
         definitions=definitions_from_dict(pd.get("definitions", {})),
-        worlds=[world_from_dict(w) for w in pd.get("worlds", [])],
+        worlds=[world_from_dict(w, decode_grid) for w in pd.get("worlds", [])],
         separate_level_files=pd.get("separate_level_files", False),
     )
 
@@ -432,22 +475,216 @@ def project_from_dict(d: dict) -> Project:
 # ---------------------------------------------------------------------------
 
 def save_project(project: Project, file_path: str | None = None) -> str:
-    """Save project to JSON atomically. Returns the path saved to."""
+    """Save project atomically. Returns the path saved to.
+
+    The format follows the target path: the binary container for the binary
+    extension, pretty-printed JSON for anything else.  Saving back to the
+    file the project came from keeps project.storage_format instead, so a
+    binary file loaded under another name stays binary.
+    With separate_level_files, each level goes to <stem>_levels/<uid> next to
+    the main file, which then only holds definitions and level references.
+
+    Saves are incremental: levels not listed in project.save_state as dirty
+    reuse their encoding from the previous save to the same path, and in the
+    split layout their files are not rewritten at all.
+    """
     path = file_path or project.file_path
     if path is None:
         path = os.path.join(os.getcwd(), f"{project.name}.birdlevel")
+    same_path = (project.file_path is not None
+                 and os.path.abspath(project.file_path) == os.path.abspath(path))
     project.file_path = path
+    if path.endswith(BINARY_EXTENSION):
+        project.storage_format = "binary"
+    elif not same_path:
+        project.storage_format = "json"
+    binary = project.storage_format == "binary"
+
+    state = project.save_state
+    abs_path = os.path.abspath(path)
+    layout = (project.storage_format, project.separate_level_files)
+    if state.path != abs_path or state.layout != layout:
+        state.invalidate()
+
+    if project.separate_level_files:
+        _save_split_project(project, path, binary, state)
+    elif binary:
+        _atomic_write(path, _binary_project_payload(project, state))
+    else:
+        _atomic_write(path, _json_project_payload(project, state))
+
+    state.path = abs_path
+    state.layout = layout
+    state.dirty_levels.clear()
+    state.definitions_dirty = False
+    return path
 
-    data = project_to_dict(project)
-    json_str = json.dumps(data, indent=2, ensure_ascii=False)
 
-    # Atomic write: temp file -> fsync -> rename
+def _json_payload(data: dict) -> bytes:
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def _world_header(world: World, levels: list[Any]) -> dict:
+    return {"uid": world.uid, "name": world.name,
+            "layout": world.layout.value, "levels": levels}
+
+
+def _reusable(level: Level, state: SaveState, cache: dict[str, Any]) -> Any:
+    """Cached encoding of a level, or None if it must be encoded again."""
+    if level.uid in state.dirty_levels:
+        return None
+    return cache.get(level.uid)
+
+
+def _prune_cache(cache: dict[str, Any], project: Project) -> None:
+    live = {level.uid for world in project.worlds for level in world.levels}
+    for uid in [uid for uid in cache if uid not in live]:
+        del cache[uid]
+
+
+# Level placeholders spliced into the pretty-printed project JSON
+_LEVEL_SLOT = "@@birdlevel-level-{}@@"
+_LEVEL_SLOT_RE = re.compile(r'^( *)"@@birdlevel-level-(\d+)@@"', re.MULTILINE)
+
+
+def _json_project_payload(project: Project, state: SaveState) -> bytes:
+    """Pretty-printed project JSON, reusing the text of unchanged levels."""
+    # uid -> (indent, encoded level text re-indented to sit at indent)
+    cache = state.cache.setdefault("json_levels", {})
+    levels: list[Level] = []
+    worlds: list[dict] = []
+    for world in project.worlds:
+        slots: list[str] = []
+        for level in world.levels:
+            slots.append(_LEVEL_SLOT.format(len(levels)))
+            levels.append(level)
+        worlds.append(_world_header(world, slots))
+    _prune_cache(cache, project)
+
+    # Splice each level's text in where its placeholder sits; the result is
+    # byte-identical to dumping the whole project in one go
+    text = json.dumps(_project_dict(project, worlds), indent=2, ensure_ascii=False)
+    parts = _LEVEL_SLOT_RE.split(text)
+    out = [parts[0].encode("utf-8")]
+    for i in range(1, len(parts), 3):
+        indent, level = parts[i], levels[int(parts[i + 1])]
+        entry = _reusable(level, state, cache)
+        if entry is None or entry[0] != indent:
+            level_text = json.dumps(level_to_dict(level), indent=2, ensure_ascii=False)
+            entry = (indent, (indent + level_text.replace("\n", "\n" + indent)).encode("utf-8"))
+            cache[level.uid] = entry
+        out.append(entry[1])
+        out.append(parts[i + 2].encode("utf-8"))
+    return b"".join(out)
+
+
+def _binary_project_payload(project: Project, state: SaveState) -> bytes:
+    """Binary container, reusing the compressed chunks of unchanged levels."""
+    cache = state.cache.setdefault("binary_levels", {})
+    writer = ChunkWriter()
+    worlds: list[dict] = []
+    for world in project.worlds:
+        levels: list[dict] = []
+        for level in world.levels:
+            entry = _reusable(level, state, cache)
+            if entry is None:
+                level_writer = ChunkWriter()
+                entry = (level_to_dict(level, level_writer.add), level_writer.chunks())
+                cache[level.uid] = entry
+            level_dict, chunks = entry
+            refs = [writer.add_encoded(info, raw) for info, raw in chunks]
+            levels.append(_rebase_chunk_refs(level_dict, refs))
+        worlds.append(_world_header(world, levels))
+    _prune_cache(cache, project)
+    return writer.write(_project_dict(project, worlds))
+
+
+def _rebase_chunk_refs(level_dict: dict, refs: list[dict[str, int]]) -> dict:
+    """Copy of a level dict with local chunk refs swapped for refs."""
+    layers = []
+    for li in level_dict["layers"]:
+        li = dict(li)
+        for key in ("intgrid", "tiles"):
+            if isinstance(li.get(key), dict):
+                li[key] = refs[li[key]["chunk"]]
+        layers.append(li)
+    return dict(level_dict, layers=layers)
+
+
+def _level_payload(level: Level, binary: bool) -> bytes:
+    if binary:
+        writer = ChunkWriter()
+        return writer.write(level_to_dict(level, writer.add))
+    return _json_payload(level_to_dict(level))
+
+
+def _save_split_project(project: Project, path: str, binary: bool,
+                        state: SaveState) -> None:
+    """Write changed levels to their own files, then the main file if needed."""
+    base_dir = os.path.dirname(os.path.abspath(path))
+    levels_dir = f"{Path(path).stem}_levels"
+    ext = BINARY_EXTENSION if binary else ".json"
+    store = project.level_store
+    # uids whose level file at this location is current
+    written: set[str] = state.cache.setdefault("split_levels", set())
+
+    worlds: list[dict] = []
+    files: set[str] = set()
+    saved: list[Level] = []
+    for world in project.worlds:
+        refs: list[dict] = []
+        for level in world.levels:
+            rel = f"{levels_dir}/{level.uid}{ext}"
+            target = os.path.join(base_dir, rel)
+            if level.uid not in written or level.uid in state.dirty_levels:
+                if level.is_loaded:
+                    _atomic_write(target, _level_payload(level, binary))
+                    saved.append(level)
+                else:
+                    # Untouched lazy level: its file is already current
+                    source = store.path_for(level)
+                    if os.path.abspath(source) != os.path.abspath(target):
+                        with open(source, "rb") as f:
+                            _atomic_write(target, f.read())
+            written.add(level.uid)
+            files.add(os.path.basename(target))
+            refs.append(level_ref_to_dict(level, rel))
+        worlds.append(_world_header(world, refs))
+
+    data = _project_dict(project, worlds)
+    payload = ChunkWriter().write(data) if binary else _json_payload(data)
+    digest = zlib.crc32(payload)
+    if state.definitions_dirty or state.cache.get("split_main") != digest:
+        _atomic_write(path, payload)
+        state.cache["split_main"] = digest
+
+    # Drop files of levels that no longer exist
+    abs_levels_dir = os.path.join(base_dir, levels_dir)
+    for name in os.listdir(abs_levels_dir) if os.path.isdir(abs_levels_dir) else []:
+        if name not in files and name.endswith((".json", BINARY_EXTENSION)):
+            os.unlink(os.path.join(abs_levels_dir, name))
+    live = {level.uid for world in project.worlds for level in world.levels}
+    written.intersection_update(live)
+
+    if store is not None:
+        store.base_dir = base_dir
+        for world in project.worlds:
+            for level in world.levels:
+                if isinstance(level, LazyLevel):
+                    level.file = f"{levels_dir}/{level.uid}{ext}"
+        for level in saved:
+            if isinstance(level, LazyLevel):
+                store.mark_saved(level)
+
+
+def _atomic_write(path: str, payload: bytes) -> None:
+    """Write payload to path via temp file -> fsync -> rename."""
     dir_path = os.path.dirname(os.path.abspath(path))
     os.makedirs(dir_path, exist_ok=True)
     fd, tmp_path = tempfile.mkstemp(dir=dir_path, suffix=".tmp")
     try:
-        with os.fdopen(fd, "w", encoding="utf-8") as f:
-            f.write(json_str)
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
             f.flush()
             os.fsync(f.fileno())
         os.replace(tmp_path, path)
@@ -455,13 +692,35 @@ def save_project(project: Project, file_path: str | None = None) -> str:
         if os.path.exists(tmp_path):
             os.unlink(tmp_path)
         raise
-    return path
 
 
 def load_project(file_path: str) -> Project:
-    """Load project from JSON file."""
-    with open(file_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    project = project_from_dict(data)
+    """Load a project file, detecting JSON or binary format from its contents."""
+    with open(file_path, "rb") as f:
+        raw = f.read()
+    if is_binary_project(raw):
+        reader = ChunkReader(raw)
+        data = reader.header
+        project = project_from_dict(data, reader.grid)
+        project.storage_format = "binary"
+    else:
+        data = json.loads(raw.decode("utf-8"))
+        project = project_from_dict(data)
     project.file_path = file_path
+    _attach_level_store(project, data, file_path)
     return project
+
+
+def _attach_level_store(project: Project, data: dict, file_path: str) -> None:
+    """Turn level references (no inline layers) into lazily loaded levels."""
+    pd = data.get("project", data)
+    store: LevelStore | None = None
+    for world, world_data in zip(project.worlds, pd.get("worlds", [])):
+        for i, level_data in enumerate(world_data.get("levels", [])):
+            if "file" not in level_data or "layers" in level_data:
+                continue
+            if store is None:
+                store = LevelStore(os.path.dirname(os.path.abspath(file_path)),
+                                   project.definitions)
+            world.levels[i] = store.make_level(world.levels[i], level_data["file"])
+    project.level_store = store
@@ -6,6 +6,50 @@ import pygame
 from birdlevel.render.camera import Camera
 
 
+# Below this many screen pixels between lines, only every 2nd, 4th, 8th...
+# line is drawn, so the grid coarsens instead of turning into a solid fill
+MIN_LINE_SPACING = 6.0
+# Lines fade in as their spacing grows from MIN_LINE_SPACING to this
+FULL_ALPHA_SPACING = 12.0
+
+# Rendered line patterns, most recently used last
+_PATTERN_CACHE_SIZE = 4
+_pattern_cache: dict[tuple, pygame.Surface] = {}
+
+
+def grid_lod(grid_size: int, zoom: float) -> tuple[int, int]:
+    """(cells between drawn lines, line alpha) for a grid at a zoom level."""
+    spacing = grid_size * zoom
+    step = 1
+    while spacing * step < MIN_LINE_SPACING:
+        step *= 2
+    alpha = int(255 * min(1.0, spacing * step / FULL_ALPHA_SPACING))
+    return step, alpha
+
+
+def _line_pattern(spacing: float, width: int, height: int,
+                  color: tuple[int, int, int, int]) -> pygame.Surface:
+    """Transparent surface with grid lines every spacing pixels from (0, 0)."""
+    key = (spacing, width, height, color)
+    pattern = _pattern_cache.pop(key, None)
+    if pattern is None:
+        pattern = pygame.Surface((width, height), pygame.SRCALPHA)
+        k = 0
+        while k * spacing < width:
+            x = int(k * spacing)
+            pattern.fill(color, (x, 0, 1, height))
+            k += 1
+        k = 0
+        while k * spacing < height:
+            y = int(k * spacing)
+            pattern.fill(color, (0, y, width, 1))
+            k += 1
+        if len(_pattern_cache) >= _PATTERN_CACHE_SIZE:
+            del _pattern_cache[next(iter(_pattern_cache))]
+    _pattern_cache[key] = pattern
+    return pattern
+
+
 def draw_grid(
     surface: pygame.Surface,
     camera: Camera,
@@ -14,35 +58,36 @@ def draw_grid(
     level_h: int,
     color: tuple[int, int, int, int] = (255, 255, 255, 30),
 ) -> None:
-    """Draw grid lines for the level area within the viewport."""
-    vr = camera.visible_world_rect()
-    # Clamp to level bounds
-    start_x = max(0, int(vr.x // grid_size) * grid_size)
-    start_y = max(0, int(vr.y // grid_size) * grid_size)
-    end_x = min(level_w, vr.x + vr.w + grid_size)
-    end_y = min(level_h, vr.y + vr.h + grid_size)
+    """Draw grid lines for the level area within the viewport.
 
-    clip = surface.get_clip()
-    surface.set_clip(camera.viewport)
+    The lines come from a cached pattern surface per zoom level, placed with
+    one blit.  Zoomed far out the grid switches to coarser, fainter lines
+    (see grid_lod).
+    """
+    step, alpha = grid_lod(grid_size, camera.zoom)
+    cell = grid_size * step  # world units between drawn lines
+    spacing = cell * camera.zoom
+    vp = camera.viewport
 
-    # Vertical lines
-    x = start_x
-    while x <= end_x:
-        sx, sy1 = camera.world_to_screen(x, max(0, vr.y))
-        _, sy2 = camera.world_to_screen(x, min(level_h, vr.y + vr.h))
-        if camera.viewport.x <= sx <= camera.viewport.x + camera.viewport.w:
-            pygame.draw.line(surface, color[:3], (int(sx), int(sy1)), (int(sx), int(sy2)), 1)
-        x += grid_size
-
-    # Horizontal lines
-    y = start_y
-    while y <= end_y:
-        sx1, sy = camera.world_to_screen(max(0, vr.x), y)
-        sx2, _ = camera.world_to_screen(min(level_w, vr.x + vr.w), y)
-        if camera.viewport.y <= sy <= camera.viewport.y + camera.viewport.h:
-            pygame.draw.line(surface, color[:3], (int(sx1), int(sy)), (int(sx2), int(sy)), 1)
-        y += grid_size
+    # Screen area covered by the level, plus the closing line at its far edge
+    sx1, sy1 = camera.world_to_screen(0, 0)
+    sx2, sy2 = camera.world_to_screen(level_w, level_h)
+    area = pygame.Rect(int(sx1), int(sy1), int(sx2) - int(sx1) + 1, int(sy2) - int(sy1) + 1)
+    area = area.clip(vp)
+    if area.w <= 0 or area.h <= 0:
+        return
 
+    # First drawn line at or before the viewport's top-left corner
+    vr = camera.visible_world_rect()
+    first_x = max(0, (vr.x // cell) * cell)
+    first_y = max(0, (vr.y // cell) * cell)
+    px, py = camera.world_to_screen(first_x, first_y)
+    pad = int(spacing) + 2
+    pattern = _line_pattern(spacing, vp.w + pad, vp.h + pad, (*color[:3], alpha))
+
+    clip = surface.get_clip()
+    surface.set_clip(area)
+    surface.blit(pattern, (int(px), int(py)))
     surface.set_clip(clip)
 
 
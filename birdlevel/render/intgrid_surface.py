@@ -0,0 +1,158 @@
+"""IntGrid layers drawn from one low-resolution palette surface per layer.
+
+Each IntGrid layer instance gets an RGBA buffer with one pixel per cell,
+coloured through the layer's value palette.  The surface wraps that buffer,
+so an edit only rewrites the pixels of the cells that changed.  Drawing is
+a single scaled blit of the visible cell range, so the cost follows the
+viewport size, not the number of painted cells.
+
+Edits are reported, not searched for: the cache listens to the command
+stack (Command.dirty_cells()) and to cells painted live mid-stroke, the
+same events the auto-layer scheduler re-solves from, and repaints just
+those cells on the next draw.  A grid that is replaced (level resize and
+its undo, a reload) or changes length is rebuilt.
+"""
+from __future__ import annotations
+
+import weakref
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+import pygame
+
+from birdlevel.project.models import LayerDef, LayerInstance
+
+if TYPE_CHECKING:
+    from birdlevel.editor.commands import Command
+
+# Alpha of painted cells at full layer opacity
+CELL_ALPHA = 180
+
+# Colour of values missing from the layer definition
+UNKNOWN_COLOR = (128, 128, 128)
+
+_CLEAR = bytes(4)
+
+# Layer surfaces kept before the least recently drawn is dropped
+DEFAULT_CAPACITY = 16
+
+
+class _LayerSurface:
+    __slots__ = ("ref", "grid_ref", "length", "cols", "rows", "palette", "dirty",
+                 "pixels", "surface", "version", "scaled_key", "scaled")
+
+    def __init__(self, layer_inst: LayerInstance, cols: int, rows: int,
+                 palette: dict[int, bytes]):
+        self.ref = weakref.ref(layer_inst)
+        grid = layer_inst.intgrid
+        # Edits that swap the grid object are not reported cell by cell
+        self.grid_ref = weakref.ref(grid)
+        self.length = len(grid)
+        self.cols = cols
+        self.rows = rows
+        self.palette = palette
+        # Cells reported changed since the last sync
+        self.dirty: list[tuple[int, int]] = []
+        self.pixels = _paint(grid, cols * rows, _lookup(palette))
+        self.surface = pygame.image.frombuffer(self.pixels, (cols, rows), "RGBA")
+        # Bumped whenever pixels change; part of the scaled copy's key
+        self.version = 0
+        self.scaled_key: tuple | None = None
+        self.scaled: pygame.Surface | None = None
+
+    def sync(self, layer_inst: LayerInstance) -> None:
+        """Repaint the pixels of cells reported changed since the last sync."""
+        if not self.dirty:
+            return
+        grid = layer_inst.intgrid
+        lookup = _lookup(self.palette)
+        cols, rows, pixels = self.cols, self.rows, self.pixels
+        if len(self.dirty) * 4 >= cols * rows:
+            # A fill over much of the layer: one pass beats cell by cell
+            pixels[:] = _paint(grid, cols * rows, lookup)
+        else:
+            size = len(grid)
+            for x, y in self.dirty:
+                if 0 <= x < cols and 0 <= y < rows:
+                    idx = y * cols + x
+                    i = idx * 4
+                    pixels[i:i + 4] = lookup(grid[idx]) if idx < size else _CLEAR
+        self.dirty.clear()
+        self.version += 1
+
+
+def _paint(grid, cells: int, lookup) -> bytearray:
+    """RGBA pixels, one per cell, for the first `cells` cells of grid."""
+    pixels = bytearray(b"".join(map(lookup, grid[:cells])))
+    pixels.extend(_CLEAR * (cells - len(grid)))  # short grid: rest is empty
+    return pixels
+
+
+def _lookup(palette: dict[int, bytes]):
+    unknown = bytes((*UNKNOWN_COLOR, CELL_ALPHA))
+
+    def lookup(value: int) -> bytes:
+        if value == 0:
+            return _CLEAR
+        return palette.get(value, unknown)
+    return lookup
+
+
+def _palette(layer_def: LayerDef) -> dict[int, bytes]:
+    return {vd.value: bytes((*vd.color, CELL_ALPHA)) for vd in layer_def.intgrid_values}
+
+
+class IntGridSurfaceCache:
+    """Per-layer palette surfaces for IntGrid drawing, in LRU order."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._layers: OrderedDict[int, _LayerSurface] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._layers)
+
+    def clear(self) -> None:
+        self._layers.clear()
+
+    def mark_dirty(self, layer_inst: LayerInstance, cells: list[tuple[int, int]]) -> None:
+        """Queue IntGrid cells of layer_inst for repainting on its next draw."""
+        entry = self._layers.get(id(layer_inst))
+        if entry is not None and entry.ref() is layer_inst:
+            entry.dirty.extend(cells)
+
+    def on_command(self, cmd: Command) -> None:
+        """CommandStack listener: queue whatever IntGrid cells cmd touched."""
+        dirty = cmd.dirty_cells()
+        if dirty is not None:
+            self.mark_dirty(*dirty)
+
+    def surface_for(self, layer_inst: LayerInstance, layer_def: LayerDef,
+                    cols: int, rows: int) -> _LayerSurface:
+        """The up-to-date palette surface of a layer instance."""
+        key = id(layer_inst)
+        palette = _palette(layer_def)
+        entry = self._layers.get(key)
+        grid = layer_inst.intgrid
+        if (entry is None or entry.ref() is not layer_inst
+                or (entry.cols, entry.rows) != (cols, rows)
+                or entry.palette != palette
+                or entry.grid_ref() is not grid or entry.length != len(grid)):
+            entry = _LayerSurface(layer_inst, cols, rows, palette)
+            self._layers[key] = entry
+        else:
+            entry.sync(layer_inst)
+        self._layers.move_to_end(key)
+        while len(self._layers) > self.capacity:
+            self._layers.popitem(last=False)
+        return entry
+
+    def scaled_region(self, entry: _LayerSurface, c0: int, r0: int, c1: int, r1: int,
+                      size: tuple[int, int]) -> pygame.Surface:
+        """Cells [c0, c1) x [r0, r1) scaled to size, reused while nothing changes."""
+        key = (c0, r0, c1, r1, size, entry.version)
+        if entry.scaled_key != key:
+            region = entry.surface.subsurface((c0, r0, c1 - c0, r1 - r0))
+            entry.scaled = pygame.transform.scale(region, size)
+            entry.scaled_key = key
+        return entry.scaled
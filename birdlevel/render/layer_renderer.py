@@ -1,17 +1,24 @@
 """Layer rendering for the editor canvas."""
 from __future__ import annotations
 
+import math
+from functools import partial
+
 import pygame
 
 from birdlevel.assets.tileset_loader import TilesetManager
 from birdlevel.project.models import (
     Definitions,
+    EntityDef,
     LayerDef,
     LayerInstance,
     LayerType,
     Level,
 )
 from birdlevel.render.camera import Camera
+from birdlevel.render.intgrid_surface import IntGridSurfaceCache
+from birdlevel.render.text_cache import render_text
+from birdlevel.render.tile_chunks import CHUNK_CELLS, MAX_CHUNK_CELL_PX, TileChunkCache
 
 
 class LayerRenderer:
@@ -23,6 +30,12 @@ class LayerRenderer:
         self.tileset_surfaces: dict[str, pygame.Surface] = {}
         # Cache for individual tile surfaces: (tileset_uid, tile_id) -> Surface
         self.tile_cache: dict[tuple[str, int], pygame.Surface] = {}
+        # Pre-rendered blocks of tile layers
+        self.tile_chunks = TileChunkCache()
+        # Per-layer palette surfaces for IntGrid layers
+        self.intgrid_surfaces = IntGridSurfaceCache()
+        # Translucent entity fills: (w, h, rgba) -> Surface
+        self._entity_fills: dict[tuple, pygame.Surface] = {}
 
     def load_tileset_surface(self, uid: str, path: str, tile_size: int,
                               spacing: int = 0, margin: int = 0) -> bool:
@@ -44,13 +57,21 @@ class LayerRenderer:
                 self.tile_cache[(uid, tile_id)] = img.subsurface(rect).copy()
         return True
 
-    def get_tile_surface(self, tileset_uid: str, tile_id: int) -> pygame.Surface | None:
+    def get_tile_surface(self, tileset_uid: str, tile_id: int,
+                         size: int | None = None) -> pygame.Surface | None:
+        """Tile surface, scaled to size x size if given (shared, don't modify)."""
         # Prefer TilesetManager if available
         if self.tileset_manager is not None:
-            surf = self.tileset_manager.get_tile(tileset_uid, tile_id)
+            if size is None:
+                surf = self.tileset_manager.get_tile(tileset_uid, tile_id)
+            else:
+                surf = self.tileset_manager.get_scaled_tile(tileset_uid, tile_id, size)
             if surf is not None:
                 return surf
-        return self.tile_cache.get((tileset_uid, tile_id))
+        surf = self.tile_cache.get((tileset_uid, tile_id))
+        if surf is not None and size is not None and surf.get_size() != (size, size):
+            surf = pygame.transform.scale(surf, (size, size))
+        return surf
 
     def draw_intgrid_layer(
         self,
@@ -66,36 +87,30 @@ class LayerRenderer:
         gs = layer_def.grid_size
         cols = level.width_cells
         rows = level.height_cells
-
-        # Build color map from definition
-        color_map: dict[int, tuple[int, int, int]] = {}
-        for vd in layer_def.intgrid_values:
-            color_map[vd.value] = vd.color
+        if cols <= 0 or rows <= 0:
+            return
 
         vr = camera.visible_world_rect()
         start_col = max(0, vr.x // gs)
         start_row = max(0, vr.y // gs)
         end_col = min(cols, (vr.x + vr.w) // gs + 2)
         end_row = min(rows, (vr.y + vr.h) // gs + 2)
+        if start_col >= end_col or start_row >= end_row:
+            return
+
+        # One pixel per cell, scaled up over the visible cell range
+        entry = self.intgrid_surfaces.surface_for(layer_inst, layer_def, cols, rows)
+        sx, sy = camera.world_to_screen(start_col * gs, start_row * gs)
+        size = (max(1, math.ceil((end_col - start_col) * gs * camera.zoom)),
+                max(1, math.ceil((end_row - start_row) * gs * camera.zoom)))
+        scaled = self.intgrid_surfaces.scaled_region(
+            entry, start_col, start_row, end_col, end_row, size)
+        alpha = int(255 * layer_inst.opacity)
+        scaled.set_alpha(alpha)
 
         clip = surface.get_clip()
         surface.set_clip(camera.viewport)
-
-        for gy in range(start_row, end_row):
-            for gx in range(start_col, end_col):
-                val = layer_inst.get_intgrid_value(gx, gy, cols)
-                if val == 0:
-                    continue
-                color = color_map.get(val, (128, 128, 128))
-                sx, sy = camera.world_to_screen(gx * gs, gy * gs)
-                scaled = int(gs * camera.zoom)
-                if scaled < 1:
-                    scaled = 1
-                alpha_color = (*color, int(180 * layer_inst.opacity))
-                cell_surf = pygame.Surface((scaled, scaled), pygame.SRCALPHA)
-                cell_surf.fill(alpha_color)
-                surface.blit(cell_surf, (int(sx), int(sy)))
-
+        surface.blit(scaled, (int(sx), int(sy)))
         surface.set_clip(clip)
 
     def draw_tile_layer(
@@ -114,6 +129,48 @@ class LayerRenderer:
         if ts_uid is None:
             return
         gs = layer_def.grid_size
+        if gs * camera.zoom > MAX_CHUNK_CELL_PX:
+            self._draw_tiles_direct(surface, camera, level, gs, ts_uid, layer_inst)
+            return
+        cols = level.width_cells
+        rows = level.height_cells
+        chunk_px = CHUNK_CELLS * gs
+
+        vr = camera.visible_world_rect()
+        start_cx = max(0, vr.x // chunk_px)
+        start_cy = max(0, vr.y // chunk_px)
+        end_cx = min((cols + CHUNK_CELLS - 1) // CHUNK_CELLS, (vr.x + vr.w) // chunk_px + 1)
+        end_cy = min((rows + CHUNK_CELLS - 1) // CHUNK_CELLS, (vr.y + vr.h) // chunk_px + 1)
+
+        clip = surface.get_clip()
+        surface.set_clip(camera.viewport)
+
+        alpha = int(255 * layer_inst.opacity)
+        sources = (self.tileset_manager.get_surface(ts_uid) if self.tileset_manager else None,
+                   self.tileset_surfaces.get(ts_uid))
+        lookup = partial(self._tile_at_size, ts_uid, gs)
+        for cy in range(start_cy, end_cy):
+            for cx in range(start_cx, end_cx):
+                # Span chunk edges by rounding up so neighbours never leave a gap
+                wx, wy = cx * chunk_px, cy * chunk_px
+                w = min(CHUNK_CELLS, cols - cx * CHUNK_CELLS) * gs
+                h = min(CHUNK_CELLS, rows - cy * CHUNK_CELLS) * gs
+                sx, sy = camera.world_to_screen(wx, wy)
+                size = (max(1, math.ceil(w * camera.zoom)), max(1, math.ceil(h * camera.zoom)))
+                chunk = self.tile_chunks.get(layer_inst, cols, rows, gs, cx, cy, size,
+                                             lookup, sources)
+                # Not None at full opacity: that also turns off per-pixel blending
+                chunk.set_alpha(alpha)
+                surface.blit(chunk, (int(sx), int(sy)))
+
+        surface.set_clip(clip)
+
+    def _tile_at_size(self, ts_uid: str, size: int, tile_id: int) -> pygame.Surface | None:
+        return self.get_tile_surface(ts_uid, tile_id, size)
+
+    def _draw_tiles_direct(self, surface: pygame.Surface, camera: Camera, level: Level,
+                           gs: int, ts_uid: str, layer_inst: LayerInstance) -> None:
+        """Draw visible tiles one by one (used when zoomed in close)."""
         cols = level.width_cells
         rows = level.height_cells
 
@@ -133,7 +190,7 @@ class LayerRenderer:
                 tid = layer_inst.get_tile(gx, gy, cols)
                 if tid < 0:
                     continue
-                tile_surf = self.get_tile_surface(ts_uid, tid)
+                tile_surf = self.get_tile_surface(ts_uid, tid, scaled)
                 if tile_surf is None:
                     # Draw placeholder
                     sx, sy = camera.world_to_screen(gx * gs, gy * gs)
@@ -142,8 +199,6 @@ class LayerRenderer:
                     surface.blit(placeholder, (int(sx), int(sy)))
                     continue
                 sx, sy = camera.world_to_screen(gx * gs, gy * gs)
-                if scaled != gs:
-                    tile_surf = pygame.transform.scale(tile_surf, (scaled, scaled))
                 if layer_inst.opacity < 1.0:
                     tile_surf = tile_surf.copy()
                     tile_surf.set_alpha(int(255 * layer_inst.opacity))
@@ -161,39 +216,61 @@ class LayerRenderer:
         defs: Definitions,
         font: pygame.font.Font | None = None,
     ) -> None:
-        """Draw entity instances."""
-        if layer_inst.entities is None:
+        """Draw the entity instances inside the viewport."""
+        if not layer_inst.entities:
             return
 
         clip = surface.get_clip()
         surface.set_clip(camera.viewport)
 
-        for ent in layer_inst.entities:
-            edef = defs.entity_by_uid(ent.def_uid)
+        view = camera.visible_world_rect().inflate(2, 2)
+        visible = layer_inst.entity_index().query_rect(view.x, view.y, view.w, view.h)
+        alpha = int(140 * layer_inst.opacity)
+        show_labels = font is not None and camera.zoom >= 0.5
+        edefs: dict[str, EntityDef | None] = {}
+        zoom = camera.zoom
+        ox, oy = camera.world_to_screen(0, 0)
+
+        for ent in visible:
+            if ent.def_uid not in edefs:
+                edefs[ent.def_uid] = defs.entity_by_uid(ent.def_uid)
+            edef = edefs[ent.def_uid]
             color = edef.color if edef else (255, 100, 100)
-            sx, sy = camera.world_to_screen(ent.x, ent.y)
-            sw = int(ent.width * camera.zoom)
-            sh = int(ent.height * camera.zoom)
+            sx = ent.x * zoom + ox
+            sy = ent.y * zoom + oy
+            sw = int(ent.width * zoom)
+            sh = int(ent.height * zoom)
             if sw < 2:
                 sw = 2
             if sh < 2:
                 sh = 2
-
-            # Fill
-            ent_surf = pygame.Surface((sw, sh), pygame.SRCALPHA)
-            ent_surf.fill((*color, int(140 * layer_inst.opacity)))
-            surface.blit(ent_surf, (int(sx), int(sy)))
-            # Border
-            pygame.draw.rect(surface, color, (int(sx), int(sy), sw, sh), 2)
+            if sw <= 4 and sh <= 4:
+                # A few pixels across is all border: one solid fill
+                surface.fill(color, (int(sx), int(sy), sw, sh))
+            else:
+                # Fill
+                surface.blit(self._entity_fill(sw, sh, (*color, alpha)), (int(sx), int(sy)))
+                # Border
+                pygame.draw.rect(surface, color, (int(sx), int(sy), sw, sh), 2)
 
             # Label
-            if font and camera.zoom >= 0.5:
-                name = edef.name if edef else "?"
-                label = font.render(name, True, (255, 255, 255))
+            if show_labels:
+                label = render_text(font, edef.name if edef else "?", (255, 255, 255))
                 surface.blit(label, (int(sx) + 2, int(sy) + 2))
 
         surface.set_clip(clip)
 
+    def _entity_fill(self, w: int, h: int, rgba: tuple) -> pygame.Surface:
+        key = (w, h, rgba)
+        surf = self._entity_fills.get(key)
+        if surf is None:
+            if len(self._entity_fills) >= 256:
+                self._entity_fills.clear()
+            surf = pygame.Surface((w, h), pygame.SRCALPHA)
+            surf.fill(rgba)
+            self._entity_fills[key] = surf
+        return surf
+
     def draw_layer(
         self,
         surface: pygame.Surface,
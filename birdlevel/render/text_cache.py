@@ -0,0 +1,61 @@
+"""Shared cache of rendered text surfaces.
+
+Rasterising text is one of the more expensive calls a frame makes, and the
+editor draws the same strings every frame: panel headers, button labels,
+entity names.  render_text() hands out one surface per (font, text, color,
+antialias) and keeps the most recently used ones, so a string is only
+rasterised again after it falls out of the cache.
+
+Returned surfaces are shared: blit them, never draw on them.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+
+import pygame
+
+# Surfaces kept before the least recently used is dropped
+DEFAULT_CAPACITY = 2048
+
+
+class TextCache:
+    """LRU cache of font.render() results, with hit/miss counters."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._surfaces: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+    def clear(self) -> None:
+        self._surfaces.clear()
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font: pygame.font.Font, text: str, color, antialias: bool = True) -> pygame.Surface:
+        key = (font, text, tuple(color), antialias)
+        surf = self._surfaces.get(key)
+        if surf is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = font.render(text, antialias, color)
+        self._surfaces[key] = surf
+        if len(self._surfaces) > self.capacity:
+            self._surfaces.popitem(last=False)
+        return surf
+
+
+# The cache every editor render path shares
+text_cache = TextCache()
+
+
+def render_text(font: pygame.font.Font, text: str, color, antialias: bool = True) -> pygame.Surface:
+    """font.render(text, antialias, color), cached in the shared TextCache."""
+    return text_cache.render(font, text, color, antialias)
@@ -0,0 +1,190 @@
+"""Cached rendering of tile layers in fixed-size chunks.
+
+A tile layer is cut into CHUNK_CELLS x CHUNK_CELLS blocks.  Each block is
+rendered once to a surface at native tile resolution (the base) and scaled
+copies are kept per on-screen size, so drawing a zoomed-out level costs one
+blit per visible chunk instead of one scale + blit per tile.
+
+Chunks are validated by content rather than by edit notifications: every
+chunk remembers the raw bytes of its cells and the tileset surfaces it was
+drawn from, and is rebuilt when either differs.  That covers commands,
+tools painting mid-stroke, the auto-layer solver and undo alike.  Surfaces
+are held in LRU order under a byte budget; bases go first, since scaled
+copies are what gets blitted every frame.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Callable
+
+import pygame
+
+from birdlevel.project.models import LayerInstance
+
+# Cells per chunk side
+CHUNK_CELLS = 32
+
+# Above this many screen pixels per cell, tiles are drawn one by one instead
+# (only a handful are visible, and scaled chunks would be huge)
+MAX_CHUNK_CELL_PX = 32
+
+DEFAULT_BUDGET_BYTES = 96 * 1024 * 1024
+
+PLACEHOLDER_COLOR = (180, 120, 200, 180)
+
+TileLookup = Callable[[int], "pygame.Surface | None"]
+
+
+class _Chunk:
+    __slots__ = ("signature", "sources", "base", "scaled")
+
+    def __init__(self, signature: bytes, sources: tuple):
+        self.signature = signature
+        self.sources = sources
+        self.base: pygame.Surface | None = None
+        # (width, height) on screen -> scaled copy of base
+        self.scaled: dict[tuple[int, int], pygame.Surface] = {}
+
+
+def _surface_bytes(surf: pygame.Surface) -> int:
+    return surf.get_width() * surf.get_height() * surf.get_bytesize()
+
+
+def _same_sources(a: tuple, b: tuple) -> bool:
+    return len(a) == len(b) and all(x is y for x, y in zip(a, b))
+
+
+class TileChunkCache:
+    """LRU cache of pre-rendered tile layer chunks."""
+
+    def __init__(self, budget_bytes: int = DEFAULT_BUDGET_BYTES,
+                 max_scaled_per_chunk: int = 2):
+        self.budget_bytes = budget_bytes
+        self.max_scaled_per_chunk = max_scaled_per_chunk
+        # (id(layer_inst), cols, grid_size, cx, cy) -> chunk
+        self._chunks: OrderedDict[tuple, _Chunk] = OrderedDict()
+        self._bytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def clear(self) -> None:
+        self._chunks.clear()
+        self._bytes = 0
+
+    def invalidate(self, layer_inst: LayerInstance) -> None:
+        """Drop every chunk of one layer instance."""
+        lid = id(layer_inst)
+        for key in [k for k in self._chunks if k[0] == lid]:
+            self._drop(key)
+
+    def get(self, layer_inst: LayerInstance, cols: int, rows: int, grid_size: int,
+            cx: int, cy: int, size: tuple[int, int], tile_lookup: TileLookup,
+            sources: tuple = ()) -> pygame.Surface:
+        """Return chunk (cx, cy) of a tile layer scaled to size pixels.
+
+        tile_lookup maps a tile id to its native surface (None draws a
+        placeholder); sources are the objects those surfaces come from,
+        compared by identity to notice a reloaded tileset.
+        """
+        key = (id(layer_inst), cols, grid_size, cx, cy)
+        signature = _chunk_signature(layer_inst, cols, rows, cx, cy)
+        chunk = self._chunks.get(key)
+        if chunk is None or chunk.signature != signature or not _same_sources(chunk.sources, sources):
+            if chunk is not None:
+                self._drop(key)
+            chunk = _Chunk(signature, sources)
+            self._chunks[key] = chunk
+        else:
+            self._chunks.move_to_end(key)
+
+        surf = chunk.scaled.get(size)
+        if surf is not None:
+            return surf
+        if chunk.base is None:
+            chunk.base = _render_base(layer_inst, cols, rows, grid_size, cx, cy, tile_lookup)
+            self._bytes += _surface_bytes(chunk.base)
+        if size == chunk.base.get_size():
+            surf = chunk.base
+        else:
+            surf = pygame.transform.scale(chunk.base, size)
+            if len(chunk.scaled) >= self.max_scaled_per_chunk:
+                old = chunk.scaled.pop(next(iter(chunk.scaled)))
+                if old is not chunk.base:
+                    self._bytes -= _surface_bytes(old)
+            self._bytes += _surface_bytes(surf)
+        chunk.scaled[size] = surf
+        self._evict_over_budget(keep=key)
+        return surf
+
+    def _drop(self, key: tuple) -> None:
+        chunk = self._chunks.pop(key)
+        if chunk.base is not None:
+            self._bytes -= _surface_bytes(chunk.base)
+        for surf in chunk.scaled.values():
+            if surf is not chunk.base:
+                self._bytes -= _surface_bytes(surf)
+
+    def _evict_over_budget(self, keep: tuple) -> None:
+        if self._bytes <= self.budget_bytes:
+            return
+        # Bases first: they are only needed to make a new scaled copy
+        for key, chunk in self._chunks.items():
+            if self._bytes <= self.budget_bytes:
+                return
+            if key == keep or chunk.base is None:
+                continue
+            if not any(s is chunk.base for s in chunk.scaled.values()):
+                self._bytes -= _surface_bytes(chunk.base)
+            chunk.base = None
+        for key in list(self._chunks):
+            if self._bytes <= self.budget_bytes:
+                return
+            if key != keep:
+                self._drop(key)
+
+
+def _chunk_signature(layer_inst: LayerInstance, cols: int, rows: int,
+                     cx: int, cy: int) -> bytes:
+    """Raw cell bytes of a chunk (plus item size, since grids can widen)."""
+    tiles = layer_inst.tiles
+    x0 = cx * CHUNK_CELLS
+    x1 = min(cols, x0 + CHUNK_CELLS)
+    y0 = cy * CHUNK_CELLS
+    y1 = min(rows, y0 + CHUNK_CELLS)
+    if len(tiles) < cols * rows:
+        return bytes(tiles[y0 * cols:]) + bytes([tiles.itemsize])
+    return b"".join([bytes([tiles.itemsize]),
+                     *(tiles.row_span(y, x0, x1, cols) for y in range(y0, y1))])
+
+
+def _render_base(layer_inst: LayerInstance, cols: int, rows: int, grid_size: int,
+                 cx: int, cy: int, tile_lookup: TileLookup) -> pygame.Surface:
+    """Render a chunk at one pixel per world pixel."""
+    gs = grid_size
+    x0 = cx * CHUNK_CELLS
+    y0 = cy * CHUNK_CELLS
+    w = min(CHUNK_CELLS, cols - x0)
+    h = min(CHUNK_CELLS, rows - y0)
+    surf = pygame.Surface((w * gs, h * gs), pygame.SRCALPHA)
+    fitted: dict[int, pygame.Surface | None] = {}
+    for ly in range(h):
+        for lx in range(w):
+            tid = layer_inst.get_tile(x0 + lx, y0 + ly, cols)
+            if tid < 0:
+                continue
+            if tid not in fitted:
+                tile_surf = tile_lookup(tid)
+                if tile_surf is not None and tile_surf.get_size() != (gs, gs):
+                    tile_surf = pygame.transform.scale(tile_surf, (gs, gs))
+                fitted[tid] = tile_surf
+            tile_surf = fitted[tid]
+            if tile_surf is None:
+                surf.fill(PLACEHOLDER_COLOR, (lx * gs, ly * gs, gs, gs))
+            else:
+                surf.blit(tile_surf, (lx * gs, ly * gs))
+    return surf
@@ -1,19 +1,28 @@
 """Auto-layer rule solver: generates tile layers from IntGrid data."""
 from __future__ import annotations
 
-import random
-from typing import Any
+import time
+from typing import TYPE_CHECKING, Any, Sequence
 
+from birdlevel.project.grid import Grid
 from birdlevel.project.models import (
-    AutoRuleDef,
     Definitions,
     LayerDef,
     LayerInstance,
     LayerType,
     Level,
-    RuleCell,
-    RuleCellReq,
+    Project,
 )
+from birdlevel.rules.rule_compiler import CompiledRuleSet, compile_rules, level_seed
+
+if TYPE_CHECKING:
+    from birdlevel.editor.commands import Command
+
+# Dirty sets at least this large (and dense) are solved with one region pass
+_REGION_PASS_MIN_CELLS = 64
+# The scheduler queues dirty cells in square blocks of this size and solves
+# one block at a time, so each solve is a small dense region pass
+_SCHEDULER_BLOCK = 32
 
 
 class RuleSolver:
@@ -21,6 +30,8 @@ class RuleSolver:
 
     def __init__(self, definitions: Definitions):
         self.definitions = definitions
+        # source_layer_uid -> compiled rules, built on first use
+        self._compiled: dict[str, CompiledRuleSet] = {}
 
     def solve_all(self, level: Level) -> None:
         """Run all auto-layer rules for the given level."""
@@ -32,26 +43,45 @@ class RuleSolver:
             self._solve_layer(level, ld)
 
     def solve_dirty(self, level: Level, dirty_cells: set[tuple[int, int]],
-                    padding: int = 1) -> None:
-        """Incrementally re-solve only around dirty cells."""
+                    padding: int | None = None,
+                    source_layer_uid: str | None = None) -> None:
+        """Incrementally re-solve only around dirty cells.
+
+        padding defaults to the largest pattern radius of each layer's rules, so
+        every cell whose pattern can see a dirty cell is re-evaluated.  Pass
+        source_layer_uid to only touch auto layers fed by that IntGrid layer.
+        """
         if not dirty_cells:
             return
-        # Expand dirty region by padding
-        expanded: set[tuple[int, int]] = set()
-        for cx, cy in dirty_cells:
-            for dx in range(-padding, padding + 1):
-                for dy in range(-padding, padding + 1):
-                    nx, ny = cx + dx, cy + dy
-                    if 0 <= nx < level.width_cells and 0 <= ny < level.height_cells:
-                        expanded.add((nx, ny))
-
+        expanded_by_pad: dict[int, set[tuple[int, int]]] = {}
         for ld in self.definitions.layers:
             if ld.layer_type != LayerType.AUTO_LAYER:
                 continue
             if ld.source_layer_uid is None:
                 continue
+            if source_layer_uid is not None and ld.source_layer_uid != source_layer_uid:
+                continue
+            pad = padding if padding is not None else self.compiled_rules(ld.source_layer_uid).radius
+            expanded = expanded_by_pad.get(pad)
+            if expanded is None:
+                expanded = _expand_cells(dirty_cells, pad, level.width_cells, level.height_cells)
+                expanded_by_pad[pad] = expanded
             self._solve_layer_partial(level, ld, expanded)
 
+    def compiled_rules(self, source_layer_uid: str) -> CompiledRuleSet:
+        """Return the compiled rule set for a source IntGrid layer (cached)."""
+        compiled = self._compiled.get(source_layer_uid)
+        if compiled is None:
+            rules = [r for r in self.definitions.auto_rules
+                     if r.source_layer_uid == source_layer_uid]
+            compiled = compile_rules(rules)
+            self._compiled[source_layer_uid] = compiled
+        return compiled
+
+    def invalidate(self) -> None:
+        """Drop compiled rules; call after editing auto-rule definitions."""
+        self._compiled.clear()
+
     def _solve_layer(self, level: Level, auto_ld: LayerDef) -> None:
         """Full solve for one auto-layer."""
         li = level.get_layer_instance(auto_ld.uid)
@@ -63,22 +93,12 @@ class RuleSolver:
         if source_li is None or source_li.intgrid is None:
             return
 
-        # Get applicable rules
-        rules = [r for r in self.definitions.auto_rules
-                 if r.source_layer_uid == auto_ld.source_layer_uid]
-        rules.sort(key=lambda r: r.priority, reverse=True)
-
+        compiled = self.compiled_rules(auto_ld.source_layer_uid)
         cols = level.width_cells
         rows = level.height_cells
 
-        # Clear auto tiles
-        li.tiles = [-1] * (cols * rows)
-
-        for gy in range(rows):
-            for gx in range(cols):
-                tile_id = self._evaluate_cell(gx, gy, cols, rows, source_li, rules)
-                if tile_id >= 0:
-                    li.set_tile(gx, gy, cols, tile_id)
+        li.tiles = Grid.from_values(solve_rows(compiled, source_li.intgrid, cols, rows,
+                                               0, rows, level_seed(level.uid)))
 
     def _solve_layer_partial(self, level: Level, auto_ld: LayerDef,
                              cells: set[tuple[int, int]]) -> None:
@@ -92,89 +112,164 @@ class RuleSolver:
         if source_li is None or source_li.intgrid is None:
             return
 
-        rules = [r for r in self.definitions.auto_rules
-                 if r.source_layer_uid == auto_ld.source_layer_uid]
-        rules.sort(key=lambda r: r.priority, reverse=True)
-
+        compiled = self.compiled_rules(auto_ld.source_layer_uid)
         cols = level.width_cells
         rows = level.height_cells
+        grid = source_li.intgrid
+        lseed = level_seed(level.uid)
+
+        if len(cells) >= _REGION_PASS_MIN_CELLS:
+            x0 = min(x for x, _ in cells)
+            x1 = max(x for x, _ in cells) + 1
+            y0 = min(y for _, y in cells)
+            y1 = max(y for _, y in cells) + 1
+            if len(cells) * 4 >= (x1 - x0) * (y1 - y0):
+                # Dense dirty set: one bitset pass over its bounding box
+                matches = {idx: cr for cr, indices
+                           in compiled.match_region(grid, cols, rows, x0, y0, x1, y1)
+                           for idx in indices}
+                for gx, gy in cells:
+                    cr = matches.get(gy * cols + gx)
+                    tile_id = cr.pick_tile(cr.seed(lseed), gx, gy) if cr else -1
+                    li.set_tile(gx, gy, cols, tile_id)
+                return
 
         for gx, gy in cells:
-            tile_id = self._evaluate_cell(gx, gy, cols, rows, source_li, rules)
+            tile_id = self._evaluate_cell(gx, gy, cols, rows, grid, compiled, lseed)
             li.set_tile(gx, gy, cols, tile_id if tile_id >= 0 else -1)
 
     def _evaluate_cell(self, gx: int, gy: int, cols: int, rows: int,
-                       source_li: LayerInstance, rules: list[AutoRuleDef]) -> int:
+                       grid: list[int], compiled: CompiledRuleSet, lseed: int) -> int:
         """Find the first matching rule for a cell and return its output tile."""
-        center_val = source_li.get_intgrid_value(gx, gy, cols)
+        cr = compiled.evaluate_cell(grid, cols, rows, gx, gy)
+        if cr is None:
+            return -1
+        return cr.pick_tile(cr.seed(lseed), gx, gy)
 
-        for rule in rules:
-            if rule.source_values and center_val not in rule.source_values:
-                continue
 
-            variants = self._get_pattern_variants(rule)
-            for pattern in variants:
-                if self._pattern_matches(gx, gy, cols, rows, source_li, pattern):
-                    return self._pick_output_tile(rule)
+def solve_rows(compiled: CompiledRuleSet, grid: Sequence[int], cols: int, grid_rows: int,
+               y0: int, y1: int, lseed: int, grid_y: int = 0) -> list[int]:
+    """Solve level rows [y0, y1) and return their auto tiles (row-major).
 
-        return -1
+    grid holds level rows [grid_y, grid_y + grid_rows); when it is a band cut
+    out of a larger level it must include rule-radius halo rows around
+    [y0, y1) so patterns see the same neighbours as in a full solve.
+    """
+    ly0, ly1 = y0 - grid_y, y1 - grid_y
+    base = ly0 * cols
+    tiles = [-1] * ((ly1 - ly0) * cols)
+    for cr, indices in compiled.match_region(grid, cols, grid_rows, 0, ly0, cols, ly1):
+        if len(cr.output_tiles) <= 1:
+            tile_id = cr.output_tiles[0] if cr.output_tiles else -1
+            for idx in indices:
+                tiles[idx - base] = tile_id
+        else:
+            seed = cr.seed(lseed)
+            for idx in indices:
+                gy, gx = divmod(idx, cols)
+                tiles[idx - base] = cr.pick_tile(seed, gx, gy + grid_y)
+    return tiles
 
-    def _pattern_matches(self, gx: int, gy: int, cols: int, rows: int,
-                         source_li: LayerInstance, pattern: list[RuleCell]) -> bool:
-        """Check if a pattern matches at the given position."""
-        for cell in pattern:
-            nx = gx + cell.dx
-            ny = gy + cell.dy
-            if cell.requirement == RuleCellReq.ANY:
-                continue
-            if nx < 0 or nx >= cols or ny < 0 or ny >= rows:
-                val = 0  # Out of bounds treated as empty
-            else:
-                val = source_li.get_intgrid_value(nx, ny, cols)
-            if cell.requirement == RuleCellReq.MUST_MATCH:
-                if val not in cell.values:
-                    return False
-            elif cell.requirement == RuleCellReq.MUST_NOT_MATCH:
-                if val in cell.values:
-                    return False
+
+def _expand_cells(cells: set[tuple[int, int]], padding: int,
+                  cols: int, rows: int) -> set[tuple[int, int]]:
+    """Grow a cell set by padding in every direction, clipped to the level."""
+    if padding <= 0:
+        return {(x, y) for x, y in cells if 0 <= x < cols and 0 <= y < rows}
+    # A square neighbourhood is separable: widen rows first, then columns
+    offsets = range(-padding, padding + 1)
+    wide = {(x + d, y) for d in offsets for x, y in cells}
+    tall = {(x, y + d) for d in offsets for x, y in wide}
+    return {(x, y) for x, y in tall if 0 <= x < cols and 0 <= y < rows}
+
+
+class AutoLayerScheduler:
+    """Queues dirty IntGrid cells and re-solves the affected auto layers per frame.
+
+    Cells arrive from command-stack notifications (execute, undo, redo) and
+    from tools painting in place mid-stroke.  update() drains the queue one
+    block at a time until its time budget is spent, so a huge flood fill is
+    spread over several frames instead of stalling one.
+    """
+
+    def __init__(self, project: Project, solver: RuleSolver, budget: float = 0.004):
+        self.project = project
+        self.solver = solver
+        self.budget = budget  # seconds of solving per update()
+        # (id(level), source layer uid) -> (level, {block: dirty cells})
+        self._pending: dict[tuple[int, str],
+                            tuple[Level, dict[tuple[int, int], set[tuple[int, int]]]]] = {}
+        self._last_owner: tuple[LayerInstance, Level] | None = None
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._pending)
+
+    def on_command(self, cmd: Command) -> None:
+        """CommandStack listener: queue whatever IntGrid cells cmd touched."""
+        dirty = cmd.dirty_cells()
+        if dirty is not None:
+            self.mark_dirty(*dirty)
+
+    def mark_dirty(self, layer_inst: LayerInstance, cells: list[tuple[int, int]]) -> None:
+        """Queue IntGrid cells of layer_inst for re-solving."""
+        if not cells or not self._feeds_auto_layer(layer_inst.layer_def_uid):
+            return
+        level = self._find_level(layer_inst)
+        if level is None:
+            return
+        key = (id(level), layer_inst.layer_def_uid)
+        entry = self._pending.get(key)
+        if entry is None:
+            entry = (level, {})
+            self._pending[key] = entry
+        blocks = entry[1]
+        size = _SCHEDULER_BLOCK
+        for x, y in cells:
+            block = blocks.get((x // size, y // size))
+            if block is None:
+                block = blocks[(x // size, y // size)] = set()
+            block.add((x, y))
+
+    def update(self) -> bool:
+        """Solve queued blocks within the time budget. Returns True if any ran."""
+        if not self._pending:
+            return False
+        deadline = time.perf_counter() + self.budget
+        while self._pending:
+            self._solve_next_block()
+            if time.perf_counter() >= deadline:
+                break
         return True
 
-    def _pick_output_tile(self, rule: AutoRuleDef) -> int:
-        """Pick an output tile, possibly weighted random."""
-        if not rule.output_tiles:
-            return -1
-        if len(rule.output_tiles) == 1:
-            return rule.output_tiles[0]
-        if rule.output_weights and len(rule.output_weights) == len(rule.output_tiles):
-            return random.choices(rule.output_tiles, weights=rule.output_weights, k=1)[0]
-        return random.choice(rule.output_tiles)
-
-    def _get_pattern_variants(self, rule: AutoRuleDef) -> list[list[RuleCell]]:
-        """Generate rotated/mirrored pattern variants if allowed."""
-        variants = [rule.pattern]
-        if rule.allow_rotation:
-            for _ in range(3):
-                rotated = self._rotate_pattern_90(variants[-1])
-                variants.append(rotated)
-        if rule.allow_mirror:
-            mirrored = []
-            for pat in list(variants):
-                mirrored.append(self._mirror_pattern_x(pat))
-            variants.extend(mirrored)
-        return variants
-
-    @staticmethod
-    def _rotate_pattern_90(pattern: list[RuleCell]) -> list[RuleCell]:
-        """Rotate pattern 90 degrees clockwise."""
-        return [
-            RuleCell(dx=-c.dy, dy=c.dx, requirement=c.requirement, values=list(c.values))
-            for c in pattern
-        ]
-
-    @staticmethod
-    def _mirror_pattern_x(pattern: list[RuleCell]) -> list[RuleCell]:
-        """Mirror pattern along X axis."""
-        return [
-            RuleCell(dx=-c.dx, dy=c.dy, requirement=c.requirement, values=list(c.values))
-            for c in pattern
-        ]
+    def flush(self) -> None:
+        """Solve everything still queued (e.g. before saving or exporting)."""
+        while self._pending:
+            self._solve_next_block()
+
+    def clear(self) -> None:
+        self._pending.clear()
+        self._last_owner = None
+
+    def _solve_next_block(self) -> None:
+        key = next(iter(self._pending))
+        level, blocks = self._pending[key]
+        cells = blocks.pop(next(iter(blocks)))
+        if not blocks:
+            del self._pending[key]
+        self.solver.solve_dirty(level, cells, source_layer_uid=key[1])
+
+    def _feeds_auto_layer(self, layer_def_uid: str) -> bool:
+        return any(ld.layer_type == LayerType.AUTO_LAYER and ld.source_layer_uid == layer_def_uid
+                   for ld in self.project.definitions.layers)
+
+    def _find_level(self, layer_inst: LayerInstance) -> Level | None:
+        """Find the level owning layer_inst (by identity)."""
+        if self._last_owner is not None and self._last_owner[0] is layer_inst:
+            return self._last_owner[1]
+        for world in self.project.worlds:
+            for level in world.levels:
+                if level.is_loaded and any(li is layer_inst for li in level.layers):
+                    self._last_owner = (layer_inst, level)
+                    return level
+        return None
@@ -0,0 +1,121 @@
+"""Parallel auto-layer solving on a process pool.
+
+Every (level, auto layer) pair is cut into row bands; each band is shipped to
+a worker together with rule-radius halo rows above and below, so the worker
+sees exactly the neighbours a full solve would.  Output tiles depend only on
+the IntGrid data and the per-cell hash seeds, so stitching the bands back
+together gives the same tiles as RuleSolver.solve_all().
+"""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Sequence
+
+from birdlevel.project.grid import Grid
+from birdlevel.project.models import Definitions, LayerInstance, LayerType, Level
+from birdlevel.rules.auto_layer import RuleSolver, solve_rows
+from birdlevel.rules.rule_compiler import level_seed
+
+# Rows per work unit; levels shorter than this are solved in one piece
+DEFAULT_BAND_ROWS = 128
+
+# Solver living in each worker process, built once by _init_worker()
+_worker_solver: RuleSolver | None = None
+
+
+@dataclass
+class _BandJob:
+    """One band of one auto layer: level rows [y0, y1) plus halo rows."""
+    target: int  # index into the caller's target list
+    source_layer_uid: str
+    level_seed: int
+    cols: int
+    y0: int
+    y1: int
+    grid_y: int  # first level row held in grid
+    grid: list[int]
+
+
+def _init_worker(definitions: Definitions) -> None:
+    global _worker_solver
+    _worker_solver = RuleSolver(definitions)
+
+
+def _solve_band(job: _BandJob) -> tuple[int, int, list[int]]:
+    return _solve_band_with(_worker_solver, job)
+
+
+def _solve_band_with(solver: RuleSolver, job: _BandJob) -> tuple[int, int, list[int]]:
+    compiled = solver.compiled_rules(job.source_layer_uid)
+    grid_rows = len(job.grid) // job.cols if job.cols else 0
+    tiles = solve_rows(compiled, job.grid, job.cols, grid_rows,
+                       job.y0, job.y1, job.level_seed, grid_y=job.grid_y)
+    return job.target, job.y0, tiles
+
+
+def solve_all_parallel(definitions: Definitions, levels: Sequence[Level],
+                       max_workers: int | None = None,
+                       band_rows: int = DEFAULT_BAND_ROWS) -> None:
+    """Run all auto-layer rules for every level, spread over worker processes.
+
+    Produces the same tiles as calling RuleSolver.solve_all() on each level.
+    max_workers=1 solves in this process (no pool).
+    """
+    solver = RuleSolver(definitions)
+    band_rows = max(1, band_rows)
+    targets: list[tuple[LayerInstance, list[int], int]] = []  # (layer, tiles, cols)
+    jobs: list[_BandJob] = []
+
+    for level in levels:
+        cols = level.width_cells
+        rows = level.height_cells
+        lseed = level_seed(level.uid)
+        for ld in definitions.layers:
+            if ld.layer_type != LayerType.AUTO_LAYER or ld.source_layer_uid is None:
+                continue
+            li = level.get_layer_instance(ld.uid)
+            if li is None:
+                continue
+            li.ensure_tiles(cols, rows)
+            source_li = level.get_layer_instance(ld.source_layer_uid)
+            if source_li is None or source_li.intgrid is None:
+                continue
+
+            radius = solver.compiled_rules(ld.source_layer_uid).radius
+            target = len(targets)
+            targets.append((li, [-1] * (cols * rows), cols))
+            for y0 in range(0, rows, band_rows):
+                y1 = min(rows, y0 + band_rows)
+                gy0 = max(0, y0 - radius)
+                gy1 = min(rows, y1 + radius)
+                jobs.append(_BandJob(
+                    target=target,
+                    source_layer_uid=ld.source_layer_uid,
+                    level_seed=lseed,
+                    cols=cols,
+                    y0=y0,
+                    y1=y1,
+                    grid_y=gy0,
+                    grid=source_li.intgrid[gy0 * cols:gy1 * cols].tolist(),
+                ))
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    workers = min(max_workers, len(jobs))
+    if workers <= 1:
+        results = [_solve_band_with(solver, job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(definitions,)) as pool:
+            chunksize = max(1, len(jobs) // (workers * 4))
+            results = list(pool.map(_solve_band, jobs, chunksize=chunksize))
+
+    # pool.map keeps job order, and bands never overlap, so the merge is
+    # independent of which worker finished first
+    for target, y0, band in results:
+        _li, tiles, cols = targets[target]
+        tiles[y0 * cols:y0 * cols + len(band)] = band
+    for li, tiles, _cols in targets:
+        li.tiles = Grid.from_values(tiles)
@@ -0,0 +1,422 @@
+"""Rule compiler: turns AutoRuleDefs into precomputed match tables.
+
+Each rule is compiled once into a list of pattern variants (rotations and
+mirrors expanded, duplicates removed, ANY cells dropped).  A compiled rule set
+can then be evaluated one cell at a time, or against a whole rectangle of the
+IntGrid at once using bitset passes: every value set referenced by a rule is
+turned into a bitmask over the (padded) region, and each pattern cell becomes
+a shift + AND of that mask.  Python big ints do the heavy lifting in C, so a
+full-level pass costs a few operations per pattern cell instead of a Python
+loop per grid cell.
+"""
+from __future__ import annotations
+
+import zlib
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Sequence
+
+from birdlevel.project.models import AutoRuleDef, RuleCell, RuleCellReq
+
+# A single compiled pattern check: (dx, dy, values, must_match)
+Check = tuple[int, int, frozenset[int], bool]
+
+_MASK32 = 0xFFFFFFFF
+
+# Cells read to build a dispatch key: the center and its 8 neighbours
+_NEIGHBOURHOOD = tuple((dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1))
+# Dispatch entries kept before the cache is reset
+_DISPATCH_CACHE_MAX = 1 << 16
+
+
+def _mix32(h: int) -> int:
+    """32-bit integer finalizer (good avalanche, cheap in pure Python)."""
+    h ^= h >> 16
+    h = (h * 0x7FEB352D) & _MASK32
+    h ^= h >> 15
+    h = (h * 0x846CA68B) & _MASK32
+    h ^= h >> 16
+    return h
+
+
+def cell_hash(seed: int, x: int, y: int) -> int:
+    """Stable 32-bit hash of a cell position under a seed."""
+    return _mix32(seed ^ _mix32(((y & 0xFFFF) << 16) | (x & 0xFFFF)))
+
+
+def level_seed(level_uid: str) -> int:
+    """Seed for all rule output in one level."""
+    return zlib.crc32(level_uid.encode("utf-8"))
+
+
+def pattern_variants(rule: AutoRuleDef) -> list[list[RuleCell]]:
+    """Generate rotated/mirrored pattern variants if allowed."""
+    variants = [rule.pattern]
+    if rule.allow_rotation:
+        for _ in range(3):
+            variants.append(_rotate_pattern_90(variants[-1]))
+    if rule.allow_mirror:
+        variants.extend([_mirror_pattern_x(pat) for pat in list(variants)])
+    return variants
+
+
+def _rotate_pattern_90(pattern: list[RuleCell]) -> list[RuleCell]:
+    """Rotate pattern 90 degrees clockwise."""
+    return [
+        RuleCell(dx=-c.dy, dy=c.dx, requirement=c.requirement, values=list(c.values))
+        for c in pattern
+    ]
+
+
+def _mirror_pattern_x(pattern: list[RuleCell]) -> list[RuleCell]:
+    """Mirror pattern along X axis."""
+    return [
+        RuleCell(dx=-c.dx, dy=c.dy, requirement=c.requirement, values=list(c.values))
+        for c in pattern
+    ]
+
+
+class CompiledRule:
+    """One AutoRuleDef with its pattern variants flattened into check tables."""
+
+    __slots__ = ("rule", "source_values", "variants", "split_variants", "radius",
+                 "output_tiles", "_cumulative", "_total")
+
+    def __init__(self, rule: AutoRuleDef):
+        self.rule = rule
+        self.output_tiles: tuple[int, ...] = tuple(rule.output_tiles)
+        # Cumulative weight table for weighted picks; None means uniform
+        self._cumulative: list[float] | None = None
+        self._total = 0.0
+        weights = rule.output_weights
+        if len(self.output_tiles) > 1 and weights and len(weights) == len(self.output_tiles):
+            cumulative = list(accumulate(max(0.0, float(w)) for w in weights))
+            if cumulative[-1] > 0:
+                self._cumulative = cumulative
+                self._total = cumulative[-1]
+        self.source_values: frozenset[int] | None = (
+            frozenset(rule.source_values) if rule.source_values else None
+        )
+        variants: list[tuple[Check, ...]] = []
+        seen: set[frozenset[Check]] = set()
+        radius = 0
+        for pattern in pattern_variants(rule):
+            checks: list[Check] = []
+            for c in pattern:
+                if c.requirement == RuleCellReq.ANY:
+                    continue
+                must = c.requirement == RuleCellReq.MUST_MATCH
+                checks.append((c.dx, c.dy, frozenset(c.values), must))
+                radius = max(radius, abs(c.dx), abs(c.dy))
+            key = frozenset(checks)
+            if key in seen:
+                continue
+            seen.add(key)
+            variants.append(tuple(checks))
+        self.variants: tuple[tuple[Check, ...], ...] = tuple(variants)
+        # Each variant split into (checks within 1 cell, checks further out)
+        self.split_variants: tuple[tuple[tuple[Check, ...], tuple[Check, ...]], ...] = tuple(
+            (tuple(c for c in checks if abs(c[0]) <= 1 and abs(c[1]) <= 1),
+             tuple(c for c in checks if abs(c[0]) > 1 or abs(c[1]) > 1))
+            for checks in variants
+        )
+        self.radius = radius
+
+    def seed(self, level_seed: int) -> int:
+        """Per-rule seed within a level (crc32 of level uid + rule uid)."""
+        return zlib.crc32(self.rule.uid.encode("utf-8"), level_seed)
+
+    def pick_tile(self, seed: int, x: int, y: int) -> int:
+        """Output tile for cell (x, y); the same inputs always give the same tile."""
+        tiles = self.output_tiles
+        if not tiles:
+            return -1
+        if len(tiles) == 1:
+            return tiles[0]
+        h = cell_hash(seed, x, y)
+        if self._cumulative is None:
+            return tiles[h % len(tiles)]
+        idx = bisect_right(self._cumulative, h * self._total / 4294967296.0)
+        return tiles[min(idx, len(tiles) - 1)]
+
+
+class CompiledRuleSet:
+    """Priority-ordered compiled rules for one source IntGrid layer.
+
+    Per-cell evaluation goes through a dispatch index: every IntGrid value is
+    reduced to a class (values that belong to exactly the same rule value
+    sets share a class), and the classes of a cell and its 8 neighbours are
+    packed into one int key.  The entry for a key lists only the rules that
+    can still match there, with every check inside the 3x3 neighbourhood
+    already resolved; only checks further out are evaluated per cell.
+    """
+
+    def __init__(self, rules: Sequence[AutoRuleDef]):
+        ordered = sorted(rules, key=lambda r: r.priority, reverse=True)
+        self.rules: list[CompiledRule] = [CompiledRule(r) for r in ordered]
+        self.radius: int = max((cr.radius for cr in self.rules), default=0)
+        self._build_value_classes()
+        # packed key -> [(rule, remaining far checks per variant or None if certain)]
+        self._dispatch: dict[int, list[tuple[CompiledRule, tuple[tuple[Check, ...], ...] | None]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def _build_value_classes(self) -> None:
+        """Group values by which rule value sets contain them."""
+        value_sets: list[frozenset[int]] = []
+        seen: set[frozenset[int]] = set()
+
+        def note(values: frozenset[int]) -> None:
+            if values not in seen:
+                seen.add(values)
+                value_sets.append(values)
+
+        for cr in self.rules:
+            if cr.source_values is not None:
+                note(cr.source_values)
+            for near, _far in cr.split_variants:
+                for _dx, _dy, values, _must in near:
+                    note(values)
+
+        # Class 0: values in none of the sets (its representative, None,
+        # is in no set either)
+        class_by_membership: dict[tuple[bool, ...], int] = {
+            tuple(False for _ in value_sets): 0}
+        self._class_rep: list[int | None] = [None]
+        self._class_of: dict[int, int] = {}
+        for v in sorted(set().union(*value_sets)):
+            membership = tuple(v in vs for vs in value_sets)
+            cls = class_by_membership.get(membership)
+            if cls is None:
+                cls = len(self._class_rep)
+                class_by_membership[membership] = cls
+                self._class_rep.append(v)
+            self._class_of[v] = cls
+        self._class_bits = max(1, (len(self._class_rep) - 1).bit_length())
+
+    # ------------------------------------------------------------------
+    # Per-cell evaluation
+    # ------------------------------------------------------------------
+
+    def evaluate_cell(self, grid: Sequence[int], cols: int, rows: int,
+                      gx: int, gy: int) -> CompiledRule | None:
+        """Return the first rule matching at (gx, gy), or None."""
+        class_of = self._class_of
+        bits = self._class_bits
+        key = 0
+        for dx, dy in _NEIGHBOURHOOD:
+            nx = gx + dx
+            ny = gy + dy
+            if 0 <= nx < cols and 0 <= ny < rows:
+                val = grid[ny * cols + nx]
+            else:
+                val = 0  # Out of bounds treated as empty
+            key = (key << bits) | class_of.get(val, 0)
+
+        entry = self._dispatch.get(key)
+        if entry is None:
+            entry = self._build_dispatch_entry(key)
+
+        for cr, far_variants in entry:
+            if far_variants is None:
+                return cr
+            for checks in far_variants:
+                for dx, dy, values, must in checks:
+                    nx = gx + dx
+                    ny = gy + dy
+                    if 0 <= nx < cols and 0 <= ny < rows:
+                        val = grid[ny * cols + nx]
+                    else:
+                        val = 0
+                    if (val in values) != must:
+                        break
+                else:
+                    return cr
+        return None
+
+    def _build_dispatch_entry(self, key: int
+                              ) -> list[tuple[CompiledRule, tuple[tuple[Check, ...], ...] | None]]:
+        """Resolve all 3x3 checks for one packed neighbourhood key."""
+        bits = self._class_bits
+        mask = (1 << bits) - 1
+        reps: dict[tuple[int, int], int | None] = {}
+        for i, offset in enumerate(reversed(_NEIGHBOURHOOD)):
+            reps[offset] = self._class_rep[(key >> (i * bits)) & mask]
+        center = reps[(0, 0)]
+
+        entry: list[tuple[CompiledRule, tuple[tuple[Check, ...], ...] | None]] = []
+        for cr in self.rules:
+            if cr.source_values is not None and center not in cr.source_values:
+                continue
+            far_variants: list[tuple[Check, ...]] = []
+            certain = False
+            for near, far in cr.split_variants:
+                if any((reps[(dx, dy)] in values) != must for dx, dy, values, must in near):
+                    continue
+                if not far:
+                    certain = True
+                    break
+                far_variants.append(far)
+            if certain:
+                entry.append((cr, None))
+                break  # Nothing below a certain match can win
+            if far_variants:
+                entry.append((cr, tuple(far_variants)))
+
+        if len(self._dispatch) >= _DISPATCH_CACHE_MAX:
+            self._dispatch.clear()
+        self._dispatch[key] = entry
+        return entry
+
+    # ------------------------------------------------------------------
+    # Whole-region bitset evaluation
+    # ------------------------------------------------------------------
+
+    def match_region(self, grid: Sequence[int], cols: int, rows: int,
+                     x0: int, y0: int, x1: int, y1: int,
+                     ) -> list[tuple[CompiledRule, list[int]]]:
+        """Evaluate every cell in [x0, x1) x [y0, y1) at once.
+
+        Returns (rule, flat cell indices) for each rule that matched anywhere.
+        Cells are resolved in rule priority order, exactly like evaluate_cell().
+        """
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(cols, x1), min(rows, y1)
+        w, h = x1 - x0, y1 - y0
+        if w <= 0 or h <= 0 or not self.rules:
+            return []
+
+        r = self.radius
+        pw = w + 2 * r
+        try:
+            padded, code_of = _pad_region(grid, cols, rows, x0, y0, x1, y1, r)
+        except ValueError:
+            return self._match_region_slow(grid, cols, rows, x0, y0, x1, y1)
+
+        interior_row = b"0" * r + b"1" * w + b"0" * r
+        interior = b"0" * (pw * r) + interior_row * h + b"0" * (pw * r)
+        unresolved = int(interior[::-1], 2)
+
+        base_masks: dict[frozenset[int], int] = {}
+        shifted_masks: dict[tuple[frozenset[int], int], int] = {}
+
+        def mask_for(values: frozenset[int]) -> int:
+            m = base_masks.get(values)
+            if m is None:
+                if code_of is not None:
+                    codes = {code_of[v] for v in values if v in code_of}
+                else:
+                    codes = {v for v in values if 0 <= v < 256}
+                table = bytes(49 if i in codes else 48 for i in range(256))
+                m = int(padded.translate(table)[::-1], 2)
+                base_masks[values] = m
+            return m
+
+        def shifted(values: frozenset[int], off: int) -> int:
+            key = (values, off)
+            m = shifted_masks.get(key)
+            if m is None:
+                base = mask_for(values)
+                m = base >> off if off >= 0 else base << -off
+                shifted_masks[key] = m
+            return m
+
+        results: list[tuple[CompiledRule, list[int]]] = []
+        base_idx = (y0 - r) * cols + (x0 - r)
+        for cr in self.rules:
+            if not unresolved:
+                break
+            candidates = unresolved
+            if cr.source_values is not None:
+                candidates &= mask_for(cr.source_values)
+                if not candidates:
+                    continue
+            matched = 0
+            for checks in cr.variants:
+                acc = candidates & ~matched
+                for dx, dy, values, must in checks:
+                    sh = shifted(values, dy * pw + dx)
+                    if must:
+                        acc &= sh
+                    else:
+                        acc &= ~sh
+                    if not acc:
+                        break
+                matched |= acc
+            if not matched:
+                continue
+            unresolved &= ~matched
+            indices: list[int] = []
+            bits = bin(matched)[:1:-1]
+            i = bits.find("1")
+            while i >= 0:
+                py, px = divmod(i, pw)
+                indices.append(base_idx + py * cols + px)
+                i = bits.find("1", i + 1)
+            results.append((cr, indices))
+        return results
+
+    def _match_region_slow(self, grid: Sequence[int], cols: int, rows: int,
+                           x0: int, y0: int, x1: int, y1: int,
+                           ) -> list[tuple[CompiledRule, list[int]]]:
+        """Per-cell fallback for grids too varied to pack one byte per cell."""
+        by_rule: dict[int, tuple[CompiledRule, list[int]]] = {}
+        for gy in range(y0, y1):
+            for gx in range(x0, x1):
+                cr = self.evaluate_cell(grid, cols, rows, gx, gy)
+                if cr is not None:
+                    by_rule.setdefault(id(cr), (cr, []))[1].append(gy * cols + gx)
+        return list(by_rule.values())
+
+
+def compile_rules(rules: Sequence[AutoRuleDef]) -> CompiledRuleSet:
+    """Compile a list of rules (any order) into a priority-ordered rule set."""
+    return CompiledRuleSet(rules)
+
+
+def _pad_region(grid: Sequence[int], cols: int, rows: int,
+                x0: int, y0: int, x1: int, y1: int, r: int,
+                ) -> tuple[bytes, dict[int, int] | None]:
+    """Copy a region plus an r-cell halo into one byte per cell.
+
+    Cells outside the level read as 0.  If the grid holds values that do not
+    fit in a byte, values are remapped to small codes and the mapping returned.
+    """
+    pw = (x1 - x0) + 2 * r
+    lo = max(0, x0 - r)
+    hi = min(cols, x1 + r)
+    left = b"\x00" * (lo - (x0 - r))
+    right = b"\x00" * ((x1 + r) - hi)
+    empty = b"\x00" * pw
+
+    row_slices: list[Sequence[int] | None] = []
+    for gy in range(y0 - r, y1 + r):
+        if 0 <= gy < rows:
+            start = gy * cols
+            row_slices.append(grid[start + lo:start + hi])
+        else:
+            row_slices.append(None)
+
+    try:
+        # array slices must go through tolist(): bytes(array) is the raw buffer
+        parts = [left + bytes(s.tolist() if isinstance(s, array) else s) + right
+                 if s is not None else empty for s in row_slices]
+        return b"".join(parts), None
+    except ValueError:
+        pass
+
+    code_of: dict[int, int] = {0: 0}
+    for s in row_slices:
+        if s is not None:
+            for v in s:
+                if v not in code_of:
+                    code_of[v] = len(code_of)
+    if len(code_of) > 256:
+        raise ValueError("IntGrid layer uses more than 256 distinct values")
+    parts = [
+        left + bytes(code_of[v] for v in s) + right if s is not None else empty
+        for s in row_slices
+    ]
+    return b"".join(parts), code_of
@@ -0,0 +1,331 @@
+"""Content-addressed, deduplicated store for project backups.
+
+A backup (snapshot) is a small JSON manifest listing the files of the
+project (the project file, plus its level files in the split layout) as
+sequences of chunks.  Chunks are stored once, under the hash of their
+content, in .backups/chunks/, optionally zlib-compressed.  Two snapshots of
+a project that differ in one level share every other chunk, so keeping
+twenty backups of a large project costs little more than one copy plus
+what changed between them.
+
+Chunk boundaries are content-defined, so an edit that changes the length
+of one part of a file (as saving an edited level does) only changes the
+chunks around the edit instead of shifting every chunk after it.  A chunk
+ends at the first anchor past MIN_CHUNK, found by two scans that run in C
+(bytes.translate and bytes.find):
+
+- binary data: bytes are mapped to 16 symbols through a fixed table, and
+  an anchor is where consecutive bytes map to the symbols of _ANCHOR;
+- JSON text, whose runs of grid values are far too regular for that: an
+  anchor is a '": ' key separator whose surrounding text hashes to 0
+  modulo KEY_SELECT.
+
+A file whose size and modification time match its entry in the previous
+snapshot is not read again; its chunk list is reused.  So the cost of a
+backup is one pass over the files that changed plus writing the chunks
+that are new.
+
+Layout of .backups/:
+
+    chunks/<2 hex>/<hash>           chunk data (1 flag byte, then raw or zlib)
+    snapshots/<project file>/<name>_<timestamp>.snapshot   manifests (JSON)
+    restored/<snapshot name>/...    snapshots written back out as files
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+import zlib
+from pathlib import Path
+from typing import Iterator
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SUFFIX = ".snapshot"
+
+# Chunk size limits; in random data boundaries fall about 64 KB past MIN_CHUNK
+MIN_CHUNK = 16 * 1024
+MAX_CHUNK = 256 * 1024
+# Bytes searched for a boundary at a time
+_SCAN_STEP = 64 * 1024
+_READ_SIZE = 4 * 1024 * 1024
+
+# Stored chunk flag byte
+_RAW = b"\x00"
+_ZLIB = b"\x01"
+
+# byte -> one of 16 symbols, a fixed pseudo-random split of the byte values
+_SYMBOLS = bytes(b"0123456789abcdef"[hashlib.blake2b(bytes([i]), digest_size=1).digest()[0] & 15]
+                 for i in range(256))
+# 16 ** -4: one anchor per 64 KB of random data
+_ANCHOR = b"d3a7"
+
+# One JSON key in this many is an anchor
+KEY_SELECT = 64
+_KEY = b'": '
+# Bytes either side of a key separator hashed to select it
+_KEY_CONTEXT = 24
+
+
+class BackupError(Exception):
+    """A snapshot or chunk is missing or corrupt."""
+
+
+def _chunk_end(data: bytes, start: int, final: bool) -> int:
+    """End of the chunk starting at start, or < 0 if data ends too early.
+
+    final means data holds the rest of the file.
+    """
+    n = len(data)
+    if n - start <= MIN_CHUNK:
+        return n if final else -1
+    limit = start + MAX_CHUNK
+    hi = min(limit, n)
+    pos = start + MIN_CHUNK
+    while pos < hi:
+        step_end = min(hi, pos + _SCAN_STEP)
+        lo = pos - len(_ANCHOR) + 1
+        i = data[lo:step_end].translate(_SYMBOLS).find(_ANCHOR)
+        end = lo + i + len(_ANCHOR) if i >= 0 else step_end
+        key = _key_anchor(data, pos, end, final)
+        if key != -1:
+            return key
+        if i >= 0:
+            return end
+        pos = step_end
+    if limit <= n:
+        return limit
+    # Short of MAX_CHUNK: a boundary may still come with more data
+    return n if final else -1
+
+
+def _key_anchor(data: bytes, pos: int, end: int, final: bool) -> int:
+    """End of the first selected key separator starting in [pos, end).
+
+    -1 if there is none, -2 if data ends before the context of one.
+    """
+    n = len(data)
+    while True:
+        p = data.find(_KEY, pos, end + len(_KEY) - 1)
+        if p < 0:
+            return -1
+        if p + _KEY_CONTEXT > n and not final:
+            return -2
+        context = data[max(0, p - _KEY_CONTEXT):p + _KEY_CONTEXT]
+        if zlib.crc32(context) % KEY_SELECT == 0:
+            return p + len(_KEY)
+        pos = p + 1
+
+
+def iter_chunks(f) -> Iterator[bytes]:
+    """Split a binary file object into content-defined chunks."""
+    buf = b""
+    pos = 0
+    final = False
+    while True:
+        end = _chunk_end(buf, pos, final)
+        if end >= 0:
+            if end > pos:
+                yield buf[pos:end]
+            pos = end
+            if final and pos >= len(buf):
+                return
+            continue
+        more = f.read(_READ_SIZE)
+        buf = buf[pos:] + more
+        pos = 0
+        final = not more
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def _write_new(path: str, data: bytes) -> None:
+    """Write path via a temp file and rename, so it never exists half-written."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class BackupStore:
+    """The backups of the projects in one directory (its .backups/)."""
+
+    def __init__(self, root: str, compress: bool = True):
+        self.root = root
+        self.compress = compress
+        self.chunk_dir = os.path.join(root, "chunks")
+        self.snapshot_dir = os.path.join(root, "snapshots")
+        # Bytes of chunk data written by this store object
+        self.bytes_written = 0
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    def snapshots(self, project_path: str) -> list[str]:
+        """Manifest paths of project_path's snapshots, newest first."""
+        d = self._project_dir(project_path)
+        if not os.path.isdir(d):
+            return []
+        found = [os.path.join(d, f) for f in os.listdir(d) if f.endswith(SNAPSHOT_SUFFIX)]
+        return sorted(found, key=os.path.getmtime, reverse=True)
+
+    def create(self, project_path: str) -> str | None:
+        """Snapshot the project as it is on disk; returns the manifest path."""
+        if not os.path.exists(project_path):
+            return None
+        base_dir = os.path.dirname(os.path.abspath(project_path))
+        previous = self._previous_files(project_path)
+        files = []
+        for rel in _project_files(project_path):
+            full = os.path.join(base_dir, rel)
+            st = os.stat(full)
+            entry = previous.get(rel)
+            if not (entry and entry["size"] == st.st_size
+                    and entry["mtime_ns"] == st.st_mtime_ns):
+                entry = {"path": rel, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                         "chunks": self._store_file(full)}
+            files.append(entry)
+
+        d = self._project_dir(project_path)
+        os.makedirs(d, exist_ok=True)
+        name = f"{Path(project_path).stem}_{time.strftime('%Y%m%d_%H%M%S')}"
+        dest = os.path.join(d, name + SNAPSHOT_SUFFIX)
+        n = 1
+        while os.path.exists(dest):
+            n += 1
+            dest = os.path.join(d, f"{name}_{n}{SNAPSHOT_SUFFIX}")
+        manifest = {"version": SNAPSHOT_VERSION, "project": os.path.basename(project_path),
+                    "created": time.time(), "files": files}
+        _write_new(dest, json.dumps(manifest).encode("utf-8"))
+        return dest
+
+    def restore(self, snapshot: str, dest_dir: str | None = None) -> str:
+        """Write a snapshot's files out under dest_dir; returns the project file path.
+
+        dest_dir defaults to .backups/restored/<snapshot name>/.  Every
+        chunk is checked against its hash.
+        """
+        manifest = self._read_manifest(snapshot)
+        if dest_dir is None:
+            dest_dir = os.path.join(self.root, "restored", Path(snapshot).stem)
+        for entry in manifest["files"]:
+            target = os.path.join(dest_dir, entry["path"])
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            size = 0
+            with open(target, "wb") as f:
+                for digest, length in entry["chunks"]:
+                    data = self._read_chunk(digest)
+                    if len(data) != length:
+                        raise BackupError(f"chunk {digest} has the wrong size")
+                    f.write(data)
+                    size += length
+            if size != entry["size"]:
+                raise BackupError(f"{entry['path']} restored with the wrong size")
+            os.utime(target, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+        return os.path.join(dest_dir, manifest["project"])
+
+    def source_mtime_ns(self, snapshot: str) -> int:
+        """Newest modification time (ns) of the files the snapshot was taken of."""
+        manifest = self._read_manifest(snapshot)
+        return max((entry["mtime_ns"] for entry in manifest["files"]), default=0)
+
+    def collect_garbage(self) -> int:
+        """Delete chunks no snapshot refers to; returns how many were deleted."""
+        live: set[str] = set()
+        if os.path.isdir(self.snapshot_dir):
+            for project in os.listdir(self.snapshot_dir):
+                d = os.path.join(self.snapshot_dir, project)
+                for f in os.listdir(d) if os.path.isdir(d) else []:
+                    if f.endswith(SNAPSHOT_SUFFIX):
+                        manifest = self._read_manifest(os.path.join(d, f))
+                        for entry in manifest["files"]:
+                            live.update(digest for digest, _ in entry["chunks"])
+        removed = 0
+        for prefix in os.listdir(self.chunk_dir) if os.path.isdir(self.chunk_dir) else []:
+            d = os.path.join(self.chunk_dir, prefix)
+            for name in os.listdir(d):
+                if name not in live:
+                    os.unlink(os.path.join(d, name))
+                    removed += 1
+        return removed
+
+    # ------------------------------------------------------------------
+
+    def _project_dir(self, project_path: str) -> str:
+        return os.path.join(self.snapshot_dir, os.path.basename(project_path))
+
+    def _previous_files(self, project_path: str) -> dict[str, dict]:
+        """rel path -> file entry of the newest readable snapshot."""
+        for snapshot in self.snapshots(project_path):
+            try:
+                manifest = self._read_manifest(snapshot)
+            except BackupError:
+                continue
+            return {entry["path"]: entry for entry in manifest["files"]}
+        return {}
+
+    def _read_manifest(self, snapshot: str) -> dict:
+        try:
+            with open(snapshot, "rb") as f:
+                manifest = json.loads(f.read().decode("utf-8"))
+        except (OSError, ValueError) as e:
+            raise BackupError(f"unreadable snapshot {os.path.basename(snapshot)}: {e}") from e
+        if manifest.get("version", 0) > SNAPSHOT_VERSION:
+            raise BackupError(f"snapshot {os.path.basename(snapshot)} is from a newer version")
+        return manifest
+
+    def _chunk_path(self, digest: str) -> str:
+        return os.path.join(self.chunk_dir, digest[:2], digest)
+
+    def _store_file(self, path: str) -> list[list]:
+        """Store the chunks of a file; returns its [digest, length] list."""
+        chunks = []
+        with open(path, "rb") as f:
+            for data in iter_chunks(f):
+                digest = _digest(data)
+                target = self._chunk_path(digest)
+                if not os.path.exists(target):
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    stored = _RAW + data
+                    if self.compress:
+                        packed = zlib.compress(data, 1)
+                        if len(packed) < len(data):
+                            stored = _ZLIB + packed
+                    _write_new(target, stored)
+                    self.bytes_written += len(stored)
+                chunks.append([digest, len(data)])
+        return chunks
+
+    def _read_chunk(self, digest: str) -> bytes:
+        try:
+            with open(self._chunk_path(digest), "rb") as f:
+                stored = f.read()
+            data = zlib.decompress(stored[1:]) if stored[:1] == _ZLIB else stored[1:]
+        except (OSError, zlib.error) as e:
+            raise BackupError(f"chunk {digest} unreadable: {e}") from e
+        if _digest(data) != digest:
+            raise BackupError(f"chunk {digest} is corrupt")
+        return data
+
+
+def project_mtime_ns(project_path: str) -> int:
+    """Newest modification time (ns) of the project file and its level files."""
+    base_dir = os.path.dirname(os.path.abspath(project_path))
+    return max(os.stat(os.path.join(base_dir, rel)).st_mtime_ns
+               for rel in _project_files(project_path))
+
+
+def _project_files(project_path: str) -> list[str]:
+    """The project file and its split-layout level files, relative to its directory."""
+    base_dir = os.path.dirname(os.path.abspath(project_path))
+    files = [os.path.basename(project_path)]
+    levels_dir = f"{Path(project_path).stem}_levels"
+    abs_levels = os.path.join(base_dir, levels_dir)
+    if os.path.isdir(abs_levels):
+        files.extend(os.path.join(levels_dir, name) for name in sorted(os.listdir(abs_levels))
+                     if os.path.isfile(os.path.join(abs_levels, name)))
+    return files
@@ -12,7 +12,8 @@ def open_file_dialog(
 ) -> Optional[str]:
     """Show a file open dialog. Returns path or None if cancelled."""
     if filetypes is None:
-        filetypes = [("BirdLevel Project", "*.birdlevel"), ("JSON Files", "*.json"), ("All Files", "*.*")]
+        filetypes = [("BirdLevel Project", "*.birdlevel"), ("BirdLevel Binary", "*.birdlevelb"),
+                     ("JSON Files", "*.json"), ("All Files", "*.*")]
     try:
         import tkinter as tk
         from tkinter import filedialog
@@ -38,7 +39,8 @@ def save_file_dialog(
 ) -> Optional[str]:
     """Show a file save dialog. Returns path or None if cancelled."""
     if filetypes is None:
-        filetypes = [("BirdLevel Project", "*.birdlevel"), ("JSON Files", "*.json"), ("All Files", "*.*")]
+        filetypes = [("BirdLevel Project", "*.birdlevel"), ("BirdLevel Binary", "*.birdlevelb"),
+                     ("JSON Files", "*.json"), ("All Files", "*.*")]
     try:
         import tkinter as tk
         from tkinter import filedialog
@@ -1,11 +1,16 @@
-"""Path and backup utilities."""
+"""Path and backup utilities.
+
+Backups live in a deduplicating BackupStore under .backups/ next to the
+project file (see birdlevel.util.backup_store).  Plain file copies left in
+.backups/ by earlier versions are still listed and restorable.
+"""
 from __future__ import annotations
 
 import os
-import shutil
-import time
 from pathlib import Path
 
+from birdlevel.util.backup_store import SNAPSHOT_SUFFIX, BackupStore, project_mtime_ns
+
 
 def backup_dir(project_path: str) -> str:
     """Return the .backups/ directory next to the project file."""
@@ -14,42 +19,68 @@ def backup_dir(project_path: str) -> str:
     return d
 
 
-def create_backup(project_path: str) -> str | None:
-    """Copy current project file into .backups/ with timestamp."""
-    if not os.path.exists(project_path):
-        return None
+def backup_store(project_path: str, compress: bool = True) -> BackupStore:
+    """The BackupStore holding project_path's backups."""
+    return BackupStore(backup_dir(project_path), compress=compress)
+
+
+def create_backup(project_path: str, compress: bool = True) -> str | None:
+    """Snapshot the current project file (and its level files) into .backups/.
+
+    Returns the snapshot path.  Only chunks not already stored are written.
+    """
+    return backup_store(project_path, compress).create(project_path)
+
+
+def list_backups(project_path: str) -> list[str]:
+    """Snapshots and legacy backup copies of the project, newest first."""
     bdir = backup_dir(project_path)
-    ts = time.strftime("%Y%m%d_%H%M%S")
-    base = os.path.basename(project_path)
-    name, ext = os.path.splitext(base)
-    backup_name = f"{name}_{ts}{ext}"
-    dest = os.path.join(bdir, backup_name)
-    shutil.copy2(project_path, dest)
-    return dest
+    prefix = f"{Path(project_path).stem}_"
+    found = backup_store(project_path).snapshots(project_path)
+    found.extend(os.path.join(bdir, f) for f in os.listdir(bdir)
+                 if f.startswith(prefix) and os.path.isfile(os.path.join(bdir, f)))
+    return sorted(found, key=os.path.getmtime, reverse=True)
 
 
 def find_latest_backup(project_path: str) -> str | None:
-    """Find the most recent backup file, if any."""
-    bdir = backup_dir(project_path)
-    if not os.path.isdir(bdir):
-        return None
-    backups = sorted(
-        [os.path.join(bdir, f) for f in os.listdir(bdir) if not f.startswith(".")],
-        key=os.path.getmtime,
-        reverse=True,
-    )
+    """Find the most recent backup, if any."""
+    backups = list_backups(project_path)
     return backups[0] if backups else None
 
 
+def backup_is_newer(project_path: str, backup: str) -> bool:
+    """True if backup holds a state newer than the project as saved.
+
+    Compares the modification times of the files the backup was taken of
+    (a legacy copy keeps its source's), not when the backup was made: a
+    backup taken just before a save is older than that save even though it
+    was written after the files the save left alone.
+    """
+    if backup.endswith(SNAPSHOT_SUFFIX):
+        backup_ns = backup_store(project_path).source_mtime_ns(backup)
+    else:
+        backup_ns = os.stat(backup).st_mtime_ns
+    return backup_ns > project_mtime_ns(project_path)
+
+
+def restore_backup(project_path: str, backup: str) -> str:
+    """Return a loadable project file for a backup from list_backups().
+
+    Snapshots are written out under .backups/restored/; legacy copies are
+    returned as they are.
+    """
+    if backup.endswith(SNAPSHOT_SUFFIX):
+        return backup_store(project_path).restore(backup)
+    return backup
+
+
 def prune_backups(project_path: str, keep: int = 20) -> None:
-    """Remove oldest backups, keeping at most `keep`."""
-    bdir = backup_dir(project_path)
-    if not os.path.isdir(bdir):
-        return
-    backups = sorted(
-        [os.path.join(bdir, f) for f in os.listdir(bdir) if not f.startswith(".")],
-        key=os.path.getmtime,
-        reverse=True,
-    )
+    """Remove oldest backups, keeping at most `keep`, and their unused chunks."""
+    backups = list_backups(project_path)
+    store = backup_store(project_path)
+    removed = False
     for old in backups[keep:]:
         os.unlink(old)
+        removed = removed or old.endswith(SNAPSHOT_SUFFIX)
+    if removed:
+        store.collect_garbage()
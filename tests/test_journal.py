@@ -0,0 +1,93 @@
+"""Undo journal replay across a save."""
+from __future__ import annotations
+
+from birdlevel.editor.commands import CommandStack, PaintIntGridCommand
+from birdlevel.editor.journal import UndoJournal
+from birdlevel.project.models import LayerType, Project
+from birdlevel.project.serialization import load_project, save_project
+
+
+def _saved_project(tmp_path):
+    project = Project(name="J")
+    project.create_default()
+    path = str(tmp_path / "j.birdlevel")
+    save_project(project, path)
+    return project, path
+
+
+def _intgrid(project):
+    level = project.worlds[0].levels[0]
+    uid = next(ld.uid for ld in project.definitions.layers
+               if ld.layer_type == LayerType.INTGRID)
+    return level, level.get_layer_instance(uid)
+
+
+def _paint(stack, level, li, value):
+    stack.execute(PaintIntGridCommand(layer_inst=li, cols=level.width_cells,
+                                      cells=[(0, 0, value)]))
+
+
+def _start(project, path, stack):
+    """What saving does to the history and the journal."""
+    stack.mark_clean()
+    journal = UndoJournal(project, path)
+    journal.reset()
+    stack.journal = journal
+    return journal
+
+
+def _replayed_cell(path):
+    project = load_project(path)
+    journal = UndoJournal(project, path)
+    journal.replay(CommandStack())
+    journal.close()
+    return _intgrid(project)[1].intgrid[0]
+
+
+def test_undo_past_save_is_not_current(tmp_path):
+    project, path = _saved_project(tmp_path)
+    level, li = _intgrid(project)
+    stack = CommandStack()
+    _paint(stack, level, li, 1)
+    save_project(project)
+    journal = _start(project, path, stack)
+
+    stack.undo()
+    assert li.intgrid[0] == 0
+    # The undo cannot be replayed, so autosave must write the file
+    assert not journal.is_current
+    journal.close()
+
+
+def test_redo_past_save_is_not_current(tmp_path):
+    project, path = _saved_project(tmp_path)
+    level, li = _intgrid(project)
+    stack = CommandStack()
+    _paint(stack, level, li, 1)
+    stack.undo()
+    save_project(project)
+    journal = _start(project, path, stack)
+
+    stack.redo()
+    assert not journal.is_current
+    journal.close()
+
+
+def test_undo_redo_after_save_replay(tmp_path):
+    project, path = _saved_project(tmp_path)
+    level, li = _intgrid(project)
+    stack = CommandStack()
+    _paint(stack, level, li, 1)
+    save_project(project)
+    journal = _start(project, path, stack)
+
+    _paint(stack, level, li, 2)
+    stack.undo()
+    assert journal.is_current
+    journal.sync()
+    assert _replayed_cell(path) == 1
+
+    stack.redo()
+    assert journal.is_current
+    journal.close()
+    assert _replayed_cell(path) == 2